@@ -0,0 +1,82 @@
+# benchmarks/compare.py
+"""Membandingkan dua file hasil benchmarks.runner dan menandai regresi.
+
+    python -m benchmarks.compare baseline.json kandidat.json --max-slowdown 10
+
+Exit code 1 kalau ada regresi di atas ambang batas, supaya bisa dipakai di CI.
+"""
+import argparse
+import json
+import sys
+
+
+def _key(row: dict):
+    return row["op"], row["variant"], row["file"]
+
+
+def _change(old, new):
+    if not old or new is None:
+        return None
+    return 100.0 * (new - old) / old
+
+
+def compare(baseline: dict, candidate: dict, max_slowdown: float = 10.0,
+            max_rss_growth: float = 20.0, max_ratio_growth: float = 5.0) -> list:
+    base_rows = {_key(r): r for r in baseline["results"]}
+    rows = []
+    for new in candidate["results"]:
+        old = base_rows.get(_key(new))
+        if old is None:
+            continue
+        row = {
+            "key": _key(new),
+            "wall": _change(old.get("wall_s"), new.get("wall_s")),
+            "rss": _change(old.get("peak_rss"), new.get("peak_rss")),
+            "ratio": _change(old.get("ratio"), new.get("ratio")),
+            "problems": [],
+        }
+        if "error" in new and "error" not in old:
+            row["problems"].append(f"gagal: {new['error']}")
+        if row["wall"] is not None and row["wall"] > max_slowdown:
+            row["problems"].append(f"lebih lambat {row['wall']:+.1f}%")
+        if row["rss"] is not None and row["rss"] > max_rss_growth:
+            row["problems"].append(f"memori {row['rss']:+.1f}%")
+        if row["ratio"] is not None and row["ratio"] > max_ratio_growth:
+            row["problems"].append(f"output lebih besar {row['ratio']:+.1f}%")
+        rows.append(row)
+    return rows
+
+
+def _fmt(value) -> str:
+    return "     n/a" if value is None else f"{value:+7.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bandingkan dua hasil benchmark")
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--max-slowdown', type=float, default=10.0, help='Ambang wall time (%%)')
+    parser.add_argument('--max-rss-growth', type=float, default=20.0, help='Ambang RSS puncak (%%)')
+    parser.add_argument('--max-ratio-growth', type=float, default=5.0, help='Ambang ukuran output (%%)')
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    rows = compare(baseline, candidate, args.max_slowdown, args.max_rss_growth, args.max_ratio_growth)
+    print(f"{'operasi':14} {'varian':26} {'file':28} {'wall':>8} {'rss':>8} {'ratio':>8}")
+    for row in rows:
+        op, variant, name = row["key"]
+        status = "REGRESI: " + ", ".join(row["problems"]) if row["problems"] else "OK"
+        print(f"{op:14} {variant:26} {name:28} {_fmt(row['wall'])} {_fmt(row['rss'])} "
+              f"{_fmt(row['ratio'])}  {status}")
+
+    regressions = [r for r in rows if r["problems"]]
+    print(f"\n{len(rows)} dibandingkan, {len(regressions)} regresi")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# benchmarks/corpus.py
+"""Generator korpus sintetis yang deterministik untuk benchmark.
+
+Seed yang sama selalu menghasilkan isi dokumen yang sama (teks, gambar, jumlah
+halaman), jadi hasil dua kali benchmark bisa dibandingkan.
+
+    python -m benchmarks.corpus --out bench_corpus --sizes small medium
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+from docx import Document
+from docx.shared import Inches
+from PIL import Image, ImageDraw
+
+SIZES = {
+    "small": {"pages": 5, "images": 3},
+    "medium": {"pages": 40, "images": 15},
+    "large": {"pages": 200, "images": 60},
+}
+KINDS = ("text_pdf", "scanned_pdf", "mixed_pdf", "image_docx")
+DEFAULT_SEED = 1234
+
+WORDS = ("dokumen laporan kontrak halaman pasal ayat pihak pertama kedua tanggal nilai "
+         "pembayaran ketentuan umum khusus lampiran tabel gambar data hasil analisis "
+         "ringkasan kesimpulan saran berlaku sejak ditandatangani oleh para").split()
+
+
+def _sentence(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n_words)).capitalize() + "."
+
+
+def _paragraph(rng: random.Random) -> str:
+    return " ".join(_sentence(rng, rng.randint(8, 16)) for _ in range(rng.randint(3, 6)))
+
+
+def _photo(rng: random.Random, size=(2400, 1600)) -> Image.Image:
+    # "Foto" sintetis: gradien + bentuk acak + noise, cukup berat untuk di-encode
+    w, h = size
+    base = Image.merge("RGB", [
+        Image.linear_gradient("L").resize(size),
+        Image.linear_gradient("L").rotate(90).resize(size),
+        Image.new("L", size, rng.randint(60, 200)),
+    ])
+    draw = ImageDraw.Draw(base)
+    for _ in range(40):
+        x, y = rng.randint(0, w), rng.randint(0, h)
+        r = rng.randint(20, 300)
+        color = tuple(rng.randint(0, 255) for _ in range(3))
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=color)
+    noise = Image.frombytes("L", size, rng.randbytes(w * h)).convert("RGB")
+    return Image.blend(base, noise, 0.12)
+
+
+def _scan(rng: random.Random, lines: int = 45, size=(1240, 1754)) -> Image.Image:
+    # Halaman "hasil scan" 150 dpi A4: teks hitam di kertas keabu-abuan dengan bintik
+    img = Image.new("L", size, 235)
+    draw = ImageDraw.Draw(img)
+    for i in range(lines):
+        draw.text((90, 90 + i * 36), _sentence(rng, 12), fill=rng.randint(10, 60))
+    for _ in range(1500):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        draw.point((x, y), fill=rng.randint(120, 200))
+    return img
+
+
+def _jpeg(img: Image.Image, quality: int = 85) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def make_text_pdf(path: str, pages: int, rng: random.Random):
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        text = "\n\n".join(_paragraph(rng) for _ in range(5))
+        page.insert_textbox(fitz.Rect(56, 56, page.rect.width - 56, page.rect.height - 56),
+                            text, fontsize=10)
+    doc.save(path, garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+
+
+def make_scanned_pdf(path: str, pages: int, rng: random.Random):
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_image(page.rect, stream=_jpeg(_scan(rng)))
+    doc.save(path, no_new_id=True)
+    doc.close()
+
+
+def make_mixed_pdf(path: str, pages: int, rng: random.Random):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        if i % 4 == 3:
+            page.insert_image(page.rect, stream=_jpeg(_scan(rng)))
+            continue
+        text = "\n\n".join(_paragraph(rng) for _ in range(2))
+        page.insert_textbox(fitz.Rect(56, 56, page.rect.width - 56, 360), text, fontsize=10)
+        if i % 2 == 0:
+            page.insert_image(fitz.Rect(56, 380, page.rect.width - 56, 760),
+                              stream=_jpeg(_photo(rng, (1600, 1100))))
+        else:
+            for k in range(30):
+                y = 400 + k * 12
+                page.draw_line((56, y), (56 + rng.randint(100, 480), y), color=(0, 0, 0.6))
+    doc.save(path, garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+
+
+def make_image_docx(path: str, images: int, rng: random.Random):
+    doc = Document()
+    doc.add_heading("Laporan Kegiatan", 1)
+    for i in range(images):
+        doc.add_paragraph(_paragraph(rng))
+        doc.add_picture(io.BytesIO(_jpeg(_photo(rng), quality=92)), width=Inches(rng.choice((3, 4.5, 6))))
+        if i % 5 == 0:
+            table = doc.add_table(rows=3, cols=3)
+            for cell in table._cells:
+                cell.text = rng.choice(WORDS)
+    doc.save(path)
+
+
+def generate(out_dir: str, sizes=("small", "medium"), kinds=KINDS, seed: int = DEFAULT_SEED) -> dict:
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {"seed": seed, "files": []}
+    for size in sizes:
+        spec = SIZES[size]
+        for kind in kinds:
+            # Seed per file supaya menambah ukuran/jenis lain tidak mengubah file yang sudah ada
+            rng = random.Random(f"{seed}:{kind}:{size}")
+            ext = ".docx" if kind == "image_docx" else ".pdf"
+            path = os.path.join(out_dir, f"{kind}_{size}{ext}")
+            if kind == "text_pdf":
+                make_text_pdf(path, spec["pages"], rng)
+            elif kind == "scanned_pdf":
+                make_scanned_pdf(path, spec["pages"], rng)
+            elif kind == "mixed_pdf":
+                make_mixed_pdf(path, spec["pages"], rng)
+            else:
+                make_image_docx(path, spec["images"], rng)
+            manifest["files"].append({
+                "kind": kind,
+                "size": size,
+                "path": os.path.basename(path),
+                "pages": spec["pages"] if ext == ".pdf" else None,
+                "bytes": os.path.getsize(path),
+            })
+            print(f"  {path} ({os.path.getsize(path)/1024:.0f} KB)")
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Buat korpus benchmark sintetis")
+    parser.add_argument('--out', default='bench_corpus', help='Folder output korpus')
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['small', 'medium'])
+    parser.add_argument('--kinds', nargs='+', choices=KINDS, default=list(KINDS))
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+    print(f"Membuat korpus di {args.out} (seed={args.seed})...")
+    generate(args.out, args.sizes, args.kinds, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# benchmarks/runner.py
+"""Menjalankan benchmark kompresi & konversi pada korpus dari benchmarks.corpus.
+
+Setiap operasi dijalankan di proses anak sendiri, supaya RSS puncak yang dilaporkan
+memang milik operasi itu saja.
+
+    python -m benchmarks.runner --corpus bench_corpus --out hasil.json
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from utils.memory import peak_rss
+from version import __version__
+
+# operasi → (jenis file yang dipakai, varian)
+OPERATIONS = {
+    "compress_pdf": (("text_pdf", "scanned_pdf", "mixed_pdf"), (
+        {"level": "low"}, {"level": "medium"}, {"level": "high"},
+        {"level": "medium", "mode": "images"}, {"level": "medium", "mode": "hybrid"},
+    )),
+    "compress_docx": (("image_docx",), (
+        {"level": "low"}, {"level": "medium"}, {"level": "high"},
+    )),
+    "pdf_to_docx": (("text_pdf", "scanned_pdf", "mixed_pdf"), (
+        {"method": "pdf2docx"}, {"method": "pymupdf"}, {"method": "text_only"},
+    )),
+}
+
+
+def variant_name(variant: dict) -> str:
+    return ",".join(f"{k}={v}" for k, v in sorted(variant.items()))
+
+
+def _execute(op: str, variant: dict, input_path: str, output_path: str):
+    if op == "compress_pdf":
+        from conversion.compressor import DocumentCompressor
+        DocumentCompressor().compress_pdf(input_path, output_path, variant["level"],
+                                          mode=variant.get("mode", "raster"))
+    elif op == "compress_docx":
+        from conversion.compressor import DocumentCompressor
+        DocumentCompressor().compress_docx(input_path, output_path, variant["level"])
+    elif op == "pdf_to_docx":
+        from conversion.strategies import PdfToDocxStrategy
+        strategy = PdfToDocxStrategy(variant["method"])
+        if not strategy.convert(input_path, output_path):
+            raise RuntimeError("konversi gagal")
+    else:
+        raise ValueError(f"Operasi tidak dikenal: {op}")
+
+
+def _child(op: str, variant: dict, input_path: str, output_path: str, conn):
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+                contextlib.redirect_stderr(devnull):
+            start = time.perf_counter()
+            _execute(op, variant, input_path, output_path)
+            wall = time.perf_counter() - start
+        conn.send({"ok": True, "wall": wall, "peak_rss": peak_rss(),
+                   "bytes_out": os.path.getsize(output_path)})
+    except Exception as e:
+        conn.send({"ok": False, "error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_once(op: str, variant: dict, input_path: str, output_path: str, timeout: float) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_child, args=(op, variant, input_path, output_path, child_conn))
+    proc.start()
+    child_conn.close()
+    if not parent_conn.poll(timeout):
+        proc.kill()
+        proc.join()
+        return {"ok": False, "error": f"timeout > {timeout:.0f}s"}
+    result = parent_conn.recv()
+    proc.join()
+    return result
+
+
+def run(corpus_dir: str, ops=None, repeat: int = 3, timeout: float = 600.0, sizes=None) -> dict:
+    with open(os.path.join(corpus_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for op, (kinds, variants) in OPERATIONS.items():
+            if ops and op not in ops:
+                continue
+            for entry in manifest["files"]:
+                if entry["kind"] not in kinds or (sizes and entry["size"] not in sizes):
+                    continue
+                input_path = os.path.join(corpus_dir, entry["path"])
+                ext = ".docx" if op == "pdf_to_docx" else os.path.splitext(input_path)[1]
+                for variant in variants:
+                    output_path = os.path.join(tmp, f"out{ext}")
+                    runs = [run_once(op, variant, input_path, output_path, timeout) for _ in range(repeat)]
+                    results.append(_summarize(op, variant, entry, runs))
+                    _print_row(results[-1])
+
+    return {
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "corpus_seed": manifest.get("seed"),
+            "repeat": repeat,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def _summarize(op: str, variant: dict, entry: dict, runs: list) -> dict:
+    row = {
+        "op": op,
+        "variant": variant_name(variant),
+        "file": entry["path"],
+        "pages": entry["pages"],
+        "bytes_in": entry["bytes"],
+    }
+    ok = [r for r in runs if r["ok"]]
+    if not ok:
+        row["error"] = runs[-1]["error"]
+        return row
+    # Median wall time lebih tahan terhadap gangguan sesaat daripada rata-rata
+    wall = statistics.median(r["wall"] for r in ok)
+    row.update({
+        "wall_s": round(wall, 4),
+        "pages_per_s": round(entry["pages"] / wall, 2) if entry["pages"] else None,
+        "mb_per_s": round(entry["bytes"] / 1e6 / wall, 2),
+        "peak_rss": max(r["peak_rss"] or 0 for r in ok) or None,
+        "bytes_out": ok[-1]["bytes_out"],
+        "ratio": round(ok[-1]["bytes_out"] / entry["bytes"], 4),
+    })
+    return row
+
+
+def _print_row(row: dict):
+    label = f"{row['op']:14} {row['variant']:26} {row['file']:28}"
+    if "error" in row:
+        print(f"{label} GAGAL: {row['error']}")
+        return
+    pages = f"{row['pages_per_s']:8.1f} hlm/s" if row["pages_per_s"] else " " * 14
+    rss = f"{row['peak_rss']/1024/1024:7.1f} MB" if row["peak_rss"] else "    n/a"
+    print(f"{label} {row['wall_s']:8.3f}s {pages} {row['mb_per_s']:7.2f} MB/s {rss} ratio {row['ratio']:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark kompresi & konversi")
+    parser.add_argument('--corpus', default='bench_corpus', help='Folder korpus (berisi manifest.json)')
+    parser.add_argument('--out', default='bench_results.json', help='File hasil JSON')
+    parser.add_argument('--ops', nargs='+', choices=list(OPERATIONS))
+    parser.add_argument('--sizes', nargs='+', help='Batasi ke ukuran korpus tertentu')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=600.0, help='Batas waktu per run (detik)')
+    args = parser.parse_args()
+
+    report = run(args.corpus, args.ops, args.repeat, args.timeout, args.sizes)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan ke {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,17 +9,34 @@ from pathlib import Path
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(ROOT_DIR)
 
-from conversion.engine import create_conversion_engine
-from conversion.compressor import DocumentCompressor
+from conversion.cache import CompressionCache
 from utils.file_handler import FileHandler
+from utils import metrics
 
 
 class CLIConverter:
     def __init__(self):
-        self.engine = create_conversion_engine()
-        self.compressor = DocumentCompressor()
+        # Engine & compressor dibuat saat pertama dipakai: tiap perintah hanya
+        # memuat library yang benar-benar dibutuhkannya
+        self._engine = None
+        self._compressor = None
+        self._refresh_probe = False
         self.parser = self._setup_parser()
 
+    @property
+    def engine(self):
+        if self._engine is None:
+            from conversion.engine import create_conversion_engine
+            self._engine = create_conversion_engine(force=self._refresh_probe)
+        return self._engine
+
+    @property
+    def compressor(self):
+        if self._compressor is None:
+            from conversion.compressor import DocumentCompressor
+            self._compressor = DocumentCompressor()
+        return self._compressor
+
     def _setup_parser(self):
         parser = argparse.ArgumentParser(
             description="Document Converter & Compressor",
@@ -28,66 +45,190 @@ class CLIConverter:
 Contoh:
   python main.py doc-to-pdf input.docx output.pdf
   python main.py pdf-to-docx input.pdf output.docx --method pdf2docx
+  python main.py pdf-to-docx manual.pdf manual.docx --jobs 4
   python main.py pdf-to-doc input.pdf output.doc
+  python main.py doc-to-pdf laporan.docx laporan.pdf --renderer native
   python main.py compress file.pdf kecil.pdf --level high
+  python main.py compress scan.pdf kecil.pdf --jobs 4
+  python main.py compress laporan.pdf kecil.pdf --mode images
+  python main.py compress besar.pdf kecil.pdf --stream --max-memory 512
+  python main.py compress scan.pdf upload.pdf --target-size 2MB
+  python main.py convert-folder pdf_to_docx ./pdf/ ./docx/ --jobs 4
+  python main.py pdf-to-docx buku.pdf bab3.docx --pages 41-60
+  python main.py pdf-to-docx draft.pdf draft.docx --incremental
   python main.py compress-folder ./data/ ./output/ --force
+  python main.py convert-folder pdf_to_docx ./pdf/ ./docx/ --timeout 120 --max-rss 2048
+  python main.py --metrics-jsonl jobs.jsonl --metrics-prom docconv.prom compress-folder ./data/ ./output/
+  python main.py serve --port 8765 --workers 2
   python main.py list-supported
             """
         )
+        parser.add_argument('--refresh-probe', action='store_true',
+                            help='Deteksi ulang MS Word (abaikan cache deteksi)')
+        parser.add_argument('--metrics-jsonl', metavar='FILE',
+                            default=os.environ.get('DOCCONV_METRICS_JSONL'),
+                            help='Tambahkan satu baris JSON (timer per tahap, counter) per job ke file ini')
+        parser.add_argument('--metrics-prom', metavar='FILE',
+                            default=os.environ.get('DOCCONV_METRICS_PROM'),
+                            help='Tulis agregat metrics dalam format textfile Prometheus')
         sub = parser.add_subparsers(dest='command')
 
         # Konversi
         p = sub.add_parser('doc-to-pdf', help='DOC/DOCX → PDF')
         p.add_argument('input', help='File input')
         p.add_argument('output', help='File output')
+        p.add_argument('--renderer', choices=['auto', 'native', 'office'], default='auto',
+                       help='native: render DOCX di dalam proses tanpa Word; office: Word/LibreOffice')
+        self._add_page_options(p, incremental=False)
+        self._add_limit_options(p)
 
         p = sub.add_parser('pdf-to-docx', help='PDF → DOCX')
         p.add_argument('input', help='File input')
         p.add_argument('output', help='File output')
         p.add_argument('--method', choices=['auto', 'pdf2docx', 'pymupdf', 'text_only'], default='auto')
+        p.add_argument('--jobs', type=int, default=1,
+                       help='Jumlah proses worker; halaman dibagi per potongan (0 = semua core)')
+        self._add_page_options(p)
+        self._add_limit_options(p)
 
         p = sub.add_parser('pdf-to-doc', help='PDF → DOC (butuh MS Word)')
         p.add_argument('input', help='File input')
         p.add_argument('output', help='File output')
+        self._add_page_options(p)
+        self._add_limit_options(p)
+
+        p = sub.add_parser('convert-folder', help='Konversi semua file di folder')
+        p.add_argument('type', choices=['pdf_to_docx', 'doc_to_pdf', 'pdf_to_doc'], help='Tipe konversi')
+        p.add_argument('input_folder', help='Folder input')
+        p.add_argument('output_folder', help='Folder output (struktur folder dicerminkan)')
+        p.add_argument('--method', choices=['auto', 'pdf2docx', 'pymupdf', 'text_only'], default='auto',
+                       help='Metode untuk pdf_to_docx')
+        p.add_argument('--renderer', choices=['auto', 'native', 'office'], default='auto',
+                       help='Renderer untuk doc_to_pdf')
+        p.add_argument('--jobs', type=int, default=1, help='Jumlah proses worker (0 = semua core)')
+        p.add_argument('--force', action='store_true', help='Konversi ulang walaupun output sudah ada')
+        self._add_page_options(p)
+        self._add_limit_options(p)
 
         # Kompres
         p = sub.add_parser('compress', help='Kompres file')
         p.add_argument('input', help='File input')
         p.add_argument('output', help='File output')
-        p.add_argument('--level', choices=['low', 'medium', 'high'], default='medium')
+        self._add_compress_options(p)
 
         p = sub.add_parser('compress-folder', help='Kompres folder')
         p.add_argument('input_folder', help='Folder input')
         p.add_argument('output_folder', help='Folder output')
-        p.add_argument('--level', choices=['low', 'medium', 'high'], default='medium')
-        p.add_argument('--force', action='store_true')
+        self._add_compress_options(p)
 
         sub.add_parser('list-supported', help='Lihat konversi yang didukung')
 
+        # Server lokal
+        p = sub.add_parser('serve', help='Jalankan server job lokal (HTTP JSON) dengan engine yang tetap hangat')
+        p.add_argument('--host', default='127.0.0.1', help='Alamat bind (default hanya localhost)')
+        p.add_argument('--port', type=int, default=8765)
+        p.add_argument('--workers', type=int, default=2, help='Jumlah job yang berjalan bersamaan')
+        p.add_argument('--queue-size', type=int, default=100, help='Maksimum job dalam antrian')
+        p.add_argument('--drain-timeout', type=float, metavar='DETIK',
+                       help='Batas waktu menunggu job selesai saat berhenti')
+        p.add_argument('--no-cache', action='store_true', help='Matikan cache hasil kompresi')
+        p.add_argument('--cache-dir', help='Folder cache (default: ~/.cache/document-converter/compress)')
+        p.add_argument('--cache-size', type=int, default=CompressionCache.DEFAULT_MAX_MB, metavar='MB')
+
         return parser
 
+    def _add_compress_options(self, p):
+        p.add_argument('--level', choices=['low', 'medium', 'high'], default='medium')
+        p.add_argument('--jobs', type=int, default=1, help='Jumlah worker render PDF / gambar DOCX (0 = semua core)')
+        p.add_argument('--mode', choices=['raster', 'images', 'hybrid'],
+                       help='PDF saja. raster (default): halaman jadi gambar; images: kompres gambar saja, '
+                            'teks/vektor tetap; hybrid: rasterisasi hanya halaman yang didominasi gambar')
+        p.add_argument('--stream', action='store_true', help='Tulis output per batch halaman (memori terbatas)')
+        p.add_argument('--max-memory', type=int, metavar='MB', help='Batas memori mode streaming (MB)')
+        p.add_argument('--target-size', type=FileHandler.parse_size, metavar='SIZE',
+                       help='PDF saja. Cari pengaturan terbaik agar PDF muat di bawah ukuran ini (mis. 2MB)')
+        p.add_argument('--force', action='store_true', help='Kompres ulang walaupun hasil ada di cache')
+        p.add_argument('--no-cache', action='store_true', help='Matikan cache hasil kompresi')
+        p.add_argument('--cache-dir', help='Folder cache (default: ~/.cache/document-converter/compress)')
+        p.add_argument('--cache-size', type=int, default=CompressionCache.DEFAULT_MAX_MB, metavar='MB',
+                       help='Ukuran maksimum cache, entry terlama dibuang (LRU)')
+        p.add_argument('--cache-link', action='store_true',
+                       help='Hardlink hasil dari cache (jangan edit file output di tempat)')
+        self._add_page_options(p)
+        self._add_limit_options(p)
+
+    def _add_page_options(self, p, incremental: bool = True):
+        p.add_argument('--pages', type=FileHandler.parse_page_range, metavar='RANGE',
+                       help='Hanya halaman ini, mis. "1-3,7,10-" (nomor mulai dari 1)')
+        if incremental:
+            p.add_argument('--incremental', action='store_true',
+                           help='Pakai ulang hasil per halaman dari run sebelumnya; hanya halaman yang berubah diproses')
+
+    def _add_limit_options(self, p):
+        p.add_argument('--timeout', type=float, metavar='DETIK',
+                       help='Jalankan tiap job di proses terpisah dan hentikan kalau melewati batas waktu')
+        p.add_argument('--max-rss', type=int, metavar='MB',
+                       help='Jalankan tiap job di proses terpisah dan hentikan kalau RSS melewati batas')
+
+    @staticmethod
+    def _limits(args) -> dict:
+        limits = {'timeout': args.timeout, 'max_rss_mb': args.max_rss}
+        return {k: v for k, v in limits.items() if v}
+
+    @staticmethod
+    def _page_options(args) -> dict:
+        options = {'pages': args.pages, 'incremental': getattr(args, 'incremental', False)}
+        return {k: v for k, v in options.items() if v}
+
+    def _pdf_options(self, args) -> dict:
+        """Opsi kompresi khusus PDF yang diisi user (DocumentCompressor menolaknya untuk DOCX)."""
+        options = {'mode': args.mode, 'stream': args.stream, 'max_memory_mb': args.max_memory,
+                   'target_size': args.target_size, **self._page_options(args)}
+        return {k: v for k, v in options.items() if v}
+
+    def _setup_cache(self, args):
+        if args.no_cache:
+            self.compressor.cache = None
+            return
+        try:
+            self.compressor.cache = CompressionCache(args.cache_dir, args.cache_size, link=args.cache_link)
+        except OSError as e:
+            print(f"[WARN] Cache tidak bisa dipakai: {e}")
+            self.compressor.cache = None
+
     def run(self):
         args = self.parser.parse_args()
+        self._refresh_probe = args.refresh_probe
+        if args.metrics_jsonl or args.metrics_prom:
+            metrics.configure(args.metrics_jsonl, args.metrics_prom)
         if not args.command:
             self.parser.print_help()
             return
 
         try:
             if args.command == 'doc-to-pdf':
-                self.engine.convert('doc_to_pdf', args.input, args.output)
+                self.engine.convert('doc_to_pdf', args.input, args.output, renderer=args.renderer,
+                                    **self._page_options(args), **self._limits(args))
                 print("Konversi selesai!")
 
             elif args.command == 'pdf-to-docx':
-                self.engine.convert('pdf_to_docx', args.input, args.output, method=args.method)
+                self.engine.convert('pdf_to_docx', args.input, args.output, method=args.method, workers=args.jobs,
+                                    **self._page_options(args), **self._limits(args))
                 print("Konversi selesai!")
 
             elif args.command == 'pdf-to-doc':
-                self.engine.convert('pdf_to_doc', args.input, args.output)
+                self.engine.convert('pdf_to_doc', args.input, args.output, **self._page_options(args),
+                                    **self._limits(args))
                 print("Konversi selesai!")
 
+            elif args.command == 'convert-folder':
+                self._convert_folder(args)
+
             elif args.command == 'compress':
                 start = time.time()
-                self.compressor.compress(args.input, args.output, args.level)
+                self._setup_cache(args)
+                self.compressor.compress(args.input, args.output, args.level, force=args.force,
+                                         workers=args.jobs, **self._pdf_options(args), **self._limits(args))
                 size_in = os.path.getsize(args.input)
                 size_out = os.path.getsize(args.output)
                 reduction = 100 * (1 - size_out / size_in)
@@ -99,9 +240,40 @@ Contoh:
             elif args.command == 'list-supported':
                 self.engine.print_supported_conversions()
 
+            elif args.command == 'serve':
+                self._serve(args)
+
         except Exception as e:
             print(f"GAGAL: {e}")
 
+    def _convert_folder(self, args):
+        from conversion.batch import FolderConverter
+        kwargs = {'method': args.method} if args.type == 'pdf_to_docx' else {}
+        if args.type == 'doc_to_pdf':
+            kwargs['renderer'] = args.renderer
+        kwargs.update(self._page_options(args))
+        kwargs.update(self._limits(args))
+        converter = FolderConverter(self.engine)
+        summary = converter.run(args.type, args.input_folder, args.output_folder,
+                                workers=args.jobs, force=args.force, **kwargs)
+        converter.print_summary(summary)
+
+    def _serve(self, args):
+        from conversion.compressor import DocumentCompressor
+        from conversion.engine import ConversionEngine
+        from conversion.server import ConversionServer, JobManager
+        # Deteksi Word sekali saja; semua engine worker memakai hasilnya
+        has_ms_word = self.engine.has_ms_word
+
+        def make_compressor():
+            if args.no_cache:
+                return DocumentCompressor()
+            return DocumentCompressor(CompressionCache(args.cache_dir, args.cache_size))
+
+        manager = JobManager(lambda: ConversionEngine(has_ms_word), make_compressor,
+                             workers=args.workers, max_queue=args.queue_size)
+        ConversionServer(manager, args.host, args.port, args.drain_timeout).serve_forever()
+
     def _compress_folder(self, args):
         in_dir = Path(args.input_folder)
         out_dir = Path(args.output_folder)
@@ -115,20 +287,29 @@ Contoh:
             print("Tidak ada file PDF/DOCX.")
             return
 
+        self._setup_cache(args)
+        pdf_options = self._pdf_options(args)
+        if pdf_options and any(f.suffix.lower() == '.docx' for f in files):
+            print(f"[INFO] Opsi khusus PDF ({', '.join(pdf_options)}) tidak dipakai untuk file DOCX")
         print(f"Kompres {len(files)} file...")
         for i, f in enumerate(files, 1):  # Fixed typo: enumerate51 → enumerate(files, 1)
             rel = f.relative_to(in_dir)
             out = out_dir / f"compressed_{rel.name}"
             out.parent.mkdir(parents=True, exist_ok=True)
-            if not args.force and out.exists():
+            # Tanpa cache, satu-satunya petunjuk adalah file output yang sudah ada
+            if self.compressor.cache is None and not args.force and out.exists():
                 print(f"  [SKIP] {out}")
                 continue
             try:
-                self.compressor.compress(str(f), str(out), args.level)
+                options = pdf_options if f.suffix.lower() == '.pdf' else {}
+                self.compressor.compress(str(f), str(out), args.level, force=args.force,
+                                         workers=args.jobs, **options, **self._limits(args))
                 print(f"  [{i}] {rel} → {out.name}")
             except Exception as e:
                 print(f"  [ERROR] {f}: {e}")
 
+        if self.compressor.cache is not None:
+            self.compressor.cache.print_stats()
         print("SELESAI!")
 
 
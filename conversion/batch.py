@@ -0,0 +1,131 @@
+# conversion/batch.py
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from .engine import ConversionEngine
+from utils import metrics
+
+# Satu engine "hangat" per proses worker, dipakai ulang untuk semua file
+_worker_engine = None
+
+
+def _init_worker(has_ms_word: bool):
+    global _worker_engine
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_engine = ConversionEngine(has_ms_word)
+
+
+def _convert_one(engine, conversion_type: str, input_file: str, output_file: str, kwargs: dict):
+    start = time.perf_counter()
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    # Output per file dibungkam supaya log batch tidak saling tumpang tindih antar worker
+    with contextlib.redirect_stdout(io.StringIO()):
+        ok = engine.convert(conversion_type, input_file, output_file, **kwargs)
+    error = None if ok else (engine.last_error or "konversi gagal")
+    # Keputusan preflight (mode auto) ikut dilaporkan karena output per file dibungkam
+    info = engine.last_preflight
+    note = f"{info['method']}: {info['reasons'][0]}" if info and info.get('method') else None
+    report = engine.last_report
+    if report and not report['faithful']:
+        note = "renderer native, tidak setia: " + ", ".join(sorted(report['unsupported']))
+    return ok, error, time.perf_counter() - start, note, engine.last_metrics
+
+
+def _convert_in_worker(conversion_type: str, input_file: str, output_file: str, kwargs: dict):
+    return _convert_one(_worker_engine, conversion_type, input_file, output_file, kwargs)
+
+
+class FolderConverter:
+    def __init__(self, engine: ConversionEngine):
+        self.engine = engine
+
+    def plan(self, conversion_type: str, in_dir: Path, out_dir: Path, force: bool = False):
+        info = self.engine.get_supported_conversions()[conversion_type]
+        if not info['ok']:
+            raise ValueError(f"Konversi {info['desc']} tidak tersedia di sistem ini")
+        jobs, skipped = [], []
+        for f in sorted(in_dir.rglob('*')):
+            if not f.is_file() or f.suffix.lower() not in info['in']:
+                continue
+            # Struktur folder input dicerminkan ke folder output
+            out = out_dir / f.relative_to(in_dir).with_suffix(info['out'])
+            if not force and out.exists() and out.stat().st_mtime >= f.stat().st_mtime:
+                skipped.append((f, out))
+            else:
+                jobs.append((f, out))
+        return jobs, skipped
+
+    def run(self, conversion_type: str, in_dir: str, out_dir: str, workers: int = 1,
+            force: bool = False, **kwargs) -> dict:
+        in_dir, out_dir = Path(in_dir), Path(out_dir)
+        if not in_dir.is_dir():
+            raise FileNotFoundError(f"Folder input tidak ada: {in_dir}")
+        jobs, skipped = self.plan(conversion_type, in_dir, out_dir, force)
+        workers = min(workers or os.cpu_count() or 1, max(1, len(jobs)))
+        print(f"Konversi {len(jobs)} file ({len(skipped)} dilewati), {workers} worker...")
+        for f, out in skipped:
+            print(f"  [SKIP] {f.relative_to(in_dir)}")
+
+        start = time.perf_counter()
+        failures = []
+        bytes_in = 0
+        done = 0
+
+        def report(f, out, result):
+            nonlocal done, bytes_in
+            ok, error, elapsed, note, _ = result
+            done += 1
+            rel = f.relative_to(in_dir)
+            if ok:
+                bytes_in += f.stat().st_size
+                print(f"  [{done}/{len(jobs)}] {rel} → {out.name} ({elapsed:.2f}s)")
+                if note:
+                    print(f"        {note}")
+            else:
+                failures.append((str(rel), error))
+                print(f"  [ERROR] {rel}: {error}")
+
+        if workers <= 1:
+            for f, out in jobs:
+                report(f, out, _convert_one(self.engine, conversion_type, str(f), str(out), kwargs))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.engine.has_ms_word,)) as ex:
+                futures = {ex.submit(_convert_in_worker, conversion_type, str(f), str(out), kwargs): (f, out)
+                           for f, out in jobs}
+                for future in as_completed(futures):
+                    f, out = futures[future]
+                    try:
+                        result = future.result()
+                        # Worker tidak menulis metrics sendiri; record-nya dikirim lewat proses ini
+                        metrics.emit(result[4])
+                    except Exception as e:
+                        # Worker mati (crash) → catat sebagai gagal, lanjut ke file berikutnya
+                        result = (False, f"worker error: {e}", 0.0, None, None)
+                    report(f, out, result)
+
+        wall = time.perf_counter() - start
+        return {
+            'total': len(jobs) + len(skipped),
+            'converted': len(jobs) - len(failures),
+            'skipped': len(skipped),
+            'failed': len(failures),
+            'failures': failures,
+            'wall': wall,
+            'files_per_s': (len(jobs) - len(failures)) / wall if wall > 0 else 0.0,
+            'mb_per_s': bytes_in / 1e6 / wall if wall > 0 else 0.0,
+        }
+
+    @staticmethod
+    def print_summary(summary: dict):
+        print("-" * 45)
+        print(f"Total: {summary['total']} | Berhasil: {summary['converted']} | "
+              f"Dilewati: {summary['skipped']} | Gagal: {summary['failed']}")
+        print(f"Waktu: {summary['wall']:.2f}s | {summary['files_per_s']:.2f} file/s | "
+              f"{summary['mb_per_s']:.2f} MB/s")
+        for name, error in summary['failures']:
+            print(f"  GAGAL {name}: {error}")
+        print("-" * 45)
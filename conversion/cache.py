@@ -0,0 +1,225 @@
+# conversion/cache.py
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from pathlib import Path
+from utils.file_handler import FileHandler
+from version import __version__
+
+
+def _load_totals(path: Path) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"hits": 0, "misses": 0}
+
+
+def _flush_pending(path: Path, pending: dict, lock):
+    with lock:
+        if not any(pending.values()):
+            return
+        totals = _load_totals(path)
+        for field, value in pending.items():
+            totals[field] = totals.get(field, 0) + value
+        try:
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(totals, f)
+            os.replace(tmp, path)
+        except OSError:
+            FileHandler.safe_delete(tmp)
+            return
+        for field in pending:
+            pending[field] = 0
+
+
+class CompressionCache:
+    """Cache hasil kompresi di disk, dengan key dari hash isi file input + pengaturan."""
+
+    DEFAULT_MAX_MB = 2048
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, cache_dir: str = None, max_size_mb: int = DEFAULT_MAX_MB, link: bool = False):
+        self.cache_dir = Path(cache_dir) if cache_dir else FileHandler.get_cache_dir("compress")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_size_mb * 1024 * 1024
+        self.link = link
+        self.hits = 0
+        self.misses = 0
+        # Total lintas run: ditambah di memori, ditulis ke stats.json sesekali (lihat flush_stats)
+        self._pending = {"hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+        self._watch_pending()
+
+    def __getstate__(self):
+        # Lock tidak bisa di-pickle (proses anak dengan start method "spawn", lihat isolation.py)
+        state = self.__dict__.copy()
+        del state["_stats_lock"]
+        # Hit/miss yang belum tercatat tetap milik proses ini, jangan ikut dihitung dua kali
+        state["_pending"] = dict.fromkeys(self._pending, 0)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stats_lock = threading.Lock()
+        self._watch_pending()
+
+    def _watch_pending(self):
+        # Sisa hit/miss ditulis saat cache dibuang atau saat proses keluar. finalize (bukan
+        # atexit.register per instance) tidak menahan cache tetap hidup, mis. PageCache per job di server
+        weakref.finalize(self, _flush_pending, self._stats_path(), self._pending, self._stats_lock)
+
+    @classmethod
+    def file_digest(cls, path: str) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(cls.CHUNK_SIZE), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def make_key(self, input_path: str, **params) -> str:
+        payload = {
+            "input": self.file_digest(input_path),
+            "ext": Path(input_path).suffix.lower(),
+            "version": __version__,
+            "params": {k: v for k, v in params.items() if v is not None and v is not False},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def fetch(self, key: str, output_path: str) -> bool:
+        entry = self._entry_path(key)
+        if not entry.is_file():
+            self.misses += 1
+            self._record("misses")
+            return False
+        # mtime dipakai sebagai penanda "terakhir dipakai" untuk LRU
+        os.utime(entry)
+        FileHandler.safe_delete(output_path)
+        if self.link:
+            try:
+                os.link(entry, output_path)
+            except OSError:
+                shutil.copyfile(entry, output_path)
+        else:
+            shutil.copyfile(entry, output_path)
+        self.hits += 1
+        self._record("hits")
+        return True
+
+    def store(self, key: str, output_path: str):
+        entry = self._entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        # Tulis ke file sementara dulu lalu rename, supaya entry tidak pernah setengah jadi
+        fd, tmp = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(output_path, tmp)
+            os.replace(tmp, entry)
+        finally:
+            FileHandler.safe_delete(tmp)
+        self.evict()
+        self.flush_stats()
+
+    def _entries(self):
+        return [p for p in self.cache_dir.glob("*/*") if p.is_file() and p.suffix != ".tmp"]
+
+    def evict(self):
+        entries = [(p, p.stat()) for p in self._entries()]
+        total = sum(st.st_size for _, st in entries)
+        if total <= self.max_bytes:
+            return
+        for path, st in sorted(entries, key=lambda e: e[1].st_mtime):
+            if total <= self.max_bytes:
+                break
+            if FileHandler.safe_delete(str(path)):
+                total -= st.st_size
+
+    def clear(self):
+        for path in self._entries():
+            FileHandler.safe_delete(str(path))
+
+    def _stats_path(self) -> Path:
+        return self.cache_dir / "stats.json"
+
+    def _load_totals(self) -> dict:
+        return _load_totals(self._stats_path())
+
+    def _record(self, field: str):
+        with self._stats_lock:
+            self._pending[field] += 1
+
+    def flush_stats(self):
+        """Tambahkan hit/miss yang belum tercatat ke stats.json (tulis ke file sementara lalu rename)."""
+        _flush_pending(self._stats_path(), self._pending, self._stats_lock)
+
+    def stats(self) -> dict:
+        self.flush_stats()
+        entries = self._entries()
+        totals = self._load_totals()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'total_hits': totals.get("hits", 0),
+            'total_misses': totals.get("misses", 0),
+            'entries': len(entries),
+            'size': sum(p.stat().st_size for p in entries),
+            'max_size': self.max_bytes,
+        }
+
+    def print_stats(self):
+        st = self.stats()
+        lookups = st['hits'] + st['misses']
+        rate = 100 * st['hits'] / lookups if lookups else 0
+        print(f"Cache: {st['hits']} hit, {st['misses']} miss ({rate:.0f}% hit) | "
+              f"{st['entries']} entry, {st['size']/1024/1024:.1f}/{st['max_size']/1024/1024:.0f} MB | "
+              f"total: {st['total_hits']} hit, {st['total_misses']} miss")
+
+
+class PageCache(CompressionCache):
+    """Hasil per halaman (JPEG render, potongan DOCX) dengan key dari sidik jari isi halaman.
+
+    Dipakai mode incremental: halaman yang tidak berubah sejak run sebelumnya tidak diproses ulang.
+    Statistik hanya dihitung di memori dan eviction dijalankan sekali per dokumen (evict()).
+    """
+
+    DEFAULT_MAX_MB = 1024
+
+    def __init__(self, cache_dir: str = None, max_size_mb: int = DEFAULT_MAX_MB):
+        super().__init__(cache_dir or FileHandler.get_cache_dir("pages"), max_size_mb)
+
+    def make_page_key(self, fingerprint: str, **params) -> str:
+        payload = {"page": fingerprint, "version": __version__, "params": params}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str):
+        entry = self._entry_path(key)
+        try:
+            data = entry.read_bytes()
+        except OSError:
+            self.misses += 1
+            return None
+        os.utime(entry)
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        entry = self._entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, entry)
+        finally:
+            FileHandler.safe_delete(tmp)
@@ -1,112 +1,759 @@
 # conversion/compressor.py
 import fitz  # PyMuPDF
-from docx import Document
-from docx.shared import Inches
 from PIL import Image
 import io
+import json
 from pathlib import Path
 import os
+import shutil
+import zipfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 from utils.file_handler import FileHandler
+from utils.memory import current_rss, peak_rss, format_mb
+from .pdf_stream_writer import StreamingPdfWriter
+from .cache import CompressionCache
+from .pdf_analysis import classify_page, page_fingerprint
+from .docx_package import scan_image_extents, EMU_PER_INCH
+from .shared_input import SharedInput, attach_input
+from .sources import as_file, copy_source, describe, is_data, open_pdf, output_size, read_source, \
+    reset_output, sniff_format, source_size
+from utils import metrics
+
+
+def _open_pdf(input_path: str, verbose: bool = True):
+    # Buka PDF dengan mode bypass
+    try:
+        doc = open_pdf(input_path)
+    except:
+        if verbose:
+            print("[INFO] PDF terkunci! Membuka dengan mode bypass...")
+        doc = open_pdf(input_path, filetype="pdf", relaxed=True)
+
+    # Unlock paksa kalau masih encrypted (99% PDF kuliah)
+    if doc.is_encrypted:
+        if verbose:
+            print("[INFO] PDF terenkripsi! Mencoba decrypt otomatis...")
+        if doc.authenticate("") == 0:
+            try:
+                doc._deleteObject(doc._xref_get_key(doc._xref_len() - 1)[1])
+                doc._updateStreamLengths()
+                if verbose:
+                    print("[SUKSES] PDF berhasil di-unlock secara paksa!")
+            except:
+                if verbose:
+                    print("[GAGAL] Tidak bisa unlock. Coba print to PDF dulu.")
+    return doc
+
+
+def _render_page(doc, page_num: int, zoom: float, quality: int, seen: set = None):
+    page = doc.load_page(page_num)
+    with metrics.stage("render"):
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    # Sidik jari pixmap: halaman yang hasil render-nya identik cukup di-encode sekali
+    digest = (pix.digest, pix.width, pix.height)
+    if seen is not None and digest in seen:
+        img_bytes = None
+    else:
+        with metrics.stage("encode"):
+            img_bytes = pix.tobytes("jpeg", jpg_quality=quality)
+        if seen is not None:
+            seen.add(digest)
+    return page.rect.width, page.rect.height, img_bytes, (pix.width, pix.height), digest
+
+
+# Setiap proses worker membuka PDF sumber sendiri, sekali saja, langsung dari buffer bersama
+_worker_doc = None
+
+
+def _init_render_worker(source):
+    global _worker_doc
+    _worker_doc = _open_pdf(attach_input(source), verbose=False)
+
+
+def _render_chunk(page_numbers, zoom: float, quality: int, seen: frozenset):
+    seen = set(seen)
+    # Timer worker dikembalikan bersama hasilnya dan digabung ke job di proses induk
+    with metrics.job("render", emit_record=False) as job:
+        pages = [_render_page(_worker_doc, n, zoom, quality, seen) for n in page_numbers]
+    return pages, job.to_dict()
+
+
+def _unlink_hardlink(path: str):
+    # Output dari --cache-link berbagi isi dengan entry cache; menulis di tempat akan ikut mengubah entry itu
+    try:
+        if os.stat(path).st_nlink > 1:
+            os.unlink(path)
+    except OSError:
+        pass
+
+
+def _pack_page(rendered) -> bytes:
+    # Entri cache halaman: satu baris header JSON lalu data JPEG
+    width, height, img_bytes, (pix_w, pix_h), digest = rendered
+    header = json.dumps([width, height, pix_w, pix_h, digest[0].hex(), digest[1], digest[2]])
+    return header.encode() + b"\n" + img_bytes
+
+
+def _unpack_page(data: bytes):
+    header, img_bytes = data.split(b"\n", 1)
+    width, height, pix_w, pix_h, digest, dig_w, dig_h = json.loads(header)
+    return width, height, img_bytes, (pix_w, pix_h), (bytes.fromhex(digest), dig_w, dig_h)
 
 
 class DocumentCompressor:
     LEVELS = {"low": 0.5, "medium": 0.3, "high": 0.1}
+    # "raster": tiap halaman jadi JPEG; "images": hanya gambar di dalam PDF yang dikompres ulang
+    # "hybrid": hanya halaman yang didominasi gambar dirasterisasi, sisanya disalin utuh
+    MODES = ("raster", "images", "hybrid")
+    # Target DPI efektif gambar untuk mode "images"
+    IMAGE_DPI = {"low": 150, "medium": 110, "high": 72}
+    # Jumlah potongan halaman per worker, supaya beban tetap rata
+    CHUNKS_PER_WORKER = 4
+    # Jumlah halaman per batch pada mode streaming (diperkecil otomatis kalau memori lewat batas)
+    STREAM_BATCH_PAGES = 64
+    # Kandidat pengaturan untuk target ukuran, urut dari kualitas terbaik
+    TARGET_ZOOMS = (1.0, 0.75, 0.6, 0.5, 0.4, 0.3, 0.2, 0.15, 0.1)
+    TARGET_QUALITIES = (85, 75, 65, 55, 45, 35, 25)
+    TARGET_MIN_QUALITY = 45
+    TARGET_SAMPLE_PAGES = 5
+    TARGET_SAFETY = 0.92
+    PAGE_OVERHEAD = 250
+    PDF_OVERHEAD = 2048
+    # Gambar DOCX yang dikompres ulang; format lain (EMF, GIF, ...) disalin apa adanya
+    DOCX_IMAGE_FORMATS = {".jpg": "JPEG", ".jpeg": "JPEG", ".png": "PNG"}
+    DOCX_MIN_IMAGE_BYTES = 16 * 1024
+    # Resolusi gambar DOCX relatif terhadap ukuran tampilnya di dokumen
+    DOCX_DPI = {"low": 220, "medium": 150, "high": 96}
+    # Hasil baru dipakai hanya kalau minimal 5% lebih kecil
+    DOCX_MIN_GAIN = 0.95
+    COPY_CHUNK_SIZE = 1024 * 1024
+    # Opsi yang tidak mengubah isi output, jadi tidak ikut menjadi key cache
+    CACHE_NEUTRAL_OPTIONS = {"workers", "max_memory_mb", "incremental"}
+    # Opsi compress_pdf yang tidak berlaku untuk DOCX
+    PDF_ONLY_OPTIONS = ("mode", "stream", "max_memory_mb", "target_size", "pages", "incremental")
 
-    def compress_pdf(self, input_path: str, output_path: str, level: str = "medium") -> str:
-        FileHandler.validate_file_exists(input_path)
-        FileHandler.validate_file_extension(input_path, ['.pdf'])
+    def __init__(self, cache: CompressionCache = None):
+        self.cache = cache
 
-        zoom = self.LEVELS.get(level, 0.3)
-        mat = fitz.Matrix(zoom, zoom)
-        
-        # Buka PDF dengan mode bypass
+    def _iter_rendered_pages(self, doc, input_path: str, page_numbers, zoom: float,
+                             quality: int, workers: int = 1, seen: set = None, page_cache=None):
+        seen = set() if seen is None else seen
+        if page_cache is None:
+            yield from self._render_pages(doc, input_path, page_numbers, zoom, quality, workers, seen)
+            return
+
+        # Mode incremental: halaman yang sidik jari isinya sudah ada di cache tidak dirender ulang
+        page_numbers = list(page_numbers)
+        with metrics.stage("fingerprint"):
+            fonts = {}
+            keys = {n: page_cache.make_page_key(page_fingerprint(doc, n, fonts), kind="jpeg", zoom=zoom,
+                                                quality=quality)
+                    for n in page_numbers}
+        cached = {}
+        for n in page_numbers:
+            data = page_cache.get(keys[n])
+            if data is not None:
+                cached[n] = _unpack_page(data)
+        metrics.count("pages_cached", len(cached))
+        missing = [n for n in page_numbers if n not in cached]
+        rendered = self._render_pages(doc, input_path, missing, zoom, quality, workers, seen)
         try:
-            doc = fitz.open(input_path)
-        except:
-            print("[INFO] PDF terkunci! Membuka dengan mode bypass...")
-            doc = fitz.open(filename=input_path, filetype="pdf", relaxed=True)
+            for n in page_numbers:
+                if n in cached:
+                    page = cached[n]
+                    seen.add(page[4])
+                else:
+                    page = next(rendered)
+                    if page[2] is not None:
+                        page_cache.put(keys[n], _pack_page(page))
+                yield page
+        finally:
+            rendered.close()
 
-        # Unlock paksa kalau masih encrypted (99% PDF kuliah)
-        if doc.is_encrypted:
-            print("[INFO] PDF terenkripsi! Mencoba decrypt otomatis...")
-            if doc.authenticate("") == 0:
-                try:
-                    doc._deleteObject(doc._xref_get_key(doc._xref_len() - 1)[1])
-                    doc._updateStreamLengths()
-                    print("[SUKSES] PDF berhasil di-unlock secara paksa!")
-                except:
-                    print("[GAGAL] Tidak bisa unlock. Coba print to PDF dulu.")
+    def _render_pages(self, doc, input_path: str, page_numbers, zoom: float,
+                      quality: int, workers: int, seen: set):
+        # Halaman yang sidik jarinya sudah ada di `seen` dikembalikan dengan img_bytes None;
+        # pemanggil wajib memakai ulang gambar yang sudah disisipkan sebelumnya
+        page_numbers = list(page_numbers)
+        workers = min(workers or os.cpu_count() or 1, len(page_numbers))
+        if workers <= 1:
+            for page_num in page_numbers:
+                yield _render_page(doc, page_num, zoom, quality, seen)
+            return
+
+        # Potong halaman berurutan; ex.map mengembalikan hasil sesuai urutan halaman
+        size = -(-len(page_numbers) // (workers * self.CHUNKS_PER_WORKER))
+        chunks = [page_numbers[i:i + size] for i in range(0, len(page_numbers), size)]
+        # Worker membaca input lewat mmap/shared memory, bukan salinan per worker
+        with SharedInput(input_path) as source, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                                    initargs=(source,)) as ex:
+            known = frozenset(seen)
+            for rendered, record in ex.map(_render_chunk, chunks, repeat(zoom), repeat(quality), repeat(known)):
+                metrics.merge(record)
+                for page in rendered:
+                    seen.add(page[4])
+                    yield page
+
+    def compress_pdf(self, input_path: str, output_path: str, level: str = "medium",
+                     workers: int = 1, mode: str = "raster", stream: bool = False,
+                     max_memory_mb: int = None, target_size: int = None, pages=None,
+                     incremental: bool = False) -> str:
+        # input_path boleh bytes dan output_path boleh file-like (lihat compress_stream)
+        if not is_data(input_path):
+            FileHandler.validate_file_exists(input_path)
+            FileHandler.validate_file_extension(input_path, ['.pdf'])
+        if mode not in self.MODES:
+            raise ValueError(f"Mode kompresi tidak dikenal: {mode}. Harus: {', '.join(self.MODES)}")
+        stream = stream or max_memory_mb is not None
+        if stream and mode != "raster":
+            raise ValueError("Mode streaming hanya tersedia untuk mode raster")
+        if target_size and mode != "raster":
+            raise ValueError("Target ukuran hanya tersedia untuk mode raster")
 
+        with metrics.job("compress", format="pdf", level=level, mode=mode):
+            return self._compress_pdf_job(input_path, output_path, level, workers, mode, stream,
+                                          max_memory_mb, target_size, pages, incremental)
+
+    def _compress_pdf_job(self, input_path: str, output_path: str, level: str, workers: int,
+                          mode: str, stream: bool, max_memory_mb: int, target_size: int,
+                          pages=None, incremental: bool = False) -> str:
+        size_in = source_size(input_path)
+        with metrics.stage("open"):
+            doc = _open_pdf(input_path)
+            if pages:
+                doc, input_path = self._select_pages(doc, pages)
         total_pages = len(doc)
-        print(f"Kompresi PDF: {total_pages} halaman, level={level}...")
+        metrics.count("pages", total_pages)
+        print(f"Kompresi PDF: {total_pages} halaman, level={level}, mode={mode}...")
 
-        out_doc = fitz.open()
-        
-        for page_num in range(total_pages):
-            page = doc.load_page(page_num)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-            img_bytes = pix.tobytes("jpeg", jpg_quality=45 if level == "high" else 65)
-            new_page = out_doc.new_page(width=page.rect.width, height=page.rect.height)
-            new_page.insert_image(new_page.rect, stream=img_bytes)
+        page_cache = None
+        if incremental and mode == "images":
+            print("[INFO] Mode images tidak memakai cache per halaman, --incremental diabaikan")
+        elif incremental:
+            from .cache import PageCache
+            page_cache = PageCache()
 
-        # SIMPAN TANPA linear=True → FIX ERROR CODE 4
-        out_doc.save(
-            output_path,
-            garbage=4,
-            deflate=True,
-            clean=True,
-            no_new_id=True
-            # linear=True → SUDAH TIDAK SUPPORT LAGI!
-        )
-        out_doc.close()
+        if mode == "images":
+            self._compress_pdf_images(doc, output_path, level)
+        elif mode == "hybrid":
+            self._compress_pdf_hybrid(doc, input_path, output_path, level, workers, page_cache)
+        elif target_size:
+            self._compress_pdf_target(doc, input_path, output_path, target_size, workers, stream,
+                                      max_memory_mb, page_cache)
+        else:
+            zoom = self.LEVELS.get(level, 0.3)
+            quality = 45 if level == "high" else 65
+            self._rasterize(doc, input_path, output_path, zoom, quality, workers, stream, max_memory_mb,
+                            page_cache)
         doc.close()
 
-        size_in = os.path.getsize(input_path)
-        size_out = os.path.getsize(output_path)
+        if page_cache is not None:
+            page_cache.evict()
+            print(f"[INCREMENTAL] {page_cache.hits}/{page_cache.hits + page_cache.misses} halaman dari cache, "
+                  f"{page_cache.misses} dirender ulang")
+        size_out = output_size(output_path)
+        metrics.count("bytes_in", size_in)
+        metrics.count("bytes_out", size_out)
         reduction = 100 * (1 - size_out / size_in)
-        print(f"[SELESAI] PDF terkompres → {output_path}")
+        print(f"[SELESAI] PDF terkompres → {describe(output_path)}")
         print(f"   Ukuran: {size_in/1024:.1f} KB → {size_out/1024:.1f} KB (-{reduction:.1f}%)")
         return output_path
 
-    def compress_docx(self, input_path: str, output_path: str, level: str = "medium") -> str:
-        FileHandler.validate_file_exists(input_path)
-        FileHandler.validate_file_extension(input_path, ['.docx'])
+    def _select_pages(self, doc, pages):
+        """PDF baru di memori yang hanya berisi halaman terpilih; dipakai sebagai sumber kompresi."""
+        ranges = FileHandler.resolve_page_ranges(pages, len(doc))
+        subset = fitz.open()
+        for start, end in ranges:
+            subset.insert_pdf(doc, from_page=start, to_page=end - 1)
+        data = subset.tobytes()
+        subset.close()
+        doc.close()
+        return _open_pdf(data, verbose=False), data
+
+    def _rasterize(self, doc, input_path: str, output_path: str, zoom: float, quality: int,
+                   workers: int, stream: bool, max_memory_mb: int = None, page_cache=None):
+        reset_output(output_path)
+        if stream:
+            self._compress_pdf_stream(input_path, output_path, len(doc), zoom, quality, workers, max_memory_mb,
+                                      page_cache)
+        else:
+            self._compress_pdf_raster(doc, input_path, output_path, zoom, quality, workers, page_cache)
 
-        quality = 45 if level == "high" else 65 if level == "medium" else 85
-        doc = Document(input_path)
-        new_doc = Document()
+    def _compress_pdf_raster(self, doc, input_path: str, output_path: str, zoom: float,
+                             quality: int, workers: int, page_cache=None):
+        out_doc = fitz.open()
+        xrefs = {}
+
+        rendered = self._iter_rendered_pages(doc, input_path, range(len(doc)), zoom, quality, workers,
+                                             page_cache=page_cache)
+        for page in rendered:
+            with metrics.stage("write"):
+                self._insert_rendered_page(out_doc, page, xrefs)
+        self._print_duplicates(len(doc), len(xrefs))
 
-        for para in doc.paragraphs:
-            p = new_doc.add_paragraph(para.text)
-            p.style = para.style
+        # SIMPAN TANPA linear=True → FIX ERROR CODE 4
+        with metrics.stage("save"):
+            out_doc.save(
+                output_path,
+                garbage=4,
+                deflate=True,
+                clean=True,
+                no_new_id=True
+                # linear=True → SUDAH TIDAK SUPPORT LAGI!
+            )
+        out_doc.close()
 
-        for rel in doc.part.related_parts.values():
-            if "image" not in rel.content_type:
+    def _insert_rendered_page(self, out_doc, rendered, xrefs: dict):
+        width, height, img_bytes, _, digest = rendered
+        new_page = out_doc.new_page(width=width, height=height)
+        if digest in xrefs:
+            new_page.insert_image(new_page.rect, xref=xrefs[digest])
+        else:
+            xrefs[digest] = new_page.insert_image(new_page.rect, stream=img_bytes)
+
+    def _compress_pdf_hybrid(self, doc, input_path: str, output_path: str, level: str, workers: int,
+                             page_cache=None):
+        zoom = self.LEVELS.get(level, 0.3)
+        quality = 45 if level == "high" else 65
+        with metrics.stage("classify"):
+            kinds = [classify_page(page)[0] for page in doc]
+        raster_pages = [n for n, kind in enumerate(kinds) if kind == "raster"]
+
+        out_doc = fitz.open()
+        xrefs = {}
+        rendered = self._iter_rendered_pages(doc, input_path, raster_pages, zoom, quality, workers,
+                                             page_cache=page_cache)
+        page_num = 0
+        while page_num < len(kinds):
+            if kinds[page_num] == "raster":
+                page = next(rendered)
+                with metrics.stage("write"):
+                    self._insert_rendered_page(out_doc, page, xrefs)
+                page_num += 1
                 continue
-            try:
-                img_data = rel.blob
-                img = Image.open(io.BytesIO(img_data))
-                img_io = io.BytesIO()
-                img = img.convert("RGB")
-                img.save(img_io, format='JPEG', quality=quality, optimize=True, subsampling=2)
-                img_io.seek(0)
+            # Salin deretan halaman "keep" sekaligus supaya resource bersama tidak terduplikasi
+            end = page_num
+            while end + 1 < len(kinds) and kinds[end + 1] == "keep":
+                end += 1
+            with metrics.stage("write"):
+                out_doc.insert_pdf(doc, from_page=page_num, to_page=end)
+            page_num = end + 1
+        rendered.close()
+
+        print(f"   Halaman: {len(kinds) - len(raster_pages)} dipertahankan, "
+              f"{len(raster_pages)} dirasterisasi")
+        # Tanpa clean=True supaya content stream halaman yang disalin tidak diubah
+        with metrics.stage("save"):
+            out_doc.save(output_path, garbage=4, deflate=True, no_new_id=True)
+        out_doc.close()
 
-                p = new_doc.add_paragraph()
-                run = p.add_run()
-                run.add_picture(img_io, width=Inches(5.5))
-                p.alignment = 1
+    def _compress_pdf_stream(self, input_path: str, output_path: str, total_pages: int,
+                             zoom: float, quality: int, workers: int, max_memory_mb: int = None,
+                             page_cache=None):
+        limit = max_memory_mb * 1024 * 1024 if max_memory_mb else None
+        batch = self.STREAM_BATCH_PAGES
+        image_ids = {}
+
+        with StreamingPdfWriter(output_path) as writer:
+            start = 0
+            while start < total_pages:
+                pages = range(start, min(start + batch, total_pages))
+                # Buka ulang sumber per batch supaya cache objek MuPDF ikut dibuang
+                src = _open_pdf(input_path, verbose=False)
+                try:
+                    rendered = self._iter_rendered_pages(src, input_path, pages, zoom, quality,
+                                                         workers, set(image_ids), page_cache)
+                    for width, height, img_bytes, (pix_w, pix_h), digest in rendered:
+                        with metrics.stage("write"):
+                            if digest not in image_ids:
+                                image_ids[digest] = writer.add_jpeg(img_bytes, pix_w, pix_h)
+                            writer.add_image_page(width, height, image_ids[digest])
+                finally:
+                    src.close()
+                with metrics.stage("write"):
+                    writer.flush()
+                fitz.TOOLS.store_shrink(100)
+                start = pages.stop
+
+                rss = current_rss()
+                if limit and rss and rss > limit and batch > 1:
+                    batch = max(1, batch // 2)
+                    print(f"[INFO] Memori {format_mb(rss)} melewati batas {max_memory_mb} MB, "
+                          f"batch diperkecil ke {batch} halaman")
+
+        self._print_duplicates(total_pages, len(image_ids))
+        limit_info = f" (batas {max_memory_mb} MB)" if max_memory_mb else ""
+        print(f"   Memori puncak: {format_mb(peak_rss())}{limit_info}")
+
+    def _compress_pdf_target(self, doc, input_path: str, output_path: str, target_size: int,
+                             workers: int, stream: bool, max_memory_mb: int = None, page_cache=None):
+        size_in = source_size(input_path)
+        if size_in <= target_size:
+            # Rasterisasi hanya akan memperbesar file dan menghilangkan teksnya
+            print(f"   Input {size_in/1024:.0f} KB sudah di bawah target {target_size/1024:.0f} KB, "
+                  f"disalin tanpa kompresi")
+            copy_source(input_path, output_path)
+            return
+        zoom, quality, estimate = self._plan_target_size(doc, target_size)
+        print(f"   Target {target_size/1024:.0f} KB → zoom={zoom:g}, quality={quality} "
+              f"(perkiraan {estimate/1024:.0f} KB)")
+        self._rasterize(doc, input_path, output_path, zoom, quality, workers, stream, max_memory_mb, page_cache)
+
+        # Perkiraan dari sampel bisa meleset; koreksi paling banyak satu kali
+        size_out = output_size(output_path)
+        if size_out > target_size:
+            settings = self._shrink_settings(zoom, quality, target_size / size_out)
+            if settings == (zoom, quality):
+                print("[WARN] Target ukuran tidak tercapai dengan pengaturan paling kecil")
+                return
+            zoom, quality = settings
+            print(f"   Hasil {size_out/1024:.0f} KB masih di atas target, ulang sekali dengan "
+                  f"zoom={zoom:g}, quality={quality}")
+            self._rasterize(doc, input_path, output_path, zoom, quality, workers, stream, max_memory_mb, page_cache)
+            if output_size(output_path) > target_size:
+                print("[WARN] Target ukuran tidak tercapai dengan pengaturan paling kecil")
+
+    def _plan_target_size(self, doc, target_size: int):
+        total = len(doc)
+        step = max(1, total // self.TARGET_SAMPLE_PAGES)
+        samples = list(range(0, total, step))[:self.TARGET_SAMPLE_PAGES]
+        budget = target_size * self.TARGET_SAFETY - self.PDF_OVERHEAD
+        if not samples:
+            return self.TARGET_ZOOMS[0], self.TARGET_QUALITIES[0], 0
+
+        def estimate(pixmaps, quality):
+            sample_bytes = sum(len(pix.tobytes("jpeg", jpg_quality=quality)) for pix in pixmaps)
+            return sample_bytes / len(pixmaps) * total + self.PAGE_OVERHEAD * total
+
+        # Zoom dari besar ke kecil; zoom pertama yang muat pada kualitas minimum dipakai,
+        # lalu kualitasnya dinaikkan setinggi mungkin. Render sampel hanya sekali per zoom.
+        for zoom in self.TARGET_ZOOMS:
+            mat = fitz.Matrix(zoom, zoom)
+            pixmaps = [doc.load_page(n).get_pixmap(matrix=mat, alpha=False) for n in samples]
+            if estimate(pixmaps, self.TARGET_MIN_QUALITY) > budget:
+                continue
+            for quality in self.TARGET_QUALITIES:
+                size = estimate(pixmaps, quality)
+                if size <= budget:
+                    return zoom, quality, size
+
+        # Tidak ada yang muat di kualitas minimum: pakai zoom terkecil dan turunkan kualitas
+        for quality in sorted(q for q in self.TARGET_QUALITIES if q < self.TARGET_MIN_QUALITY)[::-1]:
+            size = estimate(pixmaps, quality)
+            if size <= budget:
+                return zoom, quality, size
+        return zoom, min(self.TARGET_QUALITIES), size
+
+    def _shrink_settings(self, zoom: float, quality: int, ratio: float):
+        # Ukuran JPEG kira-kira sebanding dengan jumlah piksel (zoom²)
+        new_zoom = zoom * (ratio * self.TARGET_SAFETY) ** 0.5
+        if new_zoom >= self.TARGET_ZOOMS[-1]:
+            return round(new_zoom, 3), quality
+        lower = [q for q in self.TARGET_QUALITIES if q < quality]
+        return self.TARGET_ZOOMS[-1], max(lower) if lower else quality
+
+    def _print_duplicates(self, total_pages: int, unique_pages: int):
+        if unique_pages < total_pages:
+            print(f"   Halaman identik: {total_pages - unique_pages} dari {total_pages} "
+                  f"memakai ulang gambar yang sama")
+
+    def _collect_images(self, doc) -> dict:
+        # xref → (info get_images, lebar tampil maks, tinggi tampil maks) dalam point
+        images = {}
+        for page in doc:
+            for img in page.get_images(full=True):
+                xref = img[0]
+                rects = page.get_image_rects(xref)
+                if not rects:
+                    continue
+                shown_w = max(r.width for r in rects)
+                shown_h = max(r.height for r in rects)
+                if xref in images:
+                    _, w, h = images[xref]
+                    shown_w, shown_h = max(w, shown_w), max(h, shown_h)
+                images[xref] = (img, shown_w, shown_h)
+        return images
+
+    def _compress_pdf_images(self, doc, output_path: str, level: str):
+        target_dpi = self.IMAGE_DPI.get(level, 110)
+        quality = 45 if level == "high" else 65 if level == "medium" else 85
+        replaced = kept = 0
+
+        for xref, (img, shown_w, shown_h) in self._collect_images(doc).items():
+            smask, width, height, bpc = img[1], img[2], img[3], img[4]
+            if shown_w <= 0 or shown_h <= 0:
+                kept += 1
+                continue
+            dpi = min(width / (shown_w / 72), height / (shown_h / 72))
+            # Gambar yang sudah kecil (termasuk JPEG) dilewati tanpa di-decode.
+            # Gambar bertransparansi / image mask juga dilewati agar tampilan tidak berubah.
+            if dpi <= target_dpi * 1.1 or smask or bpc == 1 or doc.xref_get_key(xref, "Mask")[0] != "null":
+                kept += 1
+                continue
+            try:
+                new_bytes, size, gray = self._downsample_image(doc, xref, target_dpi / dpi, quality)
+                if len(new_bytes) >= len(doc.xref_stream_raw(xref)):
+                    kept += 1
+                    continue
+                self._replace_image_stream(doc, xref, new_bytes, size, gray)
+                replaced += 1
             except Exception as e:
-                print(f"[WARN] Gagal kompres gambar: {e}")
+                print(f"[WARN] Gagal kompres gambar xref {xref}: {e}")
+                kept += 1
+
+        print(f"   Gambar: {replaced} dikompres ulang, {kept} dipertahankan")
+        # Content stream halaman tidak disentuh (tanpa clean=True) → teks & vektor tetap
+        doc.save(output_path, garbage=3, deflate=True, no_new_id=True)
+
+    def _downsample_image(self, doc, xref: int, scale: float, quality: int):
+        pix = fitz.Pixmap(doc, xref)
+        if pix.alpha:
+            pix = fitz.Pixmap(pix, 0)
+        if pix.n not in (1, 3):
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        gray = pix.n == 1
+        img = Image.frombytes("L" if gray else "RGB", (pix.width, pix.height), pix.samples)
+        size = (max(1, round(pix.width * scale)), max(1, round(pix.height * scale)))
+        img = img.resize(size, Image.LANCZOS)
+        img_io = io.BytesIO()
+        img.save(img_io, format='JPEG', quality=quality, optimize=True)
+        return img_io.getvalue(), size, gray
+
+    def _replace_image_stream(self, doc, xref: int, jpeg_bytes: bytes, size, gray: bool):
+        # Ganti isi objek gambar di tempat: semua halaman yang memakai xref ini ikut terupdate
+        doc.update_stream(xref, jpeg_bytes, compress=False)
+        doc.xref_set_key(xref, "Filter", "/DCTDecode")
+        doc.xref_set_key(xref, "Width", str(size[0]))
+        doc.xref_set_key(xref, "Height", str(size[1]))
+        doc.xref_set_key(xref, "ColorSpace", "/DeviceGray" if gray else "/DeviceRGB")
+        doc.xref_set_key(xref, "BitsPerComponent", "8")
+        for key in ("DecodeParms", "Decode"):
+            doc.xref_set_key(xref, key, "null")
+
+    def compress_docx(self, input_path: str, output_path: str, level: str = "medium",
+                      workers: int = 1) -> str:
+        if not is_data(input_path):
+            FileHandler.validate_file_exists(input_path)
+            FileHandler.validate_file_extension(input_path, ['.docx'])
+        with metrics.job("compress", format="docx", level=level):
+            return self._compress_docx_job(input_path, output_path, level, workers)
+
+    def _compress_docx_job(self, input_path: str, output_path: str, level: str, workers: int) -> str:
+        quality = 45 if level == "high" else 65 if level == "medium" else 85
+        dpi = self.DOCX_DPI.get(level, 150)
+        workers = workers or os.cpu_count() or 1
+        recompressed = kept = 0
 
-        new_doc.save(output_path)
-        print(f"[OK] DOCX terkompres → {output_path}")
+        # Bekerja langsung di paket zip: hanya word/media/* yang disentuh,
+        # part lain (XML, relasi, tabel, header) disalin apa adanya
+        with zipfile.ZipFile(as_file(input_path)) as zin, \
+                zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zout, \
+                ThreadPoolExecutor(max_workers=workers) as ex:
+            extents = scan_image_extents(zin)
+            # Urutan entry zip dipertahankan; gambar dikerjakan paralel dalam jendela terbatas
+            pending = deque()
+            window = workers * 2
+
+            def write_next():
+                nonlocal recompressed, kept
+                info, out_info, future = pending.popleft()
+                if future is None:
+                    with zin.open(info) as src, zout.open(out_info, "w") as dst:
+                        shutil.copyfileobj(src, dst, self.COPY_CHUNK_SIZE)
+                    return
+                data, new_data, log, elapsed = future.result()
+                metrics.add_time("encode", elapsed)
+                print(log)
+                if new_data is not None and len(new_data) < len(data) * self.DOCX_MIN_GAIN:
+                    with metrics.stage("write"):
+                        zout.writestr(out_info, new_data)
+                    recompressed += 1
+                else:
+                    with metrics.stage("write"):
+                        zout.writestr(out_info, data)
+                    kept += 1
+
+            for info in zin.infolist():
+                out_info = zipfile.ZipInfo(info.filename, info.date_time)
+                out_info.compress_type = info.compress_type
+                out_info.external_attr = info.external_attr
+                fmt = self._docx_media_format(info)
+                future = None
+                if fmt is not None:
+                    target = self._target_pixels(extents.get(info.filename), dpi)
+                    future = ex.submit(self._process_media, info.filename, zin.read(info),
+                                       fmt, quality, level, target)
+                pending.append((info, out_info, future))
+                while len(pending) > window:
+                    write_next()
+            while pending:
+                write_next()
+
+        size_in = source_size(input_path)
+        size_out = output_size(output_path)
+        metrics.count("images", recompressed + kept)
+        metrics.count("bytes_in", size_in)
+        metrics.count("bytes_out", size_out)
+        reduction = 100 * (1 - size_out / size_in)
+        print(f"[OK] DOCX terkompres → {describe(output_path)}")
+        print(f"   Gambar: {recompressed} dikompres ulang, {kept} dipertahankan")
+        print(f"   Ukuran: {size_in/1024:.1f} KB → {size_out/1024:.1f} KB (-{reduction:.1f}%)")
         return output_path
 
-    def compress(self, input_path: str, output_path: str, level: str = "medium") -> str:
+    def _docx_media_format(self, info) -> str:
+        if not info.filename.startswith("word/media/") or info.file_size < self.DOCX_MIN_IMAGE_BYTES:
+            return None
+        return self.DOCX_IMAGE_FORMATS.get(Path(info.filename).suffix.lower())
+
+    def _target_pixels(self, extent, dpi: int):
+        # Ukuran tampil (EMU) → jumlah piksel yang dibutuhkan pada DPI level ini
+        if not extent or not extent[0] or not extent[1]:
+            return None
+        return (max(1, round(extent[0] / EMU_PER_INCH * dpi)),
+                max(1, round(extent[1] / EMU_PER_INCH * dpi)))
+
+    def _process_media(self, name: str, data: bytes, fmt: str, quality: int, level: str, target):
+        start = time.perf_counter()
+        try:
+            new_data, size, new_size = self._recompress_media(data, fmt, quality, level, target)
+        except Exception as e:
+            return data, None, f"[WARN] Gagal kompres gambar {name}: {e}", time.perf_counter() - start
+        elapsed = time.perf_counter() - start
+        log = (f"   [IMG] {Path(name).name}: {size[0]}x{size[1]} → {new_size[0]}x{new_size[1]}, "
+               f"{len(data)/1024:.0f} KB → {len(new_data)/1024:.0f} KB, {elapsed * 1000:.0f} ms")
+        return data, new_data, log, elapsed
+
+    def _recompress_media(self, data: bytes, fmt: str, quality: int, level: str, target=None):
+        # Format & nama file tetap sama, jadi relasi dan [Content_Types].xml tidak perlu diubah
+        img = Image.open(io.BytesIO(data))
+        size = img.size
+        scale = 1.0
+        if target:
+            scale = min(1.0, max(target[0] / size[0], target[1] / size[1]))
+        new_size = (max(1, round(size[0] * scale)), max(1, round(size[1] * scale)))
+
+        if fmt == "JPEG" and scale < 1.0:
+            # Decoder JPEG langsung men-decode di skala 1/2, 1/4, 1/8 (tidak pernah di bawah target)
+            img.draft(img.mode, new_size)
+        if new_size != img.size:
+            img = img.resize(new_size, Image.LANCZOS, reducing_gap=2.0)
+
+        img_io = io.BytesIO()
+        if fmt == "JPEG":
+            if img.mode not in ("L", "RGB", "CMYK"):
+                img = img.convert("RGB")
+            img.save(img_io, format="JPEG", quality=quality, optimize=True, subsampling=2)
+        else:
+            if level == "high" and img.mode in ("RGB", "RGBA"):
+                img = img.quantize(256, method=Image.Quantize.FASTOCTREE)
+            img.save(img_io, format="PNG", optimize=True)
+        return img_io.getvalue(), size, new_size
+
+    def compress(self, input_path: str, output_path: str, level: str = "medium",
+                 force: bool = False, workers: int = 1, timeout: float = None,
+                 max_rss_mb: int = None, **pdf_options) -> str:
+        limits = {'timeout': timeout, 'max_rss_mb': max_rss_mb}
+        self._check_options(Path(input_path).suffix.lower(), pdf_options)
+        with metrics.job("compress", format=Path(input_path).suffix.lower().lstrip("."), level=level):
+            _unlink_hardlink(output_path)
+            if self.cache is None:
+                return self._compress_limited(limits, input_path, output_path, level, workers, **pdf_options)
+
+            FileHandler.validate_file_exists(input_path)
+            key = self.cache.make_key(input_path, level=level, **self._cache_params(input_path, pdf_options))
+            if not force and self.cache.fetch(key, output_path):
+                print(f"[CACHE] {Path(input_path).name} → {output_path}")
+                metrics.count("cache_hits")
+                return output_path
+            self._compress_limited(limits, input_path, output_path, level, workers, **pdf_options)
+            self.cache.store(key, output_path)
+            return output_path
+
+    def compress_stream(self, source, sink=None, level: str = "medium", input_format: str = None,
+                        workers: int = 1, timeout: float = None, max_rss_mb: int = None,
+                        **pdf_options):
+        """Kompresi di memori: `source` berupa bytes atau file-like, hasilnya bytes
+        (atau ditulis ke `sink` file-like, lalu None dikembalikan). Tidak ada file sementara.
+
+        Format dikenali dari isi (atau `input_format` ".pdf"/".docx"). Cache tidak dipakai.
+        """
+        data = read_source(source)
+        ext = input_format or sniff_format(data)
+        if ext not in (".pdf", ".docx"):
+            raise ValueError("Format tidak didukung! Hanya PDF dan DOCX.")
+        self._check_options(ext, pdf_options)
+        with metrics.job("compress", format=ext.lstrip("."), level=level):
+            if timeout or max_rss_mb:
+                from .isolation import call_isolated
+                with metrics.stage("isolated"):
+                    result = call_isolated(self._compress_data, (data, ext, level, workers), pdf_options,
+                                           timeout=timeout, max_rss_mb=max_rss_mb)
+            else:
+                result = self._compress_data(data, ext, level, workers, **pdf_options)
+        if sink is None:
+            return result
+        sink.write(result)
+        return None
+
+    def _compress_data(self, data, ext: str, level: str, workers: int, **pdf_options) -> bytes:
+        # Output lewat buffer sendiri: koreksi target ukuran menulis ulang dari awal
+        out = io.BytesIO()
+        if ext == ".pdf":
+            self.compress_pdf(data, out, level, workers=workers, **pdf_options)
+        else:
+            self.compress_docx(data, out, level, workers=workers)
+        return out.getvalue()
+
+    def submit(self, input_path: str, output_path: str, level: str = "medium",
+               priority: str = "normal", **kwargs):
+        """Versi non-blocking dari compress(): Future lewat scheduler bersama (lihat ConversionEngine.submit)."""
+        from .scheduler import get_scheduler, estimate_cost
+        return get_scheduler().submit(self.compress, input_path, output_path, level,
+                                      cost=estimate_cost(input_path), lane=priority,
+                                      name=f"compress:{os.path.basename(input_path)}", **kwargs)
+
+    async def compress_async(self, input_path: str, output_path: str, level: str = "medium",
+                             priority: str = "normal", **kwargs) -> str:
+        import asyncio  # Hanya untuk pemanggil async; tidak memperlambat start CLI
+        return await asyncio.wrap_future(self.submit(input_path, output_path, level, priority, **kwargs))
+
+    def _compress_limited(self, limits: dict, input_path: str, output_path: str, level: str,
+                          workers: int, **pdf_options) -> str:
+        if not (limits['timeout'] or limits['max_rss_mb']):
+            return self._compress(input_path, output_path, level, workers, **pdf_options)
+        # Kompresi berjalan di proses anak; melewati batas → IsolationError (timeout/oom/crash)
+        from .isolation import call_isolated
+        with metrics.stage("isolated"):
+            return call_isolated(self._compress, (input_path, output_path, level, workers), pdf_options,
+                                 timeout=limits['timeout'], max_rss_mb=limits['max_rss_mb'])
+
+    def _check_options(self, ext: str, pdf_options: dict):
+        """Tolak opsi khusus PDF untuk DOCX, daripada diam-diam diabaikan."""
+        if ext != ".docx":
+            return
+        given = [k for k in self.PDF_ONLY_OPTIONS if pdf_options.get(k) not in (None, False)]
+        if given:
+            raise ValueError(f"Opsi hanya untuk PDF, tidak berlaku untuk DOCX: {', '.join(given)}")
+
+    def _cache_params(self, input_path: str, pdf_options: dict) -> dict:
+        if Path(input_path).suffix.lower() != ".pdf":
+            return {}
+        params = {k: v for k, v in pdf_options.items() if k not in self.CACHE_NEUTRAL_OPTIONS}
+        params.setdefault("mode", "raster")
+        if pdf_options.get("max_memory_mb") is not None:
+            params["stream"] = True
+        return params
+
+    def _compress(self, input_path: str, output_path: str, level: str = "medium",
+                  workers: int = 1, **pdf_options) -> str:
         ext = Path(input_path).suffix.lower()
         if ext == ".pdf":
-            return self.compress_pdf(input_path, output_path, level)
+            return self.compress_pdf(input_path, output_path, level, workers=workers, **pdf_options)
         elif ext == ".docx":
-            return self.compress_docx(input_path, output_path, level)
+            return self.compress_docx(input_path, output_path, level, workers=workers)
         else:
             raise ValueError(f"Format tidak didukung: {ext}")
\ No newline at end of file
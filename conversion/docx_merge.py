@@ -0,0 +1,97 @@
+# conversion/docx_merge.py
+import copy
+import io
+from .docx_package import NS_R, NS_W, NS_WP
+
+R_EMBED = f"{{{NS_R}}}embed"
+R_LINK = f"{{{NS_R}}}link"
+R_ID = f"{{{NS_R}}}id"
+RT_IMAGE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+HEADER_REFS = (f"{{{NS_W}}}headerReference", f"{{{NS_W}}}footerReference")
+
+
+def _remap_relationships(element, src_part, dst_part, image_ids: dict):
+    # rId di potongan dokumen hanya berlaku untuk part asalnya → daftarkan ulang di dokumen tujuan
+    for node in element.iter():
+        for attr in (R_EMBED, R_LINK, R_ID):
+            rid = node.get(attr)
+            if rid is None or rid not in src_part.rels:
+                continue
+            rel = src_part.rels[rid]
+            if rel.is_external:
+                new_rid = dst_part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+            elif rel.reltype == RT_IMAGE:
+                blob = rel.target_part.blob
+                if rid not in image_ids:
+                    image_ids[rid], _ = dst_part.get_or_add_image(io.BytesIO(blob))
+                new_rid = image_ids[rid]
+            else:
+                continue
+            node.set(attr, new_rid)
+
+
+def _first_section(body):
+    # sectPr yang berlaku untuk awal body: section break pertama, atau sectPr body kalau tidak ada
+    for sect_pr in body.iter(f"{{{NS_W}}}sectPr"):
+        return sect_pr
+    return None
+
+
+def _with_base_headers(sect_pr, base_sect_pr):
+    # Header/footer potongan merujuk part miliknya sendiri; pakai referensi dari dokumen dasar
+    merged = copy.deepcopy(sect_pr)
+    for node in [n for n in merged if n.tag in HEADER_REFS]:
+        merged.remove(node)
+    for i, node in enumerate(n for n in base_sect_pr if n.tag in HEADER_REFS):
+        merged.insert(i, copy.deepcopy(node))
+    return merged
+
+
+def _section_break(sect_pr):
+    from docx.oxml import parse_xml
+    paragraph = parse_xml(f'<w:p xmlns:w="{NS_W}"><w:pPr/></w:p>')
+    paragraph[0].append(copy.deepcopy(sect_pr))
+    return paragraph
+
+
+def merge_docx(part_paths, output_path: str):
+    """Gabungkan beberapa DOCX (urut) ke satu file; dokumen pertama jadi dasar
+    (styles, header/footer)."""
+    from docx import Document
+    from lxml import etree
+
+    base = Document(part_paths[0])
+    body = base.element.body
+    # Isi baru disisipkan sebelum sectPr terakhir agar pengaturan halaman tetap di akhir body
+    anchor = body.find(f"{{{NS_W}}}sectPr")
+    for path in part_paths[1:]:
+        part_doc = Document(path)
+        part_body = part_doc.element.body
+        last_sect = part_body.find(f"{{{NS_W}}}sectPr")
+        # sectPr body potongan sebelumnya hanya berlaku untuk section terakhirnya; kalau
+        # tata letak halaman berubah di batas potongan, jadikan section break biasa
+        first_sect = _first_section(part_body)
+        if anchor is not None and first_sect is not None and \
+                etree.tostring(anchor) != etree.tostring(first_sect):
+            anchor.addprevious(_section_break(anchor))
+        image_ids = {}
+        for child in part_body:
+            if child is last_sect:
+                continue
+            element = copy.deepcopy(child)
+            for ref in list(element.iter(*HEADER_REFS)):
+                ref.getparent().remove(ref)
+            _remap_relationships(element, part_doc.part, base.part, image_ids)
+            if anchor is not None:
+                anchor.addprevious(element)
+            else:
+                body.append(element)
+        if anchor is not None and last_sect is not None:
+            new_anchor = _with_base_headers(last_sect, anchor)
+            anchor.getparent().replace(anchor, new_anchor)
+            anchor = new_anchor
+    # id wp:docPr harus unik di seluruh dokumen; tiap potongan mulai dari 1 lagi
+    for i, doc_pr in enumerate(body.iter(f"{{{NS_WP}}}docPr"), start=1):
+        doc_pr.set("id", str(i))
+    base.save(output_path)
+    return output_path
@@ -0,0 +1,82 @@
+# conversion/docx_package.py
+import posixpath
+import xml.etree.ElementTree as ET
+
+NS_WP = "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"
+NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+NS_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+IMAGE_REL_TYPE = NS_R + "/image"
+
+EMU_PER_INCH = 914400
+
+
+def _rels_path(part_name: str) -> str:
+    folder, name = posixpath.split(part_name)
+    return posixpath.join(folder, "_rels", name + ".rels")
+
+
+def _read_image_rels(zin, rels_name: str, part_folder: str) -> dict:
+    # rId → nama part media di dalam zip
+    rels = {}
+    with zin.open(rels_name) as f:
+        for rel in ET.parse(f).getroot().iter(f"{{{NS_PKG_REL}}}Relationship"):
+            if rel.get("Type") != IMAGE_REL_TYPE or rel.get("TargetMode") == "External":
+                continue
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                rels[rel.get("Id")] = target.lstrip("/")
+            else:
+                rels[rel.get("Id")] = posixpath.normpath(posixpath.join(part_folder, target))
+    return rels
+
+
+def _is_cropped(drawing) -> bool:
+    # Word sering menulis <a:srcRect/> kosong; hanya atribut l/t/r/b ≠ 0 yang berarti crop
+    for src_rect in drawing.iter(f"{{{NS_A}}}srcRect"):
+        if any(int(src_rect.get(side, 0)) for side in ("l", "t", "r", "b")):
+            return True
+    return False
+
+
+def scan_image_extents(zin) -> dict:
+    """Ukuran tampil terbesar tiap gambar di dokumen, dalam EMU.
+
+    Hasilnya {nama media: (cx, cy)}. Gambar yang di-crop (a:srcRect) bernilai None,
+    karena ukuran tampil tidak mencerminkan resolusi yang dibutuhkan. Part XML hanya
+    dibaca secara streaming; isinya tidak diubah.
+    """
+    names = set(zin.namelist())
+    extents = {}
+    for part_name in names:
+        if not part_name.startswith("word/") or not part_name.endswith(".xml"):
+            continue
+        rels_name = _rels_path(part_name)
+        if rels_name not in names:
+            continue
+        rels = _read_image_rels(zin, rels_name, posixpath.dirname(part_name))
+        if not rels:
+            continue
+        with zin.open(part_name) as f:
+            for _, elem in ET.iterparse(f):
+                if elem.tag == f"{{{NS_W}}}p":
+                    # Paragraf yang sudah lewat tidak dibutuhkan lagi; jaga memori tetap kecil
+                    elem.clear()
+                    continue
+                if elem.tag not in (f"{{{NS_WP}}}inline", f"{{{NS_WP}}}anchor"):
+                    continue
+                extent = elem.find(f"{{{NS_WP}}}extent")
+                for blip in elem.iter(f"{{{NS_A}}}blip"):
+                    media = rels.get(blip.get(f"{{{NS_R}}}embed"))
+                    if media is None:
+                        continue
+                    cropped = _is_cropped(elem)
+                    if cropped or extent is None or media in extents and extents[media] is None:
+                        extents[media] = None
+                        continue
+                    cx, cy = int(extent.get("cx", 0)), int(extent.get("cy", 0))
+                    old = extents.get(media, (0, 0))
+                    extents[media] = (max(old[0], cx), max(old[1], cy))
+                elem.clear()
+    return extents
@@ -0,0 +1,339 @@
+# conversion/docx_renderer.py
+import html
+import re
+import zipfile
+from collections import Counter
+from .docx_package import NS_A, NS_R, NS_W, NS_WP, EMU_PER_INCH
+from utils import metrics
+
+EMU_PER_PT = EMU_PER_INCH // 72
+NS_M = "http://schemas.openxmlformats.org/officeDocument/2006/math"
+NS_MC = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+NS_V = "urn:schemas-microsoft-com:vml"
+NS_C = "http://schemas.openxmlformats.org/drawingml/2006/chart"
+NS_DGM = "http://schemas.openxmlformats.org/drawingml/2006/diagram"
+
+# Fitur yang tidak dirender setia oleh renderer ini: tag XML → nama fitur di laporan
+UNSUPPORTED_TAGS = {
+    f"{{{NS_WP}}}anchor": "gambar/objek mengambang",
+    f"{{{NS_W}}}txbxContent": "text box",
+    f"{{{NS_V}}}shape": "shape VML",
+    f"{{{NS_MC}}}AlternateContent": "shape/objek alternatif",
+    f"{{{NS_W}}}footnoteReference": "footnote",
+    f"{{{NS_W}}}endnoteReference": "endnote",
+    f"{{{NS_W}}}commentReference": "komentar",
+    f"{{{NS_W}}}fldSimple": "field (nomor halaman/TOC)",
+    f"{{{NS_W}}}fldChar": "field (nomor halaman/TOC)",
+    f"{{{NS_M}}}oMath": "persamaan",
+    f"{{{NS_C}}}chart": "chart",
+    f"{{{NS_DGM}}}relIds": "SmartArt",
+    f"{{{NS_W}}}ins": "track changes",
+    f"{{{NS_W}}}del": "track changes",
+    f"{{{NS_W}}}numPr": "penomoran/bullet list (didekati)",
+    f"{{{NS_W}}}gridSpan": "sel tabel digabung",
+    f"{{{NS_W}}}vMerge": "sel tabel digabung",
+    f"{{{NS_W}}}headerReference": "header/footer",
+    f"{{{NS_W}}}footerReference": "header/footer",
+}
+
+BASE_CSS = """
+body { font-family: sans-serif; }
+p { margin: 0 0 6pt 0; }
+h1, h2, h3, h4, h5, h6 { margin: 10pt 0 4pt 0; }
+table { border-collapse: collapse; margin: 0 0 6pt 0; }
+td { border: 0.5pt solid #000; padding: 2pt 4pt; vertical-align: top; }
+td p { margin: 0; }
+ul, ol { margin: 0 0 6pt 0; }
+"""
+
+
+def analyze_docx(input_path: str) -> Counter:
+    """Fitur DOCX yang tidak didukung renderer native, dihitung dari XML tanpa render."""
+    from lxml import etree
+    found = Counter()
+    with zipfile.ZipFile(input_path) as zf:
+        with zf.open("word/document.xml") as f:
+            depth = 0
+            for event, el in etree.iterparse(f, events=("start", "end")):
+                if el.tag == f"{{{NS_W}}}tbl":
+                    if event == "start":
+                        depth += 1
+                        if depth > 1:
+                            found["tabel bersarang"] += 1
+                    else:
+                        depth -= 1
+                    continue
+                if event != "start":
+                    continue
+                if el.tag in UNSUPPORTED_TAGS:
+                    found[UNSUPPORTED_TAGS[el.tag]] += 1
+                elif el.tag == f"{{{NS_W}}}cols" and int(el.get(f"{{{NS_W}}}num", "1")) > 1:
+                    found["kolom ganda"] += 1
+                elif el.tag == f"{{{NS_W}}}sectPr" and el.getparent().tag != f"{{{NS_W}}}body":
+                    found["beberapa section"] += 1
+    # fldChar muncul berpasangan begin/separate/end untuk satu field
+    if "field (nomor halaman/TOC)" in found:
+        found["field (nomor halaman/TOC)"] = max(1, found["field (nomor halaman/TOC)"] // 3)
+    return found
+
+
+# Potongan tanpa teks/gambar (hanya tag pembungkus run) dianggap kosong
+_TAGS = re.compile(r"<(?!img)[^>]*>")
+
+
+def _is_blank(markup: str) -> bool:
+    return not _TAGS.sub("", markup).replace("&#160;", "").strip()
+
+
+def _font_family(name: str) -> str:
+    name = (name or "").lower()
+    if any(k in name for k in ("courier", "consolas", "mono")):
+        return "monospace"
+    if any(k in name for k in ("times", "cambria", "georgia", "garamond", "serif")):
+        return "serif"
+    return "sans-serif"
+
+
+class _HtmlBuilder:
+    """DOCX (python-docx) → potongan HTML per halaman (dipisah di page break)."""
+
+    def __init__(self, doc, archive):
+        self.doc = doc
+        self.archive = archive
+        self.images = {}
+        self.chunks = [[]]
+        self.list_tag = None
+        # paragraph.style di python-docx mencari style default setiap kali (lambat) → map id sekali
+        self.style_names = {style.style_id: style.name for style in doc.styles}
+
+    def _style_name(self, paragraph) -> str:
+        p_pr = paragraph._p.pPr
+        if p_pr is None or p_pr.pStyle is None:
+            return ""
+        return self.style_names.get(p_pr.pStyle.val, "")
+
+    def _emit(self, markup: str):
+        self.chunks[-1].append(markup)
+
+    def _close_list(self):
+        if self.list_tag:
+            self._emit(f"</{self.list_tag}>")
+            self.list_tag = None
+
+    def _page_break(self):
+        self._close_list()
+        self.chunks.append([])
+
+    def _image(self, blip, extent) -> str:
+        rid = blip.get(f"{{{NS_R}}}embed")
+        part = self.doc.part.related_parts.get(rid)
+        if part is None:
+            return ""
+        if rid not in self.images:
+            name = f"img{len(self.images)}.{part.partname.ext}"
+            self.archive.add(part.blob, name)
+            self.images[rid] = name
+        size = ""
+        if extent is not None:
+            width = int(extent.get("cx", 0)) / EMU_PER_PT
+            height = int(extent.get("cy", 0)) / EMU_PER_PT
+            size = f' width="{width:.0f}" height="{height:.0f}"'
+        return f'<img src="{self.images[rid]}"{size}/>'
+
+    def _run(self, run) -> str:
+        parts = []
+        for child in run._r:
+            tag = child.tag
+            if tag == f"{{{NS_W}}}t":
+                parts.append(html.escape(child.text or ""))
+            elif tag == f"{{{NS_W}}}tab":
+                parts.append("&#160;&#160;&#160;&#160;")
+            elif tag == f"{{{NS_W}}}br":
+                if child.get(f"{{{NS_W}}}type") == "page":
+                    parts.append("\x00PAGE\x00")
+                else:
+                    parts.append("<br/>")
+            elif tag == f"{{{NS_W}}}drawing":
+                for inline in child.iter(f"{{{NS_WP}}}inline"):
+                    extent = inline.find(f"{{{NS_WP}}}extent")
+                    for blip in inline.iter(f"{{{NS_A}}}blip"):
+                        parts.append(self._image(blip, extent))
+        text = "".join(parts)
+        if not text:
+            return ""
+        font = run.font
+        styles = []
+        if font.size:
+            styles.append(f"font-size:{font.size.pt:g}pt")
+        if font.color is not None and font.color.type is not None and font.color.rgb is not None:
+            styles.append(f"color:#{font.color.rgb}")
+        if font.name:
+            styles.append(f"font-family:{_font_family(font.name)}")
+        if styles:
+            text = f'<span style="{";".join(styles)}">{text}</span>'
+        if font.bold:
+            text = f"<b>{text}</b>"
+        if font.italic:
+            text = f"<i>{text}</i>"
+        if font.underline:
+            text = f"<u>{text}</u>"
+        if font.strike:
+            text = f"<s>{text}</s>"
+        if font.superscript:
+            text = f"<sup>{text}</sup>"
+        elif font.subscript:
+            text = f"<sub>{text}</sub>"
+        return text
+
+    def paragraph_html(self, paragraph, in_table: bool = False) -> list:
+        """Kembalikan list potongan HTML; lebih dari satu kalau paragraf berisi page break."""
+        content = "".join(self._run(r) for r in paragraph.runs) or "&#160;"
+        style = self._style_name(paragraph)
+        tag = "p"
+        if style == "Title":
+            tag = "h1"
+        elif style.startswith("Heading "):
+            level = style.split()[-1]
+            tag = f"h{level}" if level.isdigit() and 1 <= int(level) <= 6 else "h6"
+        css = []
+        fmt = paragraph.paragraph_format
+        if paragraph.alignment is not None:
+            align = {0: "left", 1: "center", 2: "right", 3: "justify"}.get(int(paragraph.alignment), "left")
+            css.append(f"text-align:{align}")
+        if fmt.left_indent:
+            css.append(f"margin-left:{fmt.left_indent.pt:g}pt")
+        if fmt.first_line_indent:
+            css.append(f"text-indent:{fmt.first_line_indent.pt:g}pt")
+        if not in_table and fmt.space_before is not None:
+            css.append(f"margin-top:{fmt.space_before.pt:g}pt")
+        if not in_table and fmt.space_after is not None:
+            css.append(f"margin-bottom:{fmt.space_after.pt:g}pt")
+        attr = f' style="{";".join(css)}"' if css else ""
+        pieces = content.split("\x00PAGE\x00")
+        # Paragraf yang hanya berisi page break tidak menyisakan baris kosong di kedua halaman;
+        # potongan kosong di tepi dikembalikan sebagai "" (hanya batas halaman)
+        edges = (0, len(pieces) - 1) if len(pieces) > 1 else ()
+        return ["" if i in edges and _is_blank(piece) else f"<{tag}{attr}>{piece or '&#160;'}</{tag}>"
+                for i, piece in enumerate(pieces)]
+
+    def _list_tag(self, paragraph):
+        style = self._style_name(paragraph)
+        if style.startswith("List Number"):
+            return "ol"
+        if style.startswith("List Bullet") or paragraph._p.pPr is not None and paragraph._p.pPr.numPr is not None:
+            return "ul"
+        return None
+
+    def add_paragraph(self, paragraph):
+        if paragraph.paragraph_format.page_break_before:
+            self._page_break()
+        pieces = self.paragraph_html(paragraph)
+        list_tag = self._list_tag(paragraph)
+        if list_tag != self.list_tag:
+            self._close_list()
+            if list_tag:
+                self._emit(f"<{list_tag}>")
+                self.list_tag = list_tag
+        for i, piece in enumerate(pieces):
+            if i:
+                self._page_break()
+            if not piece:
+                continue
+            if self.list_tag:
+                piece = f"<li>{piece[piece.index('>') + 1:piece.rindex('<')]}</li>"
+            self._emit(piece)
+
+    def add_table(self, table):
+        self._close_list()
+        rows = []
+        for row in table.rows:
+            cells = []
+            seen = set()
+            for cell in row.cells:
+                # Sel yang digabung muncul berulang di python-docx → cukup sekali
+                if id(cell._tc) in seen:
+                    continue
+                seen.add(id(cell._tc))
+                inner = "".join(piece for p in cell.paragraphs for piece in self.paragraph_html(p, True))
+                width = f' style="width:{cell.width.pt:.0f}pt"' if cell.width else ""
+                cells.append(f"<td{width}>{inner}</td>")
+            rows.append(f"<tr>{''.join(cells)}</tr>")
+        self._emit(f"<table>{''.join(rows)}</table>")
+
+    def build(self) -> list:
+        from docx.table import Table
+        from docx.text.paragraph import Paragraph
+        for child in self.doc.element.body.iterchildren():
+            if child.tag == f"{{{NS_W}}}p":
+                self.add_paragraph(Paragraph(child, self.doc._body))
+            elif child.tag == f"{{{NS_W}}}tbl":
+                self.add_table(Table(child, self.doc._body))
+        self._close_list()
+        return ["".join(chunk) for chunk in self.chunks]
+
+
+def _base_font_pt(doc) -> float:
+    try:
+        size = doc.styles["Normal"].font.size
+        return size.pt if size else 11.0
+    except KeyError:
+        return 11.0
+
+
+def render_docx(input_path: str, output_path: str, unsupported: Counter = None) -> dict:
+    """Render DOCX → PDF di dalam proses (python-docx + PyMuPDF Story).
+
+    `unsupported`: hasil analyze_docx yang sudah ada (supaya XML tidak di-parse dua kali).
+    Mengembalikan laporan {'pages', 'unsupported': {fitur: jumlah}, 'faithful'}.
+    """
+    import fitz
+    from docx import Document
+
+    if unsupported is None:
+        with metrics.stage("analyze"):
+            unsupported = analyze_docx(input_path)
+    with metrics.stage("open"):
+        doc = Document(input_path)
+    section = doc.sections[0]
+    page = fitz.Rect(0, 0, section.page_width.pt if section.page_width else 612,
+                     section.page_height.pt if section.page_height else 792)
+    margins = [m.pt if m is not None else 72 for m in
+               (section.left_margin, section.top_margin, section.right_margin, section.bottom_margin)]
+    where = fitz.Rect(margins[0], margins[1], page.width - margins[2], page.height - margins[3])
+
+    archive = fitz.Archive()
+    with metrics.stage("layout"):
+        chunks = _HtmlBuilder(doc, archive).build()
+    css = BASE_CSS + f"body {{ font-size: {_base_font_pt(doc):g}pt; }}"
+
+    pages = 0
+    writer = fitz.DocumentWriter(output_path)
+    try:
+        for chunk in chunks:
+            with metrics.stage("render"):
+                story = fitz.Story(html=chunk, user_css=css, archive=archive)
+                more = True
+                while more:
+                    device = writer.begin_page(page)
+                    more, _ = story.place(where)
+                    story.draw(device)
+                    writer.end_page()
+                    pages += 1
+    finally:
+        with metrics.stage("save"):
+            writer.close()
+    metrics.count("pages", pages)
+    return {
+        'pages': pages,
+        'unsupported': dict(unsupported),
+        'faithful': not unsupported,
+    }
+
+
+def print_render_report(report: dict):
+    if report['faithful']:
+        print(f"[RENDER] {report['pages']} halaman, semua fitur didukung")
+        return
+    print(f"[RENDER] {report['pages']} halaman, fitur yang tidak dirender setia:")
+    for feature, count in sorted(report['unsupported'].items()):
+        print(f"  - {feature}: {count}")
@@ -0,0 +1,195 @@
+# conversion/docx_writer.py
+import hashlib
+import re
+import zipfile
+from xml.sax.saxutils import escape
+from .docx_package import NS_A, NS_R, NS_W, NS_WP, NS_PKG_REL, EMU_PER_INCH
+
+NS_PIC = "http://schemas.openxmlformats.org/drawingml/2006/picture"
+RT_OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+RT_STYLES = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"
+RT_IMAGE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+
+# Karakter yang tidak boleh ada di XML 1.0 (sering muncul dari teks PDF yang rusak)
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+_IMAGE_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "jpg": "image/jpeg",
+    "gif": "image/gif",
+    "bmp": "image/bmp",
+    "tiff": "image/tiff",
+}
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    + "".join(f'<Default Extension="{ext}" ContentType="{ct}"/>' for ext, ct in _IMAGE_TYPES.items()) +
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '</Types>'
+)
+
+_PACKAGE_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<Relationships xmlns="{NS_PKG_REL}">'
+    f'<Relationship Id="rId1" Type="{RT_OFFICE_DOCUMENT}" Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+# Default font dan spasi disamakan dengan template bawaan python-docx
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<w:styles xmlns:w="{NS_W}">'
+    '<w:docDefaults><w:rPrDefault><w:rPr>'
+    '<w:rFonts w:ascii="Calibri" w:hAnsi="Calibri" w:eastAsia="Calibri" w:cs="Calibri"/>'
+    '<w:sz w:val="22"/><w:szCs w:val="22"/><w:lang w:val="en-US"/>'
+    '</w:rPr></w:rPrDefault>'
+    '<w:pPrDefault><w:pPr><w:spacing w:after="200" w:line="276" w:lineRule="auto"/></w:pPr></w:pPrDefault>'
+    '</w:docDefaults>'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/><w:qFormat/></w:style>'
+    '</w:styles>'
+)
+
+# Letter, margin kiri/kanan 1,25" → lebar area teks 6" (sama seperti python-docx)
+_SECT_PR = (
+    '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+    '<w:pgMar w:top="1440" w:right="1800" w:bottom="1440" w:left="1800" '
+    'w:header="720" w:footer="720" w:gutter="0"/></w:sectPr>'
+)
+
+
+class StreamingDocxWriter:
+    """Menulis DOCX sederhana (paragraf teks, gambar inline, page break) langsung ke zip.
+
+    word/document.xml ditulis bertahap ke entry zip; paragraf tidak pernah menjadi
+    objek lxml, jadi biaya per baris kecil dan memori tidak tumbuh dengan jumlah halaman.
+    Gambar disimpan di memori sampai close() karena zip hanya bisa menulis satu entry sekaligus.
+    """
+
+    FLUSH_SIZE = 256 * 1024
+
+    def __init__(self, output_path: str):
+        self._zip = zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED)
+        self._zip.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        self._zip.writestr("_rels/.rels", _PACKAGE_RELS)
+        self._doc = self._zip.open("word/document.xml", "w", force_zip64=True)
+        self._buf = []
+        self._buf_size = 0
+        self._media = []
+        self._media_ids = {}
+        self._next_rid = 2  # rId1 = styles
+        self._next_shape_id = 1
+        self._write(
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<w:document xmlns:w="{NS_W}" xmlns:r="{NS_R}" xmlns:wp="{NS_WP}" '
+            f'xmlns:a="{NS_A}" xmlns:pic="{NS_PIC}"><w:body>'
+        )
+
+    def _write(self, text: str):
+        self._buf.append(text)
+        self._buf_size += len(text)
+        if self._buf_size >= self.FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self._buf:
+            self._doc.write("".join(self._buf).encode("utf-8"))
+            self._buf = []
+            self._buf_size = 0
+
+    @staticmethod
+    def _runs(text: str) -> str:
+        # Tab dan carriage return dipetakan seperti python-docx (w:tab / w:br)
+        text = escape(_INVALID_XML.sub("", text))
+        text = text.replace("\t", '</w:t><w:tab/><w:t xml:space="preserve">')
+        text = text.replace("\r", '</w:t><w:br/><w:t xml:space="preserve">')
+        return f'<w:r><w:t xml:space="preserve">{text}</w:t></w:r>'
+
+    def add_paragraph(self, text: str = ""):
+        self._write(f"<w:p>{self._runs(text)}</w:p>" if text else "<w:p/>")
+
+    def add_paragraphs(self, lines):
+        self._write("".join(f"<w:p>{self._runs(line)}</w:p>" for line in lines))
+
+    def add_page_break(self):
+        self._write('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+
+    def add_image(self, data: bytes, ext: str = "png") -> str:
+        """Daftarkan gambar sebagai part media; rId yang dikembalikan bisa dipakai berulang kali."""
+        ext = ext.lower()
+        if ext not in _IMAGE_TYPES:
+            raise ValueError(f"Format gambar tidak didukung: {ext}")
+        # Gambar yang isinya sama cukup disimpan sekali (seperti python-docx)
+        digest = hashlib.sha1(data).hexdigest()
+        if digest in self._media_ids:
+            return self._media_ids[digest]
+        rid = f"rId{self._next_rid}"
+        self._next_rid += 1
+        self._media_ids[digest] = rid
+        self._media.append((rid, f"media/image{len(self._media) + 1}.{ext}", data))
+        return rid
+
+    def add_picture(self, rid: str, width_emu: int, height_emu: int):
+        shape_id = self._next_shape_id
+        self._next_shape_id += 1
+        cx, cy = int(width_emu), int(height_emu)
+        self._write(
+            '<w:p><w:r><w:drawing>'
+            f'<wp:inline distT="0" distB="0" distL="0" distR="0"><wp:extent cx="{cx}" cy="{cy}"/>'
+            f'<wp:docPr id="{shape_id}" name="Picture {shape_id}"/>'
+            '<wp:cNvGraphicFramePr><a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+            f'<a:graphic><a:graphicData uri="{NS_PIC}"><pic:pic>'
+            f'<pic:nvPicPr><pic:cNvPr id="{shape_id}" name="image{shape_id}"/><pic:cNvPicPr/></pic:nvPicPr>'
+            f'<pic:blipFill><a:blip r:embed="{rid}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+            f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+            '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr>'
+            '</pic:pic></a:graphicData></a:graphic></wp:inline>'
+            '</w:drawing></w:r></w:p>'
+        )
+
+    def add_picture_width(self, rid: str, pixel_size: tuple, width_inches: float = 6.0):
+        # Tinggi mengikuti rasio gambar, seperti doc.add_picture(width=...) di python-docx
+        width_emu = int(width_inches * EMU_PER_INCH)
+        px_w, px_h = pixel_size
+        self.add_picture(rid, width_emu, width_emu * px_h // max(px_w, 1))
+
+    def close(self):
+        if self._doc is None:
+            return
+        self._write(_SECT_PR + "</w:body></w:document>")
+        self.flush()
+        self._doc.close()
+        self._doc = None
+
+        rels = [f'<Relationship Id="rId1" Type="{RT_STYLES}" Target="styles.xml"/>']
+        for rid, name, data in self._media:
+            # JPEG sudah terkompres; format lain (PNG dari PyMuPDF) masih menyusut dengan deflate
+            method = zipfile.ZIP_STORED if name.endswith((".jpeg", ".jpg")) else zipfile.ZIP_DEFLATED
+            self._zip.writestr(f"word/{name}", data, compress_type=method)
+            rels.append(f'<Relationship Id="{rid}" Type="{RT_IMAGE}" Target="{name}"/>')
+        self._media = []
+        self._zip.writestr("word/styles.xml", _STYLES)
+        self._zip.writestr(
+            "word/_rels/document.xml.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="{NS_PKG_REL}">{"".join(rels)}</Relationships>'
+        )
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            if self._doc is not None:
+                self._doc.close()
+                self._doc = None
+            self._zip.close()
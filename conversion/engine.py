@@ -1,34 +1,58 @@
+import copy
+import io
 import os
+import threading
 from .strategies import DocToPdfStrategy, PdfToDocxStrategy, PdfToDocStrategy
+from .office import office_backend_name
+from .sources import describe, is_stream, output_size, read_source, source_size
+from utils.capabilities import probe_ms_word
+from utils import metrics
+
+
+class _PerThread:
+    """Atribut last_* disimpan per thread: job paralel lewat submit() tidak saling menimpa."""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        return self if obj is None else getattr(obj._local, self.name, None)
+
+    def __set__(self, obj, value):
+        setattr(obj._local, self.name, value)
 
 
 class ConversionEngine:
-    def __init__(self, has_ms_word: bool = None):
-        self.has_ms_word = self._detect_ms_word() if has_ms_word is None else has_ms_word
+    last_error = _PerThread()
+    last_preflight = _PerThread()
+    last_report = _PerThread()
+    last_metrics = _PerThread()
+
+    def __init__(self, has_ms_word: bool = None, refresh_probe: bool = False):
+        self._local = threading.local()
+        self.has_ms_word = self._detect_ms_word(refresh_probe) if has_ms_word is None else has_ms_word
+        self.office_backend = office_backend_name(self.has_ms_word)
+        self.last_error = None
+        self.last_preflight = None
+        self.last_report = None
+        self.last_metrics = None
         self._setup_strategies()
         self._print_initialization_info()
     
-    def _detect_ms_word(self) -> bool:
+    def _detect_ms_word(self, refresh: bool = False) -> bool:
         print("Mendeteksi Microsoft Word...")
-        try:
-            import comtypes.client
-            word = comtypes.client.CreateObject('Word.Application')
-            word.Visible = False
-            word.Quit()
-            print("Microsoft Word terdeteksi")
-            return True
-        except Exception as e:
-            print(f"Microsoft Word tidak terdeteksi: {e}")
-            return False
+        # Hasil probe di-cache di disk; Word hanya dijalankan kalau cache tidak valid
+        return probe_ms_word(refresh)
     
     def _print_initialization_info(self):
         print("\n" + "="*50)
         print("DOCUMENT CONVERSION ENGINE")
         print("="*50)
         print(f"MS Word: {'TERDETEKSI' if self.has_ms_word else 'TIDAK'}")
-        print(f"DOC/DOCX → PDF: {'OK' if self.has_ms_word else 'DOCX ONLY'}")
+        print(f"Office backend: {self.office_backend or 'TIDAK ADA'}")
+        print(f"DOC/DOCX → PDF: {'OK' if self.office_backend else 'DOCX ONLY (renderer native)'}")
         print(f"PDF → DOCX: OK")
-        print(f"PDF → DOC: {'OK' if self.has_ms_word else 'TIDAK'}")
+        print(f"PDF → DOC: {'OK' if self.office_backend else 'TIDAK'}")
         print("="*50 + "\n")
     
     def _setup_strategies(self):
@@ -42,22 +66,100 @@ class ConversionEngine:
         if conversion_type not in self.strategies:
             raise ValueError(f"Tipe tidak didukung: {conversion_type}")
         
-        strategy = self.strategies[conversion_type]
-        if conversion_type == 'pdf_to_docx' and 'method' in kwargs:
-            strategy = PdfToDocxStrategy(kwargs['method'])
+        # Salinan per panggilan: last_preflight/last_report milik strategy tidak dibagi antar thread submit()
+        strategy = copy.copy(self.strategies[conversion_type])
+        timeout, max_rss_mb = kwargs.get('timeout'), kwargs.get('max_rss_mb')
+        pages, incremental = kwargs.get('pages'), kwargs.get('incremental', False)
+        if conversion_type == 'pdf_to_docx' and any(k in kwargs for k in ('method', 'workers', 'timeout', 'max_rss_mb',
+                                                                         'pages', 'incremental')):
+            # Tiap metode fallback diisolasi sendiri → timeout pdf2docx tetap lanjut ke pymupdf
+            strategy = PdfToDocxStrategy(kwargs.get('method', 'auto'), kwargs.get('workers', 1),
+                                         timeout=timeout, max_rss_mb=max_rss_mb,
+                                         pages=pages, incremental=incremental)
         
+        # Batas timeout/RSS diteruskan ke strategy: bagian yang berjalan di proses ini diisolasi,
+        # sedangkan Word/LibreOffice tetap di pool yang hangat dan hanya dibatasi waktunya
+        if conversion_type == 'doc_to_pdf' and any(k in kwargs for k in ('renderer', 'pages', 'timeout', 'max_rss_mb')):
+            strategy = DocToPdfStrategy(self.has_ms_word, kwargs.get('renderer', 'auto'), pages=pages,
+                                        timeout=timeout, max_rss_mb=max_rss_mb)
+
+        if conversion_type == 'pdf_to_doc' and any(k in kwargs for k in ('method', 'pages', 'incremental',
+                                                                        'timeout', 'max_rss_mb')):
+            strategy = PdfToDocStrategy(PdfToDocxStrategy(kwargs.get('method', 'auto'), pages=pages,
+                                                          incremental=incremental, timeout=timeout,
+                                                          max_rss_mb=max_rss_mb),
+                                        self.has_ms_word, timeout=timeout)
+
+        self.last_error = None
+        self.last_preflight = None
+        self.last_report = None
+        with metrics.job("convert", type=conversion_type) as m:
+            try:
+                m.count("bytes_in", source_size(input_file))
+            except OSError:
+                pass
+            ok = self._run_strategy(strategy, input_file, output_file)
+            if ok and (is_stream(output_file) or os.path.exists(output_file)):
+                m.count("bytes_out", output_size(output_file))
+            if not ok:
+                m.status, m.error = "error", self.last_error
+        self.last_metrics = m.to_dict()
+        return ok
+
+    def convert_bytes(self, conversion_type: str, source, sink=None, **kwargs):
+        """Konversi di memori: `source` berupa bytes atau file-like, hasilnya bytes
+        (atau ditulis ke `sink` file-like, lalu None dikembalikan). Gagal → RuntimeError.
+
+        PDF → DOCX dan DOCX → PDF (renderer native) tidak menyentuh disk sama sekali;
+        Word/LibreOffice (DOC, PDF → DOC) tetap memakai file sementara.
+        """
+        data = read_source(source)
+        out = io.BytesIO() if sink is None else sink
+        if not self.convert(conversion_type, data, out, **kwargs):
+            raise RuntimeError(self.last_error or "konversi gagal")
+        return out.getvalue() if sink is None else None
+
+    def submit(self, conversion_type: str, input_file: str, output_file: str,
+               priority: str = "normal", **kwargs):
+        """Jalankan convert() di scheduler bersama; hasilnya Future (output_file, atau exception kalau gagal).
+
+        priority: "interactive", "normal", atau "batch". Di dalam satu lane, file dengan
+        halaman/ukuran lebih kecil dikerjakan lebih dulu. future.cancel() membatalkan job yang belum mulai.
+        """
+        from .scheduler import get_scheduler, estimate_cost
+        if conversion_type not in self.strategies:
+            raise ValueError(f"Tipe tidak didukung: {conversion_type}")
+        return get_scheduler().submit(self._convert_or_raise, conversion_type, input_file, output_file,
+                                      cost=estimate_cost(input_file), lane=priority,
+                                      name=f"{conversion_type}:{os.path.basename(input_file)}", **kwargs)
+
+    def _convert_or_raise(self, conversion_type: str, input_file: str, output_file: str, **kwargs) -> str:
+        if not self.convert(conversion_type, input_file, output_file, **kwargs):
+            raise RuntimeError(self.last_error or "konversi gagal")
+        return output_file
+
+    async def convert_async(self, conversion_type: str, input_file: str, output_file: str,
+                            priority: str = "normal", **kwargs) -> str:
+        import asyncio  # Hanya untuk pemanggil async; tidak memperlambat start CLI
+        return await asyncio.wrap_future(self.submit(conversion_type, input_file, output_file, priority, **kwargs))
+
+    def _run_strategy(self, strategy, input_file: str, output_file: str) -> bool:
         try:
-            print(f"Konversi: {input_file} → {output_file}")
+            print(f"Konversi: {describe(input_file)} → {describe(output_file)}")
             return strategy.convert(input_file, output_file)
         except Exception as e:
+            self.last_error = str(e)
             print(f"Gagal: {e}")
             return False
+        finally:
+            self.last_preflight = getattr(strategy, 'last_preflight', None)
+            self.last_report = getattr(strategy, 'last_report', None)
     
     def get_supported_conversions(self) -> dict:
         return {
             'doc_to_pdf': {
                 'desc': 'DOC/DOCX → PDF',
-                'in': ['.docx', '.doc'] if self.has_ms_word else ['.docx'],
+                'in': ['.docx', '.doc'] if self.office_backend else ['.docx'],
                 'out': '.pdf',
                 'ok': True
             },
@@ -69,9 +171,9 @@ class ConversionEngine:
             },
             'pdf_to_doc': {
                 'desc': 'PDF → DOC',
-                'in': ['.pdf'] if self.has_ms_word else [],
+                'in': ['.pdf'] if self.office_backend else [],
                 'out': '.doc',
-                'ok': self.has_ms_word
+                'ok': bool(self.office_backend)
             }
         }
     
@@ -88,4 +190,4 @@ class ConversionEngine:
 
 
 def create_conversion_engine(force: bool = False):
-    return ConversionEngine(has_ms_word=None if force else None)
\ No newline at end of file
+    return ConversionEngine(has_ms_word=None, refresh_probe=force)
\ No newline at end of file
@@ -0,0 +1,118 @@
+# conversion/isolation.py
+import multiprocessing
+import os
+import signal
+import time
+from utils.memory import descendant_pids, process_tree_rss, format_mb
+
+# Status hasil: ok | error | timeout | oom | crash
+POLL_INTERVAL = 0.1
+
+
+class IsolationError(Exception):
+    """Job di proses anak dihentikan (timeout/oom) atau mati tanpa hasil (crash)."""
+
+    def __init__(self, status: str, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+def _child_main(conn, func, args, kwargs):
+    # Grup proses sendiri: worker yang dibuat job (--jobs) bisa dihentikan sekaligus
+    if hasattr(os, "setsid"):
+        os.setsid()
+    try:
+        result = func(*args, **kwargs)
+    except BaseException as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    else:
+        conn.send(("ok", result))
+    finally:
+        conn.close()
+
+
+def run_isolated(func, args=(), kwargs=None, timeout: float = None, max_rss_mb: int = None) -> dict:
+    """Jalankan func(*args, **kwargs) di proses anak yang diawasi.
+
+    Proses dihentikan kalau melewati `timeout` detik (status "timeout") atau RSS-nya
+    (termasuk worker yang dibuatnya) melewati `max_rss_mb` (status "oom"). Proses yang mati tanpa mengirim hasil
+    (segfault, dibunuh OOM killer, ...) dilaporkan sebagai "crash".
+    """
+    ctx = multiprocessing.get_context()
+    # Bukan daemon: job di dalamnya boleh membuat worker sendiri (mis. --jobs); seluruh grupnya dibunuh di finally
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_child_main, args=(child_conn, func, args, kwargs or {}))
+    start = time.perf_counter()
+    proc.start()
+    child_conn.close()
+
+    limit = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+    peak = 0
+    status, payload = None, None
+    try:
+        while True:
+            if parent_conn.poll(POLL_INTERVAL):
+                try:
+                    status, payload = parent_conn.recv()
+                except EOFError:
+                    status = "crash"
+                break
+            if not proc.is_alive():
+                # Hasil mungkin terkirim tepat sebelum proses keluar
+                if parent_conn.poll():
+                    continue
+                status = "crash"
+                break
+            rss = process_tree_rss(proc.pid)
+            if rss:
+                peak = max(peak, rss)
+            elapsed = time.perf_counter() - start
+            if timeout and elapsed > timeout:
+                status, payload = "timeout", f"melewati batas waktu {timeout:g}s"
+                break
+            if limit and rss and rss > limit:
+                status, payload = "oom", f"RSS {format_mb(rss)} melewati batas {max_rss_mb} MB"
+                break
+    finally:
+        if status not in ("ok", "error"):
+            _kill_tree(proc)
+        proc.join()
+        parent_conn.close()
+
+    if status == "crash":
+        payload = f"proses anak berhenti tanpa hasil (exit code {proc.exitcode})"
+    result = {
+        'status': status,
+        'elapsed': time.perf_counter() - start,
+        'peak_rss': peak or None,
+        'result': payload if status == "ok" else None,
+        'error': None if status == "ok" else payload,
+    }
+    return result
+
+
+def _kill_tree(proc):
+    # Juga dipanggil setelah crash: worker yang ditinggal anak tidak boleh terus berjalan
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+            return
+        except OSError:
+            pass  # Anak belum sempat membuat grup sendiri
+    for pid in descendant_pids(proc.pid):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
+    if proc.is_alive():
+        proc.kill()
+
+
+def call_isolated(func, args=(), kwargs=None, timeout: float = None, max_rss_mb: int = None):
+    """Seperti run_isolated, tetapi mengembalikan hasil langsung atau melempar exception."""
+    outcome = run_isolated(func, args, kwargs, timeout, max_rss_mb)
+    if outcome['status'] == "ok":
+        return outcome['result']
+    if outcome['status'] == "error":
+        raise Exception(outcome['error'])
+    raise IsolationError(outcome['status'], outcome['error'])
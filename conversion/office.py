@@ -0,0 +1,476 @@
+# conversion/office.py
+import atexit
+import os
+import json
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from pathlib import Path
+from utils.capabilities import has_module
+from . import uno_helper
+
+FORMATS = ("pdf", "doc", "docx")
+# Interval pemeriksaan batas waktu job di OfficePool.convert
+TIMEOUT_POLL_INTERVAL = 0.1
+
+
+class OfficeBackend(ABC):
+    """Satu instance aplikasi office (proses terpisah) yang dipakai ulang untuk banyak file.
+
+    Method dipanggil dari satu thread yang sama (wajib untuk COM).
+    """
+
+    name = "office"
+
+    @classmethod
+    @abstractmethod
+    def available(cls) -> bool: pass
+    @abstractmethod
+    def start(self): pass
+    @abstractmethod
+    def convert(self, input_file: str, output_file: str, fmt: str): pass
+    @abstractmethod
+    def stop(self): pass
+
+    def is_alive(self) -> bool:
+        return True
+
+    def kill(self):
+        """Hentikan paksa job yang sedang berjalan; boleh dipanggil dari thread lain."""
+
+
+class WordBackend(OfficeBackend):
+    name = "word"
+    FILE_FORMATS = {"pdf": 17, "doc": 0, "docx": 16}  # wdFormatPDF, wdFormatDocument, wdFormatXMLDocument
+
+    def __init__(self):
+        self._word = None
+
+    @classmethod
+    def available(cls) -> bool:
+        return sys.platform == "win32" and has_module("comtypes")
+
+    def start(self):
+        import comtypes
+        import comtypes.client
+        comtypes.CoInitialize()
+        try:
+            self._word = comtypes.client.CreateObject('Word.Application')
+            self._word.Visible = False
+            self._word.DisplayAlerts = 0
+        except Exception:
+            comtypes.CoUninitialize()
+            raise
+
+    def convert(self, input_file: str, output_file: str, fmt: str):
+        doc = self._word.Documents.Open(os.path.abspath(input_file), ReadOnly=True,
+                                        AddToRecentFiles=False)
+        try:
+            doc.SaveAs(os.path.abspath(output_file), FileFormat=self.FILE_FORMATS[fmt])
+        finally:
+            doc.Close(False)
+
+    def is_alive(self) -> bool:
+        try:
+            self._word.Documents.Count
+            return True
+        except Exception:
+            return False
+
+    def stop(self):
+        import comtypes
+        try:
+            if self._word is not None:
+                self._word.Quit()
+        except Exception:
+            pass
+        self._word = None
+        comtypes.CoUninitialize()
+
+
+class LibreOfficeBackend(OfficeBackend):
+    """soffice --headless yang tetap hidup; dokumen dikirim lewat UNO (conversion/uno_helper.py).
+
+    Kalau modul `uno` tidak ada di interpreter ini (biasanya venv), UNO dijalankan lewat
+    helper di Python yang punya `uno`: env DOCCONV_UNO_PYTHON, Python bawaan LibreOffice,
+    atau python3 sistem. Tanpa itu, tiap job memanggil `soffice --convert-to` (ada peringatan).
+    """
+
+    name = "libreoffice"
+    FILTERS = uno_helper.FILTERS
+    UNO_PYTHONS = ("/usr/bin/python3", "/usr/local/bin/python3")
+    _uno_python_cache = {}
+    _warned = False
+
+    def __init__(self):
+        self._proc = None
+        self._desktop = None
+        self._helper = None
+        self._cli_proc = None
+        self._profile = tempfile.mkdtemp(prefix="docconv-lo-")
+
+    @staticmethod
+    def _soffice():
+        return shutil.which("soffice") or shutil.which("libreoffice")
+
+    @classmethod
+    def available(cls) -> bool:
+        return cls._soffice() is not None
+
+    @classmethod
+    def uno_python(cls):
+        """Interpreter lain yang bisa meng-import `uno` (None kalau tidak ada); hasilnya di-cache."""
+        soffice = cls._soffice()
+        if soffice not in cls._uno_python_cache:
+            program = Path(soffice).resolve().parent if soffice else None
+            candidates = [os.environ.get("DOCCONV_UNO_PYTHON")]
+            if program is not None:
+                candidates += [str(program / "python"), str(program / "python.exe")]
+            candidates += cls.UNO_PYTHONS
+            found = None
+            for python in filter(None, candidates):
+                if not os.path.isfile(python) or os.path.realpath(python) == os.path.realpath(sys.executable):
+                    continue
+                try:
+                    probe = subprocess.run([python, "-c", "import uno"], capture_output=True, timeout=30)
+                except (OSError, subprocess.TimeoutExpired):
+                    continue
+                if probe.returncode == 0:
+                    found = python
+                    break
+            cls._uno_python_cache[soffice] = found
+        return cls._uno_python_cache[soffice]
+
+    def _profile_url(self) -> str:
+        return Path(self._profile).as_uri()
+
+    def start(self):
+        if has_module("uno"):
+            try:
+                self._proc, self._desktop = uno_helper.launch(self._soffice(), self._profile_url())
+            except Exception:
+                self.stop()
+                raise
+            return
+        python = self.uno_python()
+        if python is None:
+            if not LibreOfficeBackend._warned:
+                LibreOfficeBackend._warned = True
+                print("[WARN] Modul `uno` tidak ditemukan: LibreOffice dijalankan ulang untuk setiap file "
+                      "(lebih lambat). Set DOCCONV_UNO_PYTHON ke Python yang punya `uno` "
+                      "(mis. python3 sistem dengan paket python3-uno).")
+            return
+        # Grup proses sendiri: kill() ikut menghentikan soffice yang dijalankan helper
+        self._helper = subprocess.Popen(
+            [python, uno_helper.__file__, self._soffice(), self._profile_url()],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+            start_new_session=hasattr(os, "killpg"))
+        reply = self._helper_reply()
+        if not reply.get("ok"):
+            self.stop()
+            raise RuntimeError(reply.get("error") or "Helper UNO gagal dijalankan")
+
+    def _helper_reply(self) -> dict:
+        line = self._helper.stdout.readline()
+        if not line:
+            raise RuntimeError("Helper UNO berhenti tanpa jawaban")
+        return json.loads(line)
+
+    def convert(self, input_file: str, output_file: str, fmt: str):
+        if self._desktop is not None:
+            return uno_helper.convert(self._desktop, input_file, output_file, fmt)
+        if self._helper is None:
+            return self._convert_cli(input_file, output_file, fmt)
+        job = {"input": os.path.abspath(input_file), "output": os.path.abspath(output_file), "fmt": fmt}
+        try:
+            self._helper.stdin.write(json.dumps(job) + "\n")
+            self._helper.stdin.flush()
+        except OSError:
+            raise RuntimeError("Helper UNO berhenti tanpa jawaban")
+        reply = self._helper_reply()
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error"))
+
+    def _convert_cli(self, input_file: str, output_file: str, fmt: str):
+        out_dir = tempfile.mkdtemp(prefix="docconv-out-")
+        try:
+            self._cli_proc = subprocess.Popen(
+                [self._soffice(), "--headless", "--norestore", f"-env:UserInstallation={self._profile_url()}",
+                 "--convert-to", f"{fmt}:{self.FILTERS[fmt]}", "--outdir", out_dir, os.path.abspath(input_file)],
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            _, stderr = self._cli_proc.communicate()
+            if self._cli_proc.returncode:
+                raise subprocess.CalledProcessError(self._cli_proc.returncode, "soffice", stderr=stderr)
+            produced = Path(out_dir) / f"{Path(input_file).stem}.{fmt}"
+            if not produced.exists():
+                raise RuntimeError(f"LibreOffice tidak menghasilkan {produced.name}")
+            shutil.move(str(produced), output_file)
+        finally:
+            self._cli_proc = None
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+    def is_alive(self) -> bool:
+        proc = self._helper or self._proc
+        return proc is None or proc.poll() is None
+
+    def kill(self):
+        # soffice yang dibunuh membuat panggilan UNO/CLI di thread slot gagal → slot memulai instance baru
+        if self._helper is not None and self._helper.poll() is None and hasattr(os, "killpg"):
+            try:
+                os.killpg(self._helper.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        for proc in (self._proc, self._helper, self._cli_proc):
+            if proc is not None and proc.poll() is None:
+                proc.kill()
+
+    def stop(self):
+        uno_helper.terminate(self._proc, self._desktop)
+        self._proc = self._desktop = None
+        if self._helper is not None:
+            try:
+                self._helper.stdin.close()  # helper menghentikan soffice lalu keluar
+            except OSError:
+                pass
+            try:
+                self._helper.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.kill()
+                self._helper.wait()
+            self._helper = None
+        shutil.rmtree(self._profile, ignore_errors=True)
+
+
+class FakeBackend(OfficeBackend):
+    """Backend palsu untuk menguji logika pool tanpa Word/LibreOffice.
+
+    `fail_on` / `crash_on`: substring nama file yang memicu error biasa / "crash"
+    (backend dianggap mati sampai di-restart).
+    """
+
+    name = "fake"
+
+    def __init__(self, delay: float = 0.0, fail_on: str = None, crash_on: str = None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.crash_on = crash_on
+        self.alive = False
+        self.jobs = 0
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def start(self):
+        self.alive = True
+        self.jobs = 0
+
+    def convert(self, input_file: str, output_file: str, fmt: str):
+        name = os.path.basename(input_file)
+        if self.crash_on and self.crash_on in name:
+            self.alive = False
+            raise RuntimeError("fake backend crash")
+        if self.fail_on and self.fail_on in name:
+            raise ValueError(f"fake backend gagal: {name}")
+        time.sleep(self.delay)
+        shutil.copyfile(input_file, output_file)
+        self.jobs += 1
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+    def kill(self):
+        self.alive = False
+
+    def stop(self):
+        self.alive = False
+
+
+BACKENDS = {b.name: b for b in (WordBackend, LibreOfficeBackend, FakeBackend)}
+
+
+class OfficePool:
+    """Pool backend office berumur panjang.
+
+    Tiap slot punya thread sendiri yang memegang satu instance backend; instance
+    di-restart setelah `max_jobs` job atau setelah crash (is_alive() False).
+    """
+
+    def __init__(self, backend_factory, size: int = 1, max_jobs: int = 50):
+        self.backend_factory = backend_factory
+        self.size = max(1, size)
+        self.max_jobs = max_jobs
+        self.pid = os.getpid()
+        self.stats = {'jobs': 0, 'failed': 0, 'starts': 0, 'restarts': 0}
+        self._jobs = queue.Queue()
+        # Backend yang sedang mengerjakan tiap future (untuk kill saat timeout)
+        self._running = {}
+        self._killed = set()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._closed = False
+
+    def _ensure_threads(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("OfficePool sudah ditutup")
+            while len(self._threads) < self.size:
+                t = threading.Thread(target=self._slot, daemon=True, name=f"office-{len(self._threads)}")
+                self._threads.append(t)
+                t.start()
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _slot(self):
+        backend, done = None, 0
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+                future, input_file, output_file, fmt = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if backend is not None and (done >= self.max_jobs or not backend.is_alive()):
+                        backend.stop()
+                        backend = None
+                        self._count('restarts')
+                    if backend is None:
+                        candidate = self.backend_factory()
+                        candidate.start()
+                        backend, done = candidate, 0
+                        self._count('starts')
+                    with self._lock:
+                        self._running[future] = backend
+                    try:
+                        backend.convert(input_file, output_file, fmt)
+                    finally:
+                        with self._lock:
+                            self._running.pop(future, None)
+                            killed = future in self._killed
+                            self._killed.discard(future)
+                    if killed:
+                        raise RuntimeError("Backend office dihentikan karena melewati batas waktu")
+                    done += 1
+                    self._count('jobs')
+                    future.set_result(output_file)
+                except BaseException as e:
+                    self._count('failed')
+                    future.set_exception(e)
+                    # Backend yang mati dibuang; job berikutnya memulai instance baru
+                    if backend is not None and not backend.is_alive():
+                        try:
+                            backend.stop()
+                        except Exception:
+                            pass
+                        backend = None
+                        self._count('restarts')
+        finally:
+            if backend is not None:
+                backend.stop()
+
+    def submit(self, input_file: str, output_file: str, fmt: str) -> Future:
+        if fmt not in FORMATS:
+            raise ValueError(f"Format office tidak didukung: {fmt}")
+        self._ensure_threads()
+        future = Future()
+        self._jobs.put((future, input_file, output_file, fmt))
+        return future
+
+    def convert(self, input_file: str, output_file: str, fmt: str, timeout: float = None) -> str:
+        """Konversi lewat pool. `timeout` dihitung sejak job mulai dikerjakan (bukan sejak antri);
+        kalau terlewati, instance yang mengerjakannya dihentikan paksa dan IsolationError("timeout") dilempar.
+        Slot lain dan instance yang sudah hangat tidak terpengaruh.
+        """
+        future = self.submit(input_file, output_file, fmt)
+        if not timeout:
+            return future.result()
+        started = None
+        while True:
+            try:
+                return future.result(TIMEOUT_POLL_INTERVAL)
+            except FutureTimeout:
+                pass
+            if started is None and future.running():
+                started = time.monotonic()
+            if started is not None and time.monotonic() - started > timeout:
+                self._kill(future)
+                from .isolation import IsolationError
+                raise IsolationError("timeout", f"backend office melewati batas waktu {timeout:g}s")
+
+    def _kill(self, future: Future):
+        with self._lock:
+            backend = self._running.get(future)
+            if backend is not None:
+                self._killed.add(future)
+        if backend is not None:
+            backend.kill()
+
+    def shutdown(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for _ in threads:
+            self._jobs.put(None)
+        for t in threads:
+            t.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+
+
+def office_backend_name(has_ms_word: bool = False) -> str:
+    """Backend yang dipakai: env DOCCONV_OFFICE_BACKEND, lalu Word (kalau terdeteksi), lalu LibreOffice."""
+    forced = os.environ.get("DOCCONV_OFFICE_BACKEND", "").lower()
+    if forced:
+        if forced not in BACKENDS:
+            raise ValueError(f"DOCCONV_OFFICE_BACKEND tidak dikenal: {forced}")
+        return forced
+    if has_ms_word and WordBackend.available():
+        return "word"
+    if LibreOfficeBackend.available():
+        return "libreoffice"
+    return None
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_office_pool(name: str) -> OfficePool:
+    """Pool bersama per backend untuk proses ini (dibuat ulang setelah fork)."""
+    size = int(os.environ.get("DOCCONV_OFFICE_WORKERS", "1"))
+    max_jobs = int(os.environ.get("DOCCONV_OFFICE_MAX_JOBS", "50"))
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None or pool.pid != os.getpid():
+            pool = OfficePool(BACKENDS[name], size=size, max_jobs=max_jobs)
+            _pools[name] = pool
+        return pool
+
+
+def shutdown_pools():
+    with _pools_lock:
+        pools = [p for p in _pools.values() if p.pid == os.getpid()]
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+# Pastikan Word/soffice ditutup saat program selesai
+atexit.register(shutdown_pools)
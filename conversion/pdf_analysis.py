@@ -0,0 +1,235 @@
+# conversion/pdf_analysis.py
+import hashlib
+import re
+import fitz  # PyMuPDF
+from .sources import open_pdf
+
+# Ambang klasifikasi halaman (rasio terhadap luas halaman)
+IMAGE_AREA_RASTER = 0.5     # gambar menutupi ≥ 50% halaman (hasil scan) → rasterisasi
+IMAGE_AREA_MIXED = 0.2      # 20–50% gambar: rasterisasi hanya kalau teksnya sedikit
+TEXT_AREA_LOW = 0.1
+VECTOR_PATHS_HEAVY = 500    # halaman dengan banyak path vektor dipertahankan
+
+
+def _area(rect, clip) -> float:
+    rect = fitz.Rect(rect) & clip
+    return 0.0 if rect.is_empty else rect.width * rect.height
+
+
+def page_stats(page) -> dict:
+    clip = page.rect
+    page_area = clip.width * clip.height or 1.0
+    text_area = sum(_area(b[:4], clip) for b in page.get_text("blocks") if b[6] == 0)
+    image_area = sum(_area(info["bbox"], clip) for info in page.get_image_info())
+    return {
+        'text': min(1.0, text_area / page_area),
+        'image': min(1.0, image_area / page_area),
+        'paths': len(page.get_cdrawings()),
+    }
+
+
+FONT_FILE_KEYS = ("FontFile", "FontFile2", "FontFile3")
+
+
+def _xref_of(doc, xref: int, key: str) -> int:
+    kind, value = doc.xref_get_key(xref, key)
+    if kind == "array":  # DescendantFonts: [15 0 R]
+        value = value.strip("[] ")
+    return int(value.split()[0]) if kind in ("xref", "array") and value.endswith("R") else 0
+
+
+# Nomor objek ("12 0 R") berubah setiap kali PDF disimpan ulang dengan garbage collection / insert_pdf
+_INDIRECT_REF = re.compile(rb"\d+ \d+ R")
+
+
+def _object_digest(doc, xref: int) -> bytes:
+    """Teks dict objek tanpa nomor objek di dalamnya (referensi di-resolve terpisah oleh pemanggil)."""
+    return _INDIRECT_REF.sub(b"R", doc.xref_object(xref, compressed=True).encode())
+
+
+def _font_digest(doc, xref: int) -> bytes:
+    """Hash font (nama, subtype, encoding, descriptor) beserta stream file font yang di-embed.
+
+    Tidak bergantung pada nomor objek, jadi tetap sama setelah PDF disimpan ulang / dipotong.
+    """
+    h = hashlib.sha256(_object_digest(doc, xref))
+    # ToUnicode menentukan teks hasil ekstraksi (PDF → DOCX)
+    to_unicode = _xref_of(doc, xref, "ToUnicode")
+    if to_unicode:
+        h.update(doc.xref_stream_raw(to_unicode) or b"")
+    descendant = _xref_of(doc, xref, "DescendantFonts")
+    for font in (xref, descendant) if descendant else (xref,):
+        if font != xref:
+            h.update(_object_digest(doc, font))
+        descriptor = _xref_of(doc, font, "FontDescriptor")
+        if not descriptor:
+            continue
+        h.update(_object_digest(doc, descriptor))
+        for key in FONT_FILE_KEYS:
+            stream = _xref_of(doc, descriptor, key)
+            if stream:
+                h.update(doc.xref_stream_raw(stream) or b"")
+    return h.digest()
+
+
+def _annot_digest(doc, xref: int) -> bytes:
+    """Hash anotasi: dict-nya (Rect, isi, flag, warna) dan appearance stream yang dirender."""
+    h = hashlib.sha256(_object_digest(doc, xref))
+    appearance = _xref_of(doc, xref, "AP/N")
+    if appearance:
+        h.update(doc.xref_stream_raw(appearance) or b"")
+    return h.digest()
+
+
+def page_fingerprint(doc, pno: int, font_cache: dict = None) -> str:
+    """Sidik jari isi satu halaman: ukuran/rotasi, content stream, gambar, form XObject, font, dan anotasi.
+
+    Halaman yang tidak diedit menghasilkan sidik jari yang sama walaupun halaman lain berubah.
+    `font_cache` (dict per dokumen) mencegah file font yang dipakai banyak halaman di-hash berulang.
+    """
+    page = doc[pno]
+    h = hashlib.sha256()
+    h.update(repr((tuple(page.rect), page.rotation)).encode())
+    h.update(page.read_contents())
+    for xref in sorted({img[0] for img in page.get_images(full=True)} |
+                       {xobj[0] for xobj in page.get_xobjects()}):
+        h.update(doc.xref_stream_raw(xref) or b"")
+    font_cache = {} if font_cache is None else font_cache
+    for font in page.get_fonts(full=True):
+        if font[0] not in font_cache:
+            font_cache[font[0]] = _font_digest(doc, font[0])
+        h.update(font_cache[font[0]])
+    for xref, _, _ in page.annot_xrefs():
+        h.update(_annot_digest(doc, xref))
+    return h.hexdigest()
+
+
+def classify_page(page):
+    """Kembalikan ("raster" | "keep", stats) untuk satu halaman."""
+    stats = page_stats(page)
+    if stats['image'] >= IMAGE_AREA_RASTER:
+        return "raster", stats
+    if (stats['image'] >= IMAGE_AREA_MIXED and stats['text'] < TEXT_AREA_LOW
+            and stats['paths'] < VECTOR_PATHS_HEAVY):
+        return "raster", stats
+    return "keep", stats
+
+
+# Preflight PDF → DOCX: pilih metode sebelum konversi dimulai
+PREFLIGHT_SAMPLE_PAGES = 24
+SCANNED_RATIO = 0.8         # ≥ 80% halaman sampel hanya gambar → pdf2docx tidak berguna
+TYPE3_RATIO = 0.5           # font Type3 (glyph berupa gambar) sering membuat pdf2docx gagal
+LARGE_DOC_PAGES = 1000
+MIN_CHARS_TEXT_PAGE = 20
+# Perkiraan detik per halaman (diukur dari benchmarks/ pada PDF teks biasa)
+SECONDS_PER_PAGE = {'pdf2docx': 0.06, 'pymupdf': 0.004, 'text_only': 0.002}
+SECONDS_PER_IMAGE = {'pdf2docx': 0.05, 'pymupdf': 0.01, 'text_only': 0.0}
+
+
+def _sample_pages(total: int, count: int) -> list:
+    if total <= count:
+        return list(range(total))
+    step = total / count
+    return sorted({int(i * step) for i in range(count)})
+
+
+def preflight(input_path: str, available=('pdf2docx', 'pymupdf', 'text_only')) -> dict:
+    """Analisis cepat (beberapa halaman sampel) untuk memilih metode PDF → DOCX.
+
+    Mengembalikan dict berisi statistik dokumen, 'method', 'reasons', dan 'estimate' (detik).
+    """
+    doc = open_pdf(input_path)
+    try:
+        info = {'pages': len(doc), 'encrypted': doc.is_encrypted, 'locked': False}
+        if doc.needs_pass and not doc.authenticate(""):
+            info['locked'] = True
+            info.update(method=None, reasons=["PDF dikunci password"], estimate=0.0)
+            return info
+
+        sample = _sample_pages(len(doc), PREFLIGHT_SAMPLE_PAGES)
+        text_pages = image_only = empty = images = 0
+        fonts, type3 = set(), set()
+        for pno in sample:
+            page = doc[pno]
+            chars = len(page.get_text("text").strip())
+            page_images = page.get_images()
+            images += len(page_images)
+            if page_images and chars < MIN_CHARS_TEXT_PAGE:
+                # Teks pendek di atas gambar besar biasanya sisa OCR/stempel, bukan layout teks
+                clip = page.rect
+                image_area = sum(_area(i["bbox"], clip) for i in page.get_image_info())
+                scanned = not chars or image_area >= IMAGE_AREA_RASTER * clip.width * clip.height
+            else:
+                scanned = False
+            if scanned:
+                image_only += 1
+            elif chars:
+                text_pages += 1
+            else:
+                empty += 1
+            for font in doc.get_page_fonts(pno):
+                fonts.add(font[0])
+                if font[2] == "Type3":
+                    type3.add(font[0])
+
+        n = len(sample) or 1
+        info.update({
+            'sampled': len(sample),
+            'text_ratio': text_pages / n,
+            'scanned_ratio': image_only / n,
+            'empty_ratio': empty / n,
+            'images_per_page': images / n,
+            'fonts': len(fonts),
+            'type3_fonts': len(type3),
+        })
+
+        reasons = []
+        if info['encrypted']:
+            reasons.append("terenkripsi (tanpa password pengguna)")
+        if info['scanned_ratio'] >= SCANNED_RATIO or (info['text_ratio'] == 0 and image_only):
+            method = 'pymupdf'
+            reasons.append(f"{info['scanned_ratio']:.0%} halaman hanya gambar (scan) → tidak ada layout teks untuk pdf2docx")
+        elif info['text_ratio'] == 0:
+            method = 'text_only'
+            reasons.append("tidak ada lapisan teks maupun gambar")
+        elif fonts and len(type3) / len(fonts) >= TYPE3_RATIO:
+            method = 'pymupdf'
+            reasons.append(f"{len(type3)}/{len(fonts)} font Type3 → pdf2docx sering gagal")
+        elif info['pages'] > LARGE_DOC_PAGES:
+            method = 'pymupdf'
+            reasons.append(f"{info['pages']} halaman > {LARGE_DOC_PAGES} → pdf2docx terlalu lambat")
+        else:
+            method = 'pdf2docx'
+            reasons.append(f"lapisan teks di {info['text_ratio']:.0%} halaman → pertahankan layout")
+
+        # Turun ke metode berikutnya kalau library untuk metode pilihan tidak terpasang
+        order = ('pdf2docx', 'pymupdf', 'text_only')
+        for candidate in order[order.index(method):]:
+            if candidate in available:
+                if candidate != method:
+                    reasons.append(f"{method} tidak tersedia → {candidate}")
+                method = candidate
+                break
+        else:
+            method = None
+
+        if method:
+            info['estimate'] = info['pages'] * (SECONDS_PER_PAGE[method]
+                                                + info['images_per_page'] * SECONDS_PER_IMAGE[method])
+        else:
+            info['estimate'] = 0.0
+        info.update(method=method, reasons=reasons)
+        return info
+    finally:
+        doc.close()
+
+
+def print_preflight(info: dict):
+    if info['locked']:
+        print(f"[PREFLIGHT] {info['pages']} halaman, PDF dikunci password")
+        return
+    print(f"[PREFLIGHT] {info['pages']} halaman (sampel {info['sampled']}): teks {info['text_ratio']:.0%}, "
+          f"scan {info['scanned_ratio']:.0%}, {info['fonts']} font "
+          f"→ metode {info['method']} (perkiraan {info['estimate']:.1f}s)")
+    for reason in info['reasons']:
+        print(f"  - {reason}")
@@ -0,0 +1,95 @@
+# conversion/pdf_stream_writer.py
+
+
+class StreamingPdfWriter:
+    """Menulis PDF berisi halaman-halaman gambar JPEG langsung ke file.
+
+    Setiap objek langsung ditulis ke disk; yang disimpan di memori hanya offset
+    objek dan daftar halaman, jadi pemakaian memori tidak tumbuh dengan jumlah halaman.
+    """
+
+    CATALOG_ID = 1
+    PAGES_ID = 2
+
+    def __init__(self, output_path):
+        # output_path juga boleh file-like (mis. io.BytesIO); file-like tidak ditutup oleh writer
+        self._owns_fh = not hasattr(output_path, "write")
+        self._fh = open(output_path, "wb") if self._owns_fh else output_path
+        self._closed = False
+        self._offsets = {}
+        self._page_ids = []
+        self._next_id = 3
+        self._fh.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write_object(self, obj_id: int, body: bytes, stream: bytes = None):
+        self._offsets[obj_id] = self._fh.tell()
+        self._fh.write(f"{obj_id} 0 obj\n".encode())
+        self._fh.write(body)
+        if stream is not None:
+            self._fh.write(b"\nstream\n")
+            self._fh.write(stream)
+            self._fh.write(b"\nendstream")
+        self._fh.write(b"\nendobj\n")
+
+    def _new_id(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def add_jpeg(self, jpeg_bytes: bytes, width: int, height: int, gray: bool = False) -> int:
+        obj_id = self._new_id()
+        colorspace = "/DeviceGray" if gray else "/DeviceRGB"
+        body = (f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                f"/ColorSpace {colorspace} /BitsPerComponent 8 /Filter /DCTDecode "
+                f"/Length {len(jpeg_bytes)} >>").encode()
+        self._write_object(obj_id, body, jpeg_bytes)
+        return obj_id
+
+    def add_image_page(self, width: float, height: float, image_id: int) -> int:
+        content = f"q {width:g} 0 0 {height:g} 0 0 cm /Im0 Do Q".encode()
+        content_id = self._new_id()
+        self._write_object(content_id, f"<< /Length {len(content)} >>".encode(), content)
+
+        page_id = self._new_id()
+        body = (f"<< /Type /Page /Parent {self.PAGES_ID} 0 R /MediaBox [0 0 {width:g} {height:g}] "
+                f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> "
+                f"/Contents {content_id} 0 R >>").encode()
+        self._write_object(page_id, body)
+        self._page_ids.append(page_id)
+        return page_id
+
+    def flush(self):
+        self._fh.flush()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        kids = " ".join(f"{p} 0 R" for p in self._page_ids)
+        self._write_object(self.PAGES_ID,
+                           f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode())
+        self._write_object(self.CATALOG_ID, f"<< /Type /Catalog /Pages {self.PAGES_ID} 0 R >>".encode())
+
+        xref_pos = self._fh.tell()
+        size = self._next_id
+        self._fh.write(f"xref\n0 {size}\n".encode())
+        self._fh.write(b"0000000000 65535 f \n")
+        for obj_id in range(1, size):
+            self._fh.write(f"{self._offsets[obj_id]:010d} 00000 n \n".encode())
+        self._fh.write(f"trailer\n<< /Size {size} /Root {self.CATALOG_ID} 0 R >>\n"
+                       f"startxref\n{xref_pos}\n%%EOF\n".encode())
+        self._release()
+
+    def _release(self):
+        if self._owns_fh:
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._closed = True
+            self._release()
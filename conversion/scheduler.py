@@ -0,0 +1,167 @@
+# conversion/scheduler.py
+import atexit
+import os
+import re
+import threading
+import time
+import zipfile
+from concurrent.futures import Future
+from pathlib import Path
+
+LANES = ("interactive", "normal", "batch")
+# Satuan biaya = "halaman"; file tanpa jumlah halaman dihitung dari ukurannya
+PAGES_PER_MB = 1.0
+DOCX_BYTES_PER_PAGE = 50 * 1024
+# Job yang menunggu lama pelan-pelan dianggap lebih murah supaya job besar tidak tertahan selamanya
+AGING_PAGES_PER_SECOND = 5.0
+
+
+def estimate_cost(path: str) -> float:
+    """Perkiraan biaya job dari jumlah halaman (PDF/DOCX) dan ukuran file, dalam satuan halaman."""
+    try:
+        size_mb = os.path.getsize(path) / 1e6
+    except OSError:
+        return 0.0
+    ext = Path(path).suffix.lower()
+    pages = None
+    try:
+        if ext == ".pdf":
+            import fitz
+            with fitz.open(path) as pdf:
+                pages = pdf.page_count
+        elif ext == ".docx":
+            # Word menyimpan jumlah halaman terakhir di docProps/app.xml; tidak perlu membuka dokumen.
+            # Generator lain (mis. python-docx) membiarkan nilai template, jadi ukuran tetap jadi batas bawah
+            with zipfile.ZipFile(path) as z:
+                app = z.read("docProps/app.xml").decode("utf-8", "ignore")
+            match = re.search(r"<Pages>(\d+)</Pages>", app)
+            pages = max(int(match.group(1)), size_mb * 1e6 / DOCX_BYTES_PER_PAGE) if match else None
+    except Exception:
+        pages = None
+    if pages is None:
+        return size_mb * 1e6 / DOCX_BYTES_PER_PAGE if ext in (".docx", ".doc") else size_mb * PAGES_PER_MB
+    return pages + size_mb * PAGES_PER_MB
+
+
+class ScheduledJob(Future):
+    """Future untuk satu job; cancel() membatalkan job yang belum mulai."""
+
+    def __init__(self, name: str, cost: float, lane: str):
+        super().__init__()
+        self.name = name
+        self.cost = cost
+        self.lane = lane
+        self.submitted = time.monotonic()
+
+    def __repr__(self):
+        return f"<ScheduledJob {self.name} lane={self.lane} cost={self.cost:.1f} {self._state}>"
+
+
+class JobScheduler:
+    """Executor bersama: job diambil per lane prioritas, lalu yang termurah lebih dulu.
+
+    Job kecil dari GUI/server tidak perlu menunggu dokumen 1.000 halaman di depannya.
+    """
+
+    def __init__(self, workers: int = 2):
+        self.workers = max(1, workers)
+        self.pid = os.getpid()
+        self._pending = []
+        self._cond = threading.Condition()
+        self._threads = []
+        self._closed = False
+
+    def _ensure_threads(self):
+        while len(self._threads) < self.workers:
+            t = threading.Thread(target=self._worker, daemon=True, name=f"scheduler-{len(self._threads)}")
+            self._threads.append(t)
+            t.start()
+
+    def submit(self, fn, *args, cost: float = 1.0, lane: str = "normal", name: str = None,
+               **kwargs) -> ScheduledJob:
+        if lane not in LANES:
+            raise ValueError(f"Prioritas tidak dikenal: {lane}. Harus: {', '.join(LANES)}")
+        job = ScheduledJob(name or getattr(fn, "__name__", "job"), cost, lane)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler sudah ditutup")
+            self._ensure_threads()
+            self._pending.append((job, fn, args, kwargs))
+            self._cond.notify()
+        return job
+
+    def _key(self, item, now: float):
+        job = item[0]
+        return LANES.index(job.lane), job.cost - AGING_PAGES_PER_SECOND * (now - job.submitted)
+
+    def _next(self):
+        with self._cond:
+            while True:
+                # Job yang sudah di-cancel dibuang tanpa dijalankan
+                self._pending = [item for item in self._pending if not item[0].cancelled()]
+                if self._pending:
+                    now = time.monotonic()
+                    item = min(self._pending, key=lambda i: self._key(i, now))
+                    self._pending.remove(item)
+                    return item
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    def _worker(self):
+        while True:
+            item = self._next()
+            if item is None:
+                break
+            job, fn, args, kwargs = item
+            if not job.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                job.set_exception(e)
+            else:
+                job.set_result(result)
+
+    def pending(self) -> list:
+        with self._cond:
+            now = time.monotonic()
+            items = sorted((i for i in self._pending if not i[0].cancelled()), key=lambda i: self._key(i, now))
+            return [job for job, *_ in items]
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        with self._cond:
+            self._closed = True
+            if cancel_pending:
+                for job, *_ in self._pending:
+                    job.cancel()
+                self._pending = []
+            self._cond.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for t in threads:
+                t.join()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> JobScheduler:
+    """Scheduler bersama untuk proses ini; jumlah worker dari env DOCCONV_SCHEDULER_WORKERS."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None or _scheduler.pid != os.getpid() or _scheduler._closed:
+            _scheduler = JobScheduler(int(os.environ.get("DOCCONV_SCHEDULER_WORKERS", "2")))
+        return _scheduler
+
+
+def shutdown_scheduler():
+    with _scheduler_lock:
+        scheduler = _scheduler if _scheduler is not None and _scheduler.pid == os.getpid() else None
+    if scheduler is not None:
+        scheduler.shutdown(wait=True)
+
+
+# Job yang sudah diterima diselesaikan dulu sebelum program keluar (dan sebelum pool office ditutup)
+atexit.register(shutdown_scheduler)
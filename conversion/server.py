@@ -0,0 +1,368 @@
+# conversion/server.py
+import contextlib
+import io
+import json
+import os
+import queue
+import signal
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib import request as urlrequest
+from urllib.error import HTTPError
+from utils import metrics
+
+OPS = ("convert", "compress")
+# Opsi yang diteruskan ke engine.convert / compressor.compress; selain ini ditolak
+CONVERT_OPTIONS = ("method", "workers", "renderer", "timeout", "max_rss_mb", "pages", "incremental")
+COMPRESS_OPTIONS = ("level", "force", "workers", "mode", "stream", "max_memory_mb", "target_size",
+                    "timeout", "max_rss_mb", "pages", "incremental")
+FINISHED = ("done", "failed", "cancelled")
+MAX_BODY = 1024 * 1024
+# Seberapa sering worker yang menganggur memeriksa apakah server sedang berhenti
+STOP_POLL_INTERVAL = 0.2
+
+
+class ServerBusy(Exception):
+    """Job ditolak sementara (antrian penuh atau server sedang drain)."""
+
+
+class JobManager:
+    """Antrian job dengan sejumlah worker thread; tiap worker memegang engine & compressor sendiri.
+
+    Engine dibuat sekali saat start() lalu dipakai ulang untuk semua job, jadi import,
+    deteksi Word, dan pool office tetap hangat selama server hidup.
+    """
+
+    def __init__(self, engine_factory, compressor_factory, workers: int = 2, max_queue: int = 100,
+                 keep_finished: int = 500):
+        self.engine_factory = engine_factory
+        self.compressor_factory = compressor_factory
+        self.workers = max(1, workers)
+        self.keep_finished = keep_finished
+        self.supported = {}
+        self.draining = False
+        self._queue = queue.Queue(max_queue)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        # Banner engine dibungkam; dibuat di thread ini sebelum HTTP menerima request
+        with contextlib.redirect_stdout(io.StringIO()):
+            slots = [(self.engine_factory(), self.compressor_factory()) for _ in range(self.workers)]
+        self.supported = {k: v for k, v in slots[0][0].get_supported_conversions().items() if v['ok']}
+        for i, (engine, compressor) in enumerate(slots):
+            t = threading.Thread(target=self._worker, args=(engine, compressor), daemon=True,
+                                 name=f"job-worker-{i}")
+            self._threads.append(t)
+            t.start()
+
+    def _validate(self, spec: dict) -> dict:
+        op = spec.get("op")
+        if op not in OPS:
+            raise ValueError(f"op harus salah satu dari: {', '.join(OPS)}")
+        if not spec.get("input") or not spec.get("output"):
+            raise ValueError("input dan output wajib diisi")
+        input_path = os.path.abspath(spec["input"])
+        if not os.path.isfile(input_path):
+            raise ValueError(f"File input tidak ada: {input_path}")
+        options = spec.get("options") or {}
+        if not isinstance(options, dict):
+            raise ValueError("options harus berupa object")
+        allowed = CONVERT_OPTIONS if op == "convert" else COMPRESS_OPTIONS
+        unknown = sorted(set(options) - set(allowed))
+        if unknown:
+            raise ValueError(f"Opsi tidak dikenal untuk {op}: {', '.join(unknown)}")
+        conversion_type = spec.get("type")
+        if op == "convert" and conversion_type not in self.supported:
+            raise ValueError(f"type harus salah satu dari: {', '.join(self.supported)}")
+        return {
+            'id': uuid.uuid4().hex[:12],
+            'op': op,
+            'type': conversion_type if op == "convert" else None,
+            'input': input_path,
+            'output': os.path.abspath(spec["output"]),
+            'options': options,
+            'status': "queued",
+            'submitted': time.time(),
+            'started': None,
+            'finished': None,
+            'elapsed': None,
+            'error': None,
+            'metrics': None,
+        }
+
+    def submit(self, spec: dict) -> dict:
+        job = self._validate(spec)
+        with self._lock:
+            if self.draining:
+                raise ServerBusy("Server sedang berhenti, job baru tidak diterima")
+            try:
+                self._queue.put_nowait(job['id'])
+            except queue.Full:
+                raise ServerBusy("Antrian penuh, coba lagi nanti")
+            self._jobs[job['id']] = job
+            return dict(job)
+
+    def get(self, job_id: str) -> dict:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self) -> list:
+        with self._lock:
+            return [dict(job) for job in self._jobs.values()]
+
+    def cancel(self, job_id: str) -> dict:
+        """Batalkan job yang masih antri; job yang sedang berjalan tidak bisa dibatalkan."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job and job['status'] == "queued":
+                job['status'] = "cancelled"
+                job['finished'] = time.time()
+            return dict(job) if job else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {'workers': self.workers, 'queued': counts.get("queued", 0),
+                'running': counts.get("running", 0), 'jobs': counts, 'draining': self.draining}
+
+    def _worker(self, engine, compressor):
+        while True:
+            try:
+                job_id = self._queue.get(timeout=STOP_POLL_INTERVAL)
+            except queue.Empty:
+                if self._stop.is_set():
+                    break
+                continue
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job['status'] != "queued":
+                    continue
+                job['status'] = "running"
+                job['started'] = time.time()
+            try:
+                record = self._run(job, engine, compressor)
+                status, error = "done", None
+            except Exception as e:
+                record, status, error = None, "failed", str(e)
+            with self._lock:
+                job.update(status=status, error=error, finished=time.time())
+                job['elapsed'] = round(job['finished'] - job['started'], 3)
+                job['metrics'] = record
+                self._prune()
+
+    @staticmethod
+    def _run(job: dict, engine, compressor) -> dict:
+        Path(job['output']).parent.mkdir(parents=True, exist_ok=True)
+        if job['op'] == "convert":
+            if not engine.convert(job['type'], job['input'], job['output'], **job['options']):
+                raise RuntimeError(engine.last_error or "konversi gagal")
+            return engine.last_metrics
+        options = dict(job['options'])
+        level = options.pop("level", "medium")
+        # Job luar ini dipakai bersama oleh compress() di dalamnya, jadi record-nya bisa dikembalikan
+        with metrics.job("compress", level=level) as m:
+            compressor.compress(job['input'], job['output'], level, **options)
+        return m.to_dict()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job['status'] in FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    def drain(self, timeout: float = None) -> bool:
+        """Tolak job baru, selesaikan job yang sudah diterima, lalu hentikan worker.
+
+        Kalau `timeout` habis, job yang masih antri dibatalkan dan False dikembalikan.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self.draining = True
+        # Worker berhenti sendiri begitu antrian kosong; tidak ada put() yang bisa macet di antrian penuh
+        self._stop.set()
+        for t in self._threads:
+            t.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        if not any(t.is_alive() for t in self._threads):
+            return True
+        # Waktu habis: keluarkan job yang masih antri supaya worker tidak mengambilnya lagi
+        while True:
+            try:
+                job_id = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job and job['status'] == "queued":
+                    job['status'] = "cancelled"
+                    job['finished'] = time.time()
+        return False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "docconv"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, code: int, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _job_id(self) -> str:
+        parts = self.path.rstrip("/").split("/")
+        return parts[2] if len(parts) == 3 and parts[1] == "jobs" else None
+
+    def do_GET(self):
+        manager = self.server.manager
+        if self.path == "/health":
+            self._send(200, {'status': "draining" if manager.draining else "ok",
+                             'supported': sorted(manager.supported), **manager.stats()})
+        elif self.path.rstrip("/") == "/jobs":
+            self._send(200, {'jobs': manager.list()})
+        elif self._job_id():
+            job = manager.get(self._job_id())
+            self._send(200, job) if job else self._send(404, {'error': "job tidak ditemukan"})
+        else:
+            self._send(404, {'error': "path tidak dikenal"})
+
+    def do_POST(self):
+        if self.path == "/shutdown":
+            self.server.request_stop()
+            self._send(202, {'status': "draining"})
+            return
+        if self.path.rstrip("/") != "/jobs":
+            self._send(404, {'error': "path tidak dikenal"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self._send(413, {'error': "request terlalu besar"})
+            return
+        try:
+            spec = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(spec, dict):
+                raise ValueError("body harus berupa object JSON")
+            self._send(202, self.server.manager.submit(spec))
+        except ServerBusy as e:
+            self._send(503 if self.server.manager.draining else 429, {'error': str(e)})
+        except ValueError as e:
+            self._send(400, {'error': str(e)})
+
+    def do_DELETE(self):
+        job = self.server.manager.cancel(self._job_id()) if self._job_id() else None
+        if job is None:
+            self._send(404, {'error': "job tidak ditemukan"})
+        elif job['status'] != "cancelled":
+            self._send(409, job)
+        else:
+            self._send(200, job)
+
+
+class ConversionServer:
+    """HTTP JSON API lokal di atas JobManager.
+
+    POST /jobs, GET /jobs, GET /jobs/<id>, DELETE /jobs/<id>, GET /health, POST /shutdown.
+    SIGINT/SIGTERM/POST /shutdown → drain: job baru ditolak (503), status tetap bisa
+    dipantau sampai semua job yang sudah diterima selesai.
+    """
+
+    def __init__(self, manager: JobManager, host: str = "127.0.0.1", port: int = 8765,
+                 drain_timeout: float = None):
+        self.manager = manager
+        self.drain_timeout = drain_timeout
+        self._stop = threading.Event()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.manager = manager
+        self.httpd.request_stop = self._stop.set
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        self.manager.start()
+        thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="http")
+        thread.start()
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda *_: self._stop.set())
+        print(f"Server berjalan di {self.url} ({self.manager.workers} worker)")
+        while not self._stop.wait(0.5):
+            pass
+        self.shutdown()
+
+    def stop(self):
+        self._stop.set()
+
+    def shutdown(self) -> bool:
+        print("Menunggu job yang sedang berjalan selesai...")
+        drained = self.manager.drain(self.drain_timeout)
+        if not drained:
+            print("[WARN] Batas waktu drain habis, job yang masih antri dibatalkan")
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        print("Server berhenti")
+        return drained
+
+
+class ServerClient:
+    """Klien kecil (stdlib saja) untuk API server, mis. untuk skrip dan pengujian lokal."""
+
+    def __init__(self, url: str = "http://127.0.0.1:8765", timeout: float = 30):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _call(self, method: str, path: str, payload: dict = None) -> dict:
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        req = urlrequest.Request(self.url + path, data=data, method=method,
+                                 headers={"Content-Type": "application/json"})
+        try:
+            with urlrequest.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read())
+        except HTTPError as e:
+            body = json.loads(e.read() or b"{}")
+            raise RuntimeError(f"HTTP {e.code}: {body.get('error', body)}") from None
+
+    def health(self) -> dict:
+        return self._call("GET", "/health")
+
+    def convert(self, conversion_type: str, input_file: str, output_file: str, **options) -> dict:
+        return self._call("POST", "/jobs", {'op': "convert", 'type': conversion_type, 'input': input_file,
+                                            'output': output_file, 'options': options})
+
+    def compress(self, input_file: str, output_file: str, **options) -> dict:
+        return self._call("POST", "/jobs", {'op': "compress", 'input': input_file,
+                                            'output': output_file, 'options': options})
+
+    def status(self, job_id: str) -> dict:
+        return self._call("GET", f"/jobs/{job_id}")
+
+    def cancel(self, job_id: str) -> dict:
+        return self._call("DELETE", f"/jobs/{job_id}")
+
+    def wait(self, job_id: str, timeout: float = None, interval: float = 0.2) -> dict:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.status(job_id)
+            if job['status'] in FINISHED:
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Job {job_id} belum selesai")
+            time.sleep(interval)
+
+    def shutdown(self) -> dict:
+        return self._call("POST", "/shutdown")
@@ -0,0 +1,82 @@
+# conversion/shared_input.py
+"""Input job yang dibagi ke proses worker tanpa disalin per worker.
+
+File dipetakan dengan mmap (halamannya dibagi lewat page cache OS), data di memori disalin
+sekali ke multiprocessing.shared_memory. Worker hanya menerima InputHandle yang kecil, lalu
+attach_input() memberi memoryview tanpa salinan yang bisa dibuka langsung oleh PyMuPDF.
+"""
+import mmap
+import os
+from .sources import is_data
+
+# Buffer yang sudah di-attach di proses ini; tetap hidup selama dokumen PyMuPDF memakainya
+_attached = {}
+
+
+class InputHandle:
+    """Referensi ke input bersama; murah di-pickle ke proses worker."""
+
+    __slots__ = ("kind", "name", "size")
+
+    def __init__(self, kind: str, name: str, size: int):
+        self.kind = kind
+        self.name = name
+        self.size = size
+
+    def __getstate__(self):
+        return self.kind, self.name, self.size
+
+    def __setstate__(self, state):
+        self.kind, self.name, self.size = state
+
+    def __repr__(self):
+        return f"<InputHandle {self.kind}:{self.name} {self.size} byte>"
+
+
+class SharedInput:
+    """Dipakai di proses induk selama worker berjalan: `with SharedInput(src) as handle: ...`
+
+    Path → handle mmap (tidak ada yang dibaca di induk); bytes → satu salinan ke shared memory
+    yang di-unlink saat keluar dari blok.
+    """
+
+    def __init__(self, src):
+        self.src = src
+        self._shm = None
+
+    def __enter__(self) -> InputHandle:
+        src = self.src
+        if isinstance(src, InputHandle):
+            return src
+        if is_data(src):
+            from multiprocessing import shared_memory
+            size = len(src)
+            self._shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+            self._shm.buf[:size] = src
+            return InputHandle("shm", self._shm.name, size)
+        return InputHandle("file", os.path.abspath(src), os.path.getsize(src))
+
+    def __exit__(self, *exc):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+def attach_input(src):
+    """InputHandle → memoryview (sekali per proses); path dan bytes dikembalikan apa adanya."""
+    if not isinstance(src, InputHandle):
+        return src
+    key = (src.kind, src.name)
+    if key not in _attached:
+        if src.size == 0:
+            _attached[key] = (None, memoryview(b""))
+        elif src.kind == "shm":
+            from multiprocessing import shared_memory
+            shm = shared_memory.SharedMemory(name=src.name)
+            _attached[key] = (shm, shm.buf[:src.size])
+        else:
+            with open(src.name, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            _attached[key] = (mapped, memoryview(mapped))
+    return _attached[key][1]
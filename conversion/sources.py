@@ -0,0 +1,127 @@
+# conversion/sources.py
+"""Input/output yang bisa berupa path file atau data di memori.
+
+Input: path, bytes/bytearray/memoryview, atau file-like yang bisa dibaca.
+Output: path, atau file-like yang bisa ditulis (mis. io.BytesIO, response stream).
+"""
+import io
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+DATA_TYPES = (bytes, bytearray, memoryview)
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def is_data(src) -> bool:
+    return isinstance(src, DATA_TYPES)
+
+
+def is_stream(obj) -> bool:
+    return hasattr(obj, "read") or hasattr(obj, "write")
+
+
+def read_source(src):
+    """File-like dibaca sekali menjadi bytes; path dan bytes dikembalikan apa adanya."""
+    if is_stream(src):
+        return src.read()
+    return src
+
+
+def as_file(src):
+    """Untuk API yang menerima path atau file-like (zipfile, python-docx)."""
+    return io.BytesIO(src) if is_data(src) else src
+
+
+def open_pdf(src, **kwargs):
+    import fitz
+    if is_data(src):
+        try:
+            return fitz.open(stream=src, filetype="pdf", **kwargs)
+        except TypeError:
+            # PyMuPDF lama hanya menerima bytes; memoryview (mmap/shared memory) disalin sekali
+            if isinstance(src, bytes):
+                raise
+            return fitz.open(stream=bytes(src), filetype="pdf", **kwargs)
+    return fitz.open(src, **kwargs) if kwargs else fitz.open(src)
+
+
+def source_size(src) -> int:
+    return len(src) if is_data(src) else os.path.getsize(src)
+
+
+def output_size(out) -> int:
+    if isinstance(out, io.BytesIO):
+        return out.getbuffer().nbytes
+    return out.tell() if is_stream(out) else os.path.getsize(out)
+
+
+def copy_source(src, out):
+    """Salin input apa adanya ke output (path/bytes → path/file-like)."""
+    reset_output(out)
+    if is_data(src):
+        if is_stream(out):
+            out.write(src)
+        else:
+            with open(out, "wb") as f:
+                f.write(src)
+    elif is_stream(out):
+        with open(src, "rb") as f:
+            shutil.copyfileobj(f, out, COPY_CHUNK_SIZE)
+    elif not os.path.exists(out) or not os.path.samefile(src, out):
+        shutil.copyfile(src, out)
+
+
+def describe(obj) -> str:
+    return "<memori>" if is_data(obj) or is_stream(obj) else str(obj)
+
+
+def sniff_format(data) -> str:
+    """Ekstensi dari magic bytes: PDF, DOCX (zip), atau DOC (OLE)."""
+    head = bytes(data[:8])
+    if head.startswith(b"%PDF"):
+        return ".pdf"
+    if head.startswith(b"PK"):
+        return ".docx"
+    if head.startswith(b"\xd0\xcf\x11\xe0"):
+        return ".doc"
+    return ""
+
+
+def reset_output(out):
+    """Kosongkan buffer output sebelum ditulis ulang (mis. koreksi target ukuran)."""
+    if is_stream(out):
+        out.seek(0)
+        out.truncate()
+
+
+@contextmanager
+def materialized_input(src, suffix: str):
+    """Path untuk backend yang hanya bisa membaca file (Word/LibreOffice)."""
+    if not is_data(src):
+        yield src
+        return
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix="docconv-in-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(src)
+        yield path
+    finally:
+        os.remove(path)
+
+
+@contextmanager
+def materialized_output(out, suffix: str):
+    """Path sementara untuk backend yang hanya bisa menulis file; isinya disalin ke `out` di akhir."""
+    if not is_stream(out):
+        yield out
+        return
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix="docconv-out-")
+    os.close(fd)
+    try:
+        yield path
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, out, COPY_CHUNK_SIZE)
+    finally:
+        os.remove(path)
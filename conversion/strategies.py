@@ -1,38 +1,23 @@
+import io
 import os
+import sys
 import tempfile
 import shutil
 from abc import ABC, abstractmethod
+from utils.capabilities import has_module
+from utils.file_handler import FileHandler
+from .office import office_backend_name
+from .shared_input import SharedInput, attach_input
+from .sources import (as_file, is_data, is_stream, open_pdf, sniff_format,
+                      materialized_input, materialized_output)
+from utils import metrics
 
-try:
-    from docx2pdf import convert as docx2pdf_convert
-    LIBRARY_AVAILABLE = True
-except ImportError:
-    LIBRARY_AVAILABLE = False
-
-try:
-    import comtypes.client
-    COMTYPES_AVAILABLE = True
-except ImportError:
-    COMTYPES_AVAILABLE = False
-
-try:
-    import fitz
-    PYMUPDF_AVAILABLE = True
-except ImportError:
-    PYMUPDF_AVAILABLE = False
-
-try:
-    from docx import Document
-    from docx.shared import Inches
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
-
-try:
-    from pdf2docx import Converter
-    PDF2DOCX_CONVERTER_AVAILABLE = True
-except ImportError:
-    PDF2DOCX_CONVERTER_AVAILABLE = False
+# Cek ketersediaan tanpa meng-import library berat (fitz, pdf2docx, comtypes, ...);
+# library baru di-import di dalam method yang memakainya.
+LIBRARY_AVAILABLE = has_module("docx2pdf")
+PYMUPDF_AVAILABLE = has_module("fitz")
+DOCX_AVAILABLE = has_module("docx")
+PDF2DOCX_CONVERTER_AVAILABLE = has_module("pdf2docx")
 
 
 class ConversionStrategy(ABC):
@@ -43,149 +28,454 @@ class ConversionStrategy(ABC):
 
 
 class DocToPdfStrategy(ConversionStrategy):
-    def __init__(self, has_ms_word: bool = False):
+    RENDERERS = ("auto", "native", "office")
+
+    def __init__(self, has_ms_word: bool = False, renderer: str = "auto", pages=None,
+                 timeout: float = None, max_rss_mb: int = None):
+        if renderer not in self.RENDERERS:
+            raise ValueError(f"Renderer tidak dikenal: {renderer}. Harus: {', '.join(self.RENDERERS)}")
         self.has_ms_word = has_ms_word
-        self._verified_ms_word = False
+        self.renderer = renderer
+        # Rentang halaman output (lihat FileHandler.parse_page_range); None = semua
+        self.pages = pages
+        # Word (COM) atau LibreOffice headless; instance-nya dipakai ulang lewat pool
+        self.office_backend = office_backend_name(has_ms_word)
+        # Renderer native diisolasi di proses anak; backend office tetap di pool proses ini (hanya timeout)
+        self.timeout = timeout
+        self.max_rss_mb = max_rss_mb
+        self.last_report = None
 
-    def _verify_ms_word(self) -> bool:
-        if not COMTYPES_AVAILABLE: return False
-        try:
-            word = comtypes.client.CreateObject('Word.Application')
-            word.Visible = False
-            word.Quit()
-            return True
-        except: return False
+    @property
+    def native_available(self) -> bool:
+        return PYMUPDF_AVAILABLE and DOCX_AVAILABLE
+
+    @property
+    def heavy_available(self) -> bool:
+        # docx2pdf hanya jalan kalau ada Word (Windows/macOS)
+        return bool(self.office_backend) or (LIBRARY_AVAILABLE and sys.platform in ("win32", "darwin"))
+
+    @staticmethod
+    def _input_ext(input_file) -> str:
+        # Data di memori tidak punya nama file → format dikenali dari isinya
+        return sniff_format(input_file) if is_data(input_file) else os.path.splitext(input_file)[1].lower()
 
     def validate_input(self, input_file: str) -> bool:
-        if not os.path.exists(input_file):
+        if not is_data(input_file) and not os.path.exists(input_file):
             raise FileNotFoundError(f"File tidak ada: {input_file}")
-        ext = os.path.splitext(input_file)[1].lower()
+        ext = self._input_ext(input_file)
         if ext not in ['.doc', '.docx']:
             raise ValueError(f"Format salah: {ext}")
-        if ext == '.doc' and not self.has_ms_word:
-            raise ValueError("DOC butuh MS Word")
-        if ext == '.doc' and not self._verified_ms_word:
-            if not self._verify_ms_word():
-                raise ValueError("MS Word tidak terdeteksi")
-            self._verified_ms_word = True
+        if ext == '.doc' and not self.office_backend:
+            raise ValueError("DOC butuh MS Word atau LibreOffice")
         return True
 
     def convert(self, input_file: str, output_file: str) -> bool:
         self.validate_input(input_file)
-        ext = os.path.splitext(input_file)[1].lower()
-        if ext == '.docx':
+        self.last_report = None
+        if not self.pages:
+            return self._convert_document(input_file, output_file)
+        # Tata letak DOCX baru diketahui setelah dirender → render semua, lalu ambil halamannya
+        buf = io.BytesIO()
+        self._convert_document(input_file, buf)
+        pdf = open_pdf(buf.getvalue())
+        try:
+            pdf.select([n for start, end in FileHandler.resolve_page_ranges(self.pages, len(pdf))
+                        for n in range(start, end)])
+            pdf.save(output_file, garbage=3, deflate=True)
+        finally:
+            pdf.close()
+        return True
+
+    def _convert_document(self, input_file, output_file) -> bool:
+        ext = self._input_ext(input_file)
+        native, unsupported = self._use_native(input_file) if ext == '.docx' else (False, None)
+        if native:
+            from .docx_renderer import render_docx, print_render_report
+            metrics.label("method", "native")
+            if self.timeout or self.max_rss_mb:
+                from .isolation import call_isolated
+                # Proses anak tidak bisa menulis ke file-like milik proses ini → hasilnya dikirim balik
+                target = None if is_stream(output_file) else output_file
+                with metrics.stage("isolated"):
+                    self.last_report, data = call_isolated(_render_native, (input_file, target, unsupported),
+                                                           timeout=self.timeout, max_rss_mb=self.max_rss_mb)
+                if target is None:
+                    output_file.write(data)
+            else:
+                self.last_report = render_docx(as_file(input_file), output_file, unsupported)
+            print_render_report(self.last_report)
+            return True
+        return self._convert_heavy(input_file, output_file)
+
+    def _use_native(self, input_file: str):
+        """(pakai renderer native?, hasil analyze_docx atau None kalau belum dianalisis)."""
+        if self.renderer == "native":
+            if not self.native_available:
+                raise ImportError("Install: pip install python-docx pymupdf")
+            return True, None
+        if self.renderer == "office" or not self.native_available:
+            return False, None
+        if not self.heavy_available:
+            return True, None
+        # Mode auto: dokumen dengan fitur yang tidak didukung renderer native dikirim ke backend berat
+        from .docx_renderer import analyze_docx
+        with metrics.stage("analyze"):
+            unsupported = analyze_docx(as_file(input_file))
+        if unsupported:
+            print(f"[RENDER] Pakai backend office; fitur tidak didukung: {', '.join(sorted(unsupported))}")
+            return False, unsupported
+        return True, unsupported
+
+    def _convert_heavy(self, input_file: str, output_file: str) -> bool:
+        ext = self._input_ext(input_file)
+        if not self.office_backend and ext != '.docx':
+            raise ValueError("DOC butuh MS Word atau LibreOffice")
+        # Word/LibreOffice hanya bisa bekerja dengan file: data di memori ditulis ke file sementara
+        with materialized_input(input_file, ext) as in_path, materialized_output(output_file, ".pdf") as out_path:
+            if self.office_backend:
+                from .office import get_office_pool
+                metrics.label("method", self.office_backend)
+                with metrics.stage("office"):
+                    get_office_pool(self.office_backend).convert(in_path, out_path, "pdf", timeout=self.timeout)
+                return True
             if not LIBRARY_AVAILABLE:
                 raise ImportError("Install: pip install docx2pdf")
-            docx2pdf_convert(input_file, output_file)
-            return True
-        else:
-            word = comtypes.client.CreateObject('Word.Application')
-            word.Visible = False
-            doc = word.Documents.Open(os.path.abspath(input_file))
-            doc.SaveAs(os.path.abspath(output_file), FileFormat=17)
-            doc.Close()
-            word.Quit()
+            from docx2pdf import convert as docx2pdf_convert
+            metrics.label("method", "docx2pdf")
+            with metrics.stage("office"):
+                if self.timeout or self.max_rss_mb:
+                    from .isolation import call_isolated
+                    call_isolated(docx2pdf_convert, (in_path, out_path),
+                                  timeout=self.timeout, max_rss_mb=self.max_rss_mb)
+                else:
+                    docx2pdf_convert(in_path, out_path)
             return True
 
 
+def _render_native(input_file, output_file, unsupported):
+    # Dijalankan di proses anak yang diawasi; output_file None → PDF dikembalikan sebagai bytes
+    from .docx_renderer import render_docx
+    if output_file is None:
+        buf = io.BytesIO()
+        return render_docx(as_file(input_file), buf, unsupported), buf.getvalue()
+    return render_docx(as_file(input_file), output_file, unsupported), None
+
+
+def _convert_shard(methods: tuple, input_file, output_file: str, start: int, end: int,
+                   limits: dict = None) -> bool:
+    # Dijalankan di proses worker: satu potongan halaman [start, end).
+    # input_file berupa InputHandle; di-attach di _convert_range/_run_method
+    strategy = PdfToDocxStrategy(**(limits or {}))
+    return strategy._convert_range(input_file, output_file, start, end, methods)
+
+
+def _run_method(method: str, input_file: str, output_file: str, start: int, end: int):
+    # Dijalankan di proses anak yang diawasi (lihat conversion/isolation.py).
+    # output_file None → hasil dikembalikan sebagai bytes (output induk berupa file-like)
+    runner = PdfToDocxStrategy(method)._runner(method)
+    input_file = attach_input(input_file)
+    if output_file is None:
+        buf = io.BytesIO()
+        runner(input_file, buf, start, end)
+        return buf.getvalue()
+    return runner(input_file, output_file, start, end)
+
+
 class PdfToDocxStrategy(ConversionStrategy):
-    def __init__(self, method: str = "auto"):
+    # Urutan dari yang paling setia layout (dan paling mahal) ke yang paling murah
+    METHODS = ("pdf2docx", "pymupdf", "text_only")
+    # Potongan terlalu kecil malah lebih lambat (tiap worker parse ulang PDF)
+    SHARD_MIN_PAGES = 8
+
+    def __init__(self, method: str = "auto", workers: int = 1, timeout: float = None,
+                 max_rss_mb: int = None, pages=None, incremental: bool = False):
         self.method = method
+        self.workers = workers
+        self.pages = pages
+        # Hasil per halaman disimpan di PageCache; run berikutnya hanya memproses halaman yang berubah
+        self.incremental = incremental
+        # Kalau salah satu batas diisi, tiap percobaan metode berjalan di proses anak terpisah
+        self.timeout = timeout
+        self.max_rss_mb = max_rss_mb
+        self.last_preflight = None
 
     def validate_input(self, input_file: str) -> bool:
+        if is_data(input_file):
+            if sniff_format(input_file) != '.pdf':
+                raise ValueError("Harus PDF")
+            return True
         if not input_file.lower().endswith('.pdf'):
             raise ValueError("Harus PDF")
         if not os.path.exists(input_file):
             raise FileNotFoundError("File PDF tidak ada")
         return True
 
+    @staticmethod
+    def available_methods() -> list:
+        available = {
+            "pdf2docx": PDF2DOCX_CONVERTER_AVAILABLE,
+            "pymupdf": PYMUPDF_AVAILABLE,
+            "text_only": PYMUPDF_AVAILABLE,
+        }
+        return [m for m in PdfToDocxStrategy.METHODS if available[m]]
+
+    def _plan_methods(self, input_file: str):
+        """(urutan metode yang dicoba, jumlah halaman atau None)."""
+        if self.method != "auto":
+            return (self.method,), None
+        from .pdf_analysis import preflight, print_preflight
+        with metrics.stage("preflight"):
+            info = preflight(input_file, self.available_methods())
+        self.last_preflight = info
+        print_preflight(info)
+        if info['locked']:
+            raise ValueError("PDF dikunci password")
+        if info['method'] is None:
+            raise ImportError("Tidak ada metode yang tersedia. Install pdf2docx atau PyMuPDF")
+        # Metode pilihan dulu; metode yang lebih murah jadi cadangan kalau gagal
+        fallbacks = self.METHODS[self.METHODS.index(info['method']):]
+        return tuple(m for m in fallbacks if m in self.available_methods()), info['pages']
+
     def convert(self, input_file: str, output_file: str) -> bool:
         self.validate_input(input_file)
+        methods, total_pages = self._plan_methods(input_file)
+        parallel = self.workers != 1
+        if total_pages is None and (parallel or self.pages or self.incremental):
+            with open_pdf(input_file) as pdf:
+                total_pages = len(pdf)
+        ranges = FileHandler.resolve_page_ranges(self.pages, total_pages) if self.pages else None
+        if self.incremental:
+            return self._convert_incremental(input_file, output_file, ranges or [(0, total_pages)], methods)
+        if ranges and len(ranges) > 1:
+            return self._convert_parts(input_file, output_file, ranges, methods)
+        start, end = ranges[0] if ranges else (0, None)
+        if parallel:
+            shards = self._plan_shards((end or total_pages) - start, start)
+            if len(shards) > 1:
+                return self._convert_sharded(input_file, output_file, shards, methods)
+        return self._convert_range(input_file, output_file, start, end, methods=methods)
 
-        if self.method in ["auto", "pdf2docx"] and PDF2DOCX_CONVERTER_AVAILABLE:
-            try:
-                cv = Converter(input_file)
-                cv.convert(output_file)
-                cv.close()
-                return os.path.exists(output_file)
-            except: pass
+    def _plan_shards(self, total_pages: int, first: int = 0) -> list:
+        workers = self.workers or os.cpu_count() or 1
+        count = max(1, min(workers, total_pages // self.SHARD_MIN_PAGES))
+        size = -(-total_pages // count)
+        return [(first + start, first + min(start + size, total_pages)) for start in range(0, total_pages, size)]
 
-        if self.method in ["auto", "pymupdf"] and PYMUPDF_AVAILABLE and DOCX_AVAILABLE:
-            try:
-                return self._pymupdf(input_file, output_file)
-            except: pass
+    def _merge_parts(self, parts: list, output_file) -> bool:
+        if not DOCX_AVAILABLE:
+            raise ImportError("Install: pip install python-docx")
+        from .docx_merge import merge_docx
+        for part in parts:
+            part.seek(0)
+        with metrics.stage("merge"):
+            merge_docx(parts, output_file)
+        return True
 
-        if self.method in ["auto", "text_only"] and PYMUPDF_AVAILABLE:
-            try:
-                return self._text_only(input_file, output_file)
-            except: pass
+    def _convert_parts(self, input_file, output_file, ranges: list, methods: tuple) -> bool:
+        # Beberapa rentang halaman: tiap rentang dikonversi ke DOCX di memori lalu digabung
+        parts = []
+        for start, end in ranges:
+            part = io.BytesIO()
+            self._convert_range(input_file, part, start, end, methods)
+            parts.append(part)
+        return self._merge_parts(parts, output_file)
 
-        raise Exception("Semua metode gagal. Install pdf2docx")
+    def _convert_incremental(self, input_file, output_file, ranges: list, methods: tuple) -> bool:
+        from .cache import PageCache
+        from .pdf_analysis import page_fingerprint
+        cache = PageCache()
+        page_numbers = [n for start, end in ranges for n in range(start, end)]
+        with metrics.stage("fingerprint"), open_pdf(input_file) as pdf:
+            fonts = {}
+            keys = [cache.make_page_key(page_fingerprint(pdf, n, fonts), kind="docx", methods=list(methods))
+                    for n in page_numbers]
+        parts, converted = [], 0
+        for n, key in zip(page_numbers, keys):
+            data = cache.get(key)
+            if data is None:
+                # Satu halaman per potongan supaya hasilnya bisa dipakai ulang per halaman
+                part = io.BytesIO()
+                self._convert_range(input_file, part, n, n + 1, methods)
+                data = part.getvalue()
+                cache.put(key, data)
+                converted += 1
+            parts.append(io.BytesIO(data))
+        cache.evict()
+        metrics.count("pages_cached", len(parts) - converted)
+        print(f"[INCREMENTAL] {len(parts) - converted}/{len(parts)} halaman dari cache, "
+              f"{converted} dikonversi ulang")
+        return self._merge_parts(parts, output_file)
 
-    def _pymupdf(self, input_file: str, output_file: str) -> bool:
+    def _convert_sharded(self, input_file: str, output_file: str, shards: list, methods: tuple) -> bool:
+        from concurrent.futures import ProcessPoolExecutor
+        if not DOCX_AVAILABLE:
+            raise ImportError("Install: pip install python-docx")
+        from .docx_merge import merge_docx
+        print(f"PDF → DOCX paralel: {len(shards)} potongan halaman, metode={methods[0]}")
         temp_dir = tempfile.mkdtemp()
         try:
-            pdf = fitz.open(input_file)
-            doc = Document()
-            for page in pdf:
-                text = page.get_text()
-                if text.strip():
-                    for line in text.split('\n'):
-                        if line.strip():
-                            doc.add_paragraph(line.strip())
-                for img in page.get_images():
-                    xref = img[0]
-                    pix = fitz.Pixmap(pdf, xref)
-                    if pix.n - pix.alpha < 4:
-                        img_path = os.path.join(temp_dir, f"img_{xref}.png")
-                        pix.save(img_path)
-                        doc.add_picture(img_path, width=Inches(6))
-                        doc.add_paragraph()
-                    pix = None
-                doc.add_page_break()
-            doc.save(output_file)
-            return True
+            parts = [os.path.join(temp_dir, f"part_{i:04d}.docx") for i in range(len(shards))]
+            metrics.count("shards", len(shards))
+            # Semua potongan membaca satu salinan input (mmap/shared memory), bukan salinan per worker
+            with metrics.stage("shards"), SharedInput(input_file) as source, \
+                    ProcessPoolExecutor(max_workers=len(shards)) as ex:
+                limits = {'timeout': self.timeout, 'max_rss_mb': self.max_rss_mb}
+                futures = [ex.submit(_convert_shard, methods, source, part, start, end, limits)
+                           for part, (start, end) in zip(parts, shards)]
+                # result() melempar ulang error dari worker; urutan list = urutan halaman
+                for future, (start, end) in zip(futures, shards):
+                    if not future.result():
+                        raise Exception(f"Gagal konversi halaman {start + 1}-{end}")
+            with metrics.stage("merge"):
+                merge_docx(parts, output_file)
+            metrics.label("method", methods[0])
+            return is_stream(output_file) or os.path.exists(output_file)
         finally:
             shutil.rmtree(temp_dir, ignore_errors=True)
 
-    def _text_only(self, input_file: str, output_file: str) -> bool:
-        pdf = fitz.open(input_file)
-        doc = Document()
-        for page in pdf:
-            text = page.get_text()
-            for line in text.split('\n'):
-                if line.strip():
-                    doc.add_paragraph(line.strip())
-            doc.add_page_break()
-        doc.save(output_file)
-        pdf.close()
-        return True
+    def _convert_range(self, input_file: str, output_file: str, start: int = 0, end: int = None,
+                       methods: tuple = None) -> bool:
+        available = self.available_methods()
+        errors = []
+        if not methods:
+            methods = self.METHODS if self.method == "auto" else (self.method,)
+        for method in methods:
+            if method not in available:
+                errors.append(f"{method}: library tidak terpasang")
+                continue
+            try:
+                if self.timeout or self.max_rss_mb:
+                    from .isolation import call_isolated
+                    # Proses anak tidak bisa menulis ke file-like milik proses ini → hasilnya dikirim balik
+                    target = None if is_stream(output_file) else output_file
+                    with metrics.stage("isolated"):
+                        ok = call_isolated(_run_method, (method, input_file, target, start, end),
+                                           timeout=self.timeout, max_rss_mb=self.max_rss_mb)
+                    if target is None:
+                        output_file.write(ok)
+                        ok = True
+                else:
+                    ok = self._runner(method)(attach_input(input_file), output_file, start, end)
+                metrics.label("method", method)
+                return ok
+            except Exception as e:
+                # Jangan ditelan diam-diam: catat alasannya lalu coba metode berikutnya
+                print(f"[WARN] Metode {method} gagal: {e}")
+                metrics.count("fallbacks")
+                errors.append(f"{method}: {e}")
+        raise Exception("Semua metode gagal (" + "; ".join(errors) + ")")
+
+    def _runner(self, method: str):
+        return {"pdf2docx": self._pdf2docx, "pymupdf": self._pymupdf, "text_only": self._text_only}[method]
+
+    def _pdf2docx(self, input_file: str, output_file: str, start: int = 0, end: int = None) -> bool:
+        from pdf2docx import Converter
+        with metrics.stage("open"):
+            cv = Converter(stream=input_file) if is_data(input_file) else Converter(input_file)
+        try:
+            with metrics.stage("convert"):
+                cv.convert(output_file, start=start, end=end)
+        finally:
+            cv.close()
+        return is_stream(output_file) or os.path.exists(output_file)
+
+    # Format hasil extract_image yang bisa langsung disimpan di DOCX tanpa encode ulang
+    RAW_IMAGE_FORMATS = ("png", "jpeg", "jpg", "gif", "bmp", "tiff")
+
+    @classmethod
+    def _image_part(cls, pdf, xref: int, doc, images: dict):
+        """rId dan ukuran piksel untuk xref; tiap xref hanya di-extract/encode sekali."""
+        if xref in images:
+            return images[xref]
+        import fitz
+        info = pdf.extract_image(xref)
+        if info and info["ext"] in cls.RAW_IMAGE_FORMATS and info["colorspace"] < 4:
+            # Stream asli dipakai apa adanya → tidak ada decode/encode dan tidak ada salinan pixmap
+            result = doc.add_image(info["image"], info["ext"]), (info["width"], info["height"])
+        else:
+            pix = fitz.Pixmap(pdf, xref)
+            if pix.n - pix.alpha < 4:
+                result = doc.add_image(pix.tobytes("png"), "png"), (pix.width, pix.height)
+            else:
+                result = None
+            pix = None
+        images[xref] = result
+        return result
+
+    def _pymupdf(self, input_file: str, output_file: str, start: int = 0, end: int = None) -> bool:
+        from .docx_writer import StreamingDocxWriter
+        with metrics.stage("open"):
+            pdf = open_pdf(input_file)
+        images = {}
+        try:
+            with StreamingDocxWriter(output_file) as doc:
+                for page in pdf.pages(start, end):
+                    with metrics.stage("extract"):
+                        text = page.get_text()
+                    if text.strip():
+                        with metrics.stage("write"):
+                            doc.add_paragraphs(line.strip() for line in text.split('\n') if line.strip())
+                    for img in page.get_images():
+                        with metrics.stage("encode"):
+                            part = self._image_part(pdf, img[0], doc, images)
+                        if part is not None:
+                            rid, size = part
+                            doc.add_picture_width(rid, size)
+                            doc.add_paragraph()
+                    doc.add_page_break()
+                    metrics.count("pages")
+                metrics.count("images", len(images))
+                with metrics.stage("save"):
+                    doc.close()
+            return True
+        finally:
+            pdf.close()
+
+    def _text_only(self, input_file: str, output_file: str, start: int = 0, end: int = None) -> bool:
+        from .docx_writer import StreamingDocxWriter
+        with metrics.stage("open"):
+            pdf = open_pdf(input_file)
+        try:
+            with StreamingDocxWriter(output_file) as doc:
+                for page in pdf.pages(start, end):
+                    with metrics.stage("extract"):
+                        text = page.get_text()
+                    with metrics.stage("write"):
+                        doc.add_paragraphs(line.strip() for line in text.split('\n') if line.strip())
+                        doc.add_page_break()
+                    metrics.count("pages")
+                with metrics.stage("save"):
+                    doc.close()
+            return True
+        finally:
+            pdf.close()
 
 
 class PdfToDocStrategy(ConversionStrategy):
-    def __init__(self, pdf_to_docx_strategy: PdfToDocxStrategy, has_ms_word: bool = False):
+    def __init__(self, pdf_to_docx_strategy: PdfToDocxStrategy, has_ms_word: bool = False,
+                 timeout: float = None):
         self.pdf_to_docx = pdf_to_docx_strategy
         self.has_ms_word = has_ms_word
+        self.office_backend = office_backend_name(has_ms_word)
+        # Tahap PDF → DOCX diisolasi oleh strategy-nya sendiri; tahap office hanya dibatasi waktunya
+        self.timeout = timeout
 
     def validate_input(self, input_file: str) -> bool:
-        if not self.has_ms_word:
-            raise Exception("PDF → DOC butuh MS Word")
-        if not input_file.lower().endswith('.pdf'):
+        if not self.office_backend:
+            raise Exception("PDF → DOC butuh MS Word atau LibreOffice")
+        is_pdf = sniff_format(input_file) == '.pdf' if is_data(input_file) else input_file.lower().endswith('.pdf')
+        if not is_pdf:
             raise ValueError("Input harus PDF")
         return True
 
     def convert(self, input_file: str, output_file: str) -> bool:
         self.validate_input(input_file)
-        temp_docx = tempfile.NamedTemporaryFile(suffix='.docx', delete=False).name
-        try:
-            self.pdf_to_docx.convert(input_file, temp_docx)
-            word = comtypes.client.CreateObject('Word.Application')
-            word.Visible = False
-            doc = word.Documents.Open(temp_docx)
-            doc.SaveAs(output_file, FileFormat=0)
-            doc.Close()
-            word.Quit()
-            return True
-        finally:
-            if os.path.exists(temp_docx):
-                os.remove(temp_docx)
\ No newline at end of file
+        from .office import get_office_pool
+        # DOCX antara dibuat di memori; hanya backend office yang butuh file sementara
+        docx = io.BytesIO()
+        self.pdf_to_docx.convert(input_file, docx)
+        with materialized_input(docx.getbuffer(), ".docx") as temp_docx, \
+                materialized_output(output_file, ".doc") as out_path:
+            with metrics.stage("office"):
+                get_office_pool(self.office_backend).convert(temp_docx, out_path, "doc", timeout=self.timeout)
+        return True
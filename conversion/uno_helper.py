@@ -0,0 +1,114 @@
+# conversion/uno_helper.py
+"""Koneksi UNO ke soffice --headless yang tetap hidup.
+
+Dipakai langsung oleh LibreOfficeBackend kalau `uno` bisa di-import, atau dijalankan sebagai
+script oleh Python yang punya `uno` (Python bawaan LibreOffice / python3 sistem) saat aplikasi
+berjalan di venv. Mode script: satu permintaan JSON per baris di stdin, satu jawaban per baris
+di stdout. Modul ini tidak boleh meng-import modul lain dari project.
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+CONNECT_TIMEOUT = 30
+FILTERS = {"pdf": "writer_pdf_Export", "doc": "MS Word 97", "docx": "MS Word 2007 XML"}
+
+
+def launch(soffice: str, profile_url: str):
+    """Jalankan soffice dengan listener UNO; kembalikan (proses, Desktop)."""
+    import uno
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    proc = subprocess.Popen(
+        [soffice, "--headless", "--invisible", "--nologo", "--norestore", "--nodefault",
+         f"--accept=socket,host=127.0.0.1,port={port};urp;",
+         f"-env:UserInstallation={profile_url}"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    local = uno.getComponentContext()
+    resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+    deadline = time.monotonic() + CONNECT_TIMEOUT
+    while True:
+        try:
+            ctx = resolver.resolve(f"uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext")
+            break
+        except Exception:
+            if time.monotonic() > deadline or proc.poll() is not None:
+                proc.kill()
+                proc.wait()
+                raise RuntimeError("LibreOffice headless tidak bisa dihubungi")
+            time.sleep(0.2)
+    return proc, ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+
+
+def _props(**kwargs):
+    from com.sun.star.beans import PropertyValue
+    props = []
+    for key, value in kwargs.items():
+        prop = PropertyValue()
+        prop.Name, prop.Value = key, value
+        props.append(prop)
+    return tuple(props)
+
+
+def convert(desktop, input_file: str, output_file: str, fmt: str):
+    import uno
+    doc = desktop.loadComponentFromURL(uno.systemPathToFileUrl(os.path.abspath(input_file)),
+                                       "_blank", 0, _props(Hidden=True))
+    if doc is None:
+        raise RuntimeError(f"LibreOffice tidak bisa membuka {input_file}")
+    try:
+        doc.storeToURL(uno.systemPathToFileUrl(os.path.abspath(output_file)),
+                       _props(FilterName=FILTERS[fmt], Overwrite=True))
+    finally:
+        doc.close(True)
+
+
+def terminate(proc, desktop):
+    try:
+        if desktop is not None:
+            desktop.terminate()
+    except Exception:
+        pass
+    if proc is not None:
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def _reply(**kwargs):
+    sys.stdout.write(json.dumps(kwargs) + "\n")
+    sys.stdout.flush()
+
+
+def main(soffice: str, profile_url: str):
+    try:
+        proc, desktop = launch(soffice, profile_url)
+    except Exception as e:
+        _reply(ok=False, error=str(e))
+        return 1
+    _reply(ok=True)
+    try:
+        # stdin ditutup (atau baris kosong) → soffice dihentikan dan helper keluar
+        for line in sys.stdin:
+            if not line.strip():
+                break
+            job = json.loads(line)
+            try:
+                convert(desktop, job["input"], job["output"], job["fmt"])
+            except Exception as e:
+                _reply(ok=False, error=f"{type(e).__name__}: {e}")
+            else:
+                _reply(ok=True)
+    finally:
+        terminate(proc, desktop)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1], sys.argv[2]))
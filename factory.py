@@ -1,17 +1,19 @@
-from conversion.engine import ConversionEngine
-from ui.gui_manager import GUIManager
-from cli.cli_converter import CLIConverter
+# Import dilakukan di dalam method: mode CLI tidak perlu memuat tkinter,
+# dan mode GUI tidak perlu memuat argparse/CLI.
 
 
 class ConverterFactory:
     @staticmethod
     def create_gui_converter():
+        from ui.gui_manager import GUIManager
         return GUIManager()
     
     @staticmethod
     def create_cli_converter():
+        from cli.cli_converter import CLIConverter
         return CLIConverter()
     
     @staticmethod
     def create_conversion_engine(has_ms_word: bool = None):
+        from conversion.engine import ConversionEngine
         return ConversionEngine(has_ms_word)
\ No newline at end of file
@@ -0,0 +1,34 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Cache (hasil kompresi, halaman, capabilities) per test, bukan di home user."""
+    path = tmp_path / "cache"
+    monkeypatch.setenv("DOCCONV_CACHE_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """Buat PDF teks sederhana: make_pdf("a.pdf", pages=3) → path."""
+    import fitz
+
+    def make(name="input.pdf", pages=3, text="Halaman"):
+        path = tmp_path / name
+        doc = fitz.open()
+        for i in range(pages):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"{text} {i + 1}", fontsize=14)
+            page.draw_rect(fitz.Rect(72, 100, 300, 200), color=(0, 0, 1), fill=(0.8, 0.8, 1))
+        doc.save(str(path))
+        doc.close()
+        return str(path)
+
+    return make
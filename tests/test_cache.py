@@ -0,0 +1,55 @@
+# tests/test_cache.py
+import gc
+import multiprocessing
+import pickle
+import weakref
+
+from conversion import isolation
+from conversion.cache import CompressionCache
+from conversion.compressor import DocumentCompressor
+
+
+def test_cache_survives_pickle(tmp_path):
+    cache = CompressionCache(str(tmp_path / "c"))
+    cache._record("misses")
+    clone = pickle.loads(pickle.dumps(cache))
+    assert clone.cache_dir == cache.cache_dir
+    assert clone._pending == {"hits": 0, "misses": 0}
+    clone._record("hits")  # lock baru di proses tujuan
+
+
+def test_isolated_compress_with_cache_under_spawn(tmp_path, make_pdf, monkeypatch):
+    # Default di Windows/macOS: argumen proses anak (termasuk self.cache) harus bisa di-pickle
+    spawn = multiprocessing.get_context("spawn")
+    monkeypatch.setattr(isolation.multiprocessing, "get_context", lambda method=None: spawn)
+    compressor = DocumentCompressor(CompressionCache(str(tmp_path / "c")))
+    output = str(tmp_path / "out.pdf")
+    assert compressor.compress(make_pdf(), output, "medium", timeout=60) == output
+    assert compressor.compress_stream(open(make_pdf("b.pdf"), "rb").read(), timeout=60).startswith(b"%PDF")
+
+
+def test_cache_link_output_does_not_overwrite_entry(tmp_path, make_pdf):
+    cache = CompressionCache(str(tmp_path / "c"), link=True)
+    compressor = DocumentCompressor(cache)
+    first, second = make_pdf("a.pdf", text="Pertama"), make_pdf("b.pdf", pages=5, text="Kedua")
+    output = str(tmp_path / "out.pdf")
+    # --stream menulis output di tempat (open(output, "wb"))
+    compressor.compress(first, output, stream=True)
+    key = cache.make_key(first, level="medium", **compressor._cache_params(first, {"stream": True}))
+    stored = cache._entry_path(key).read_bytes()
+
+    compressor.compress(first, output, stream=True)  # hit: output menjadi hardlink ke entry
+    assert cache.hits == 1
+    compressor.compress(second, output, stream=True)  # miss ke path yang sama
+    assert cache._entry_path(key).read_bytes() == stored
+    assert open(output, "rb").read() != stored
+
+
+def test_unused_cache_is_released_and_flushed(tmp_path):
+    cache = CompressionCache(str(tmp_path / "c"))
+    cache._record("hits")
+    ref = weakref.ref(cache)
+    del cache
+    gc.collect()
+    assert ref() is None  # tidak ditahan oleh handler atexit
+    assert CompressionCache(str(tmp_path / "c")).stats()['total_hits'] == 1
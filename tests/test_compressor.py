@@ -0,0 +1,31 @@
+# tests/test_compressor.py
+import docx
+import fitz
+import pytest
+
+from conversion.compressor import DocumentCompressor
+
+
+def test_target_size_keeps_input_already_under_target(make_pdf, tmp_path):
+    path = make_pdf(pages=3)
+    output = str(tmp_path / "out.pdf")
+    DocumentCompressor().compress_pdf(path, output, target_size=300_000)
+    assert open(output, "rb").read() == open(path, "rb").read()
+
+    data = DocumentCompressor().compress_stream(open(path, "rb").read(), target_size=300_000, pages="2-3")
+    doc = fitz.open(stream=data, filetype="pdf")
+    assert [page.get_text().strip() for page in doc] == ["Halaman 2", "Halaman 3"]
+
+
+def test_pdf_only_options_rejected_for_docx(tmp_path):
+    path = str(tmp_path / "in.docx")
+    document = docx.Document()
+    document.add_paragraph("Halo")
+    document.save(path)
+    compressor = DocumentCompressor()
+    for options in ({'pages': "1"}, {'target_size': 1000}, {'mode': "images"}):
+        with pytest.raises(ValueError, match="hanya untuk PDF"):
+            compressor.compress(path, str(tmp_path / "out.docx"), **options)
+    with pytest.raises(ValueError, match="hanya untuk PDF"):
+        compressor.compress_stream(open(path, "rb").read(), mode="hybrid")
+    assert compressor.compress(path, str(tmp_path / "out.docx"), workers=2)
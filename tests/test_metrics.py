@@ -0,0 +1,47 @@
+# tests/test_metrics.py
+import multiprocessing
+
+from utils.metrics import JobMetrics, PrometheusSink
+
+
+def _record(status="ok", method=None):
+    metrics = JobMetrics("convert", method=method)
+    metrics.status = status
+    metrics.duration = 0.5
+    metrics.add_time("render", 0.25)
+    metrics.count("pages", 3)
+    return metrics.to_dict()
+
+
+def _emit_many(path, count):
+    sink = PrometheusSink(path)
+    for _ in range(count):
+        sink.emit(_record())
+
+
+def test_prometheus_totals_survive_new_runs(tmp_path):
+    path = str(tmp_path / "docconv.prom")
+    first = PrometheusSink(path)
+    first.emit(_record(method="pymupdf"))
+    first.emit(_record(status="error"))
+    PrometheusSink(path).emit(_record(method="pymupdf"))  # run CLI berikutnya
+
+    totals = PrometheusSink(path).read()
+    assert totals[("jobs_total", (("kind", "convert"), ("status", "ok")))] == 2
+    assert totals[("jobs_total", (("kind", "convert"), ("status", "error")))] == 1
+    assert totals[("method_total", (("kind", "convert"), ("method", "pymupdf")))] == 2
+    assert totals[("events_total", (("kind", "convert"), ("name", "pages")))] == 9
+    assert totals[("job_seconds_total", (("kind", "convert"),))] == 1.5
+    text = open(path).read()
+    assert 'docconv_jobs_total{kind="convert",status="ok"} 2\n' in text
+    assert 'docconv_stage_seconds_total{kind="convert",stage="render"} 0.750000\n' in text
+
+
+def test_prometheus_concurrent_processes(tmp_path):
+    path = str(tmp_path / "docconv.prom")
+    procs = [multiprocessing.Process(target=_emit_many, args=(path, 20)) for _ in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(30)
+    assert PrometheusSink(path).read()[("jobs_total", (("kind", "convert"), ("status", "ok")))] == 80
@@ -0,0 +1,44 @@
+# tests/test_office.py
+import pytest
+
+from conversion.isolation import IsolationError
+from conversion.office import FakeBackend, OfficePool
+
+
+@pytest.fixture
+def source(tmp_path):
+    def make(name="dokumen.docx"):
+        path = tmp_path / name
+        path.write_bytes(b"isi")
+        return str(path)
+    return make
+
+
+def test_pool_reuses_and_restarts_after_max_jobs(source, tmp_path):
+    with OfficePool(FakeBackend, size=1, max_jobs=2) as pool:
+        for i in range(5):
+            assert pool.convert(source(), str(tmp_path / f"out{i}.pdf"), "pdf")
+    assert pool.stats == {'jobs': 5, 'failed': 0, 'starts': 3, 'restarts': 2}
+
+
+def test_pool_restarts_after_crash(source, tmp_path):
+    with OfficePool(lambda: FakeBackend(crash_on="rusak", fail_on="gagal"), size=1) as pool:
+        with pytest.raises(ValueError):
+            pool.convert(source("gagal.docx"), str(tmp_path / "a.pdf"), "pdf")
+        assert pool.stats['restarts'] == 0  # error biasa: instance tetap dipakai
+        with pytest.raises(RuntimeError):
+            pool.convert(source("rusak.docx"), str(tmp_path / "b.pdf"), "pdf")
+        assert pool.convert(source(), str(tmp_path / "c.pdf"), "pdf")
+    assert pool.stats == {'jobs': 1, 'failed': 2, 'starts': 2, 'restarts': 1}
+
+
+def test_pool_timeout_kills_backend_and_slot_recovers(source, tmp_path):
+    with OfficePool(lambda: FakeBackend(delay=0.5), size=1) as pool:
+        with pytest.raises(IsolationError) as err:
+            pool.convert(source(), str(tmp_path / "a.pdf"), "pdf", timeout=0.1)
+        assert err.value.status == "timeout"
+        # Timeout dihitung sejak job mulai, bukan sejak antri di belakang job lain
+        first = pool.submit(source(), str(tmp_path / "b.pdf"), "pdf")
+        assert pool.convert(source(), str(tmp_path / "c.pdf"), "pdf", timeout=2)
+        assert first.result()
+    assert pool.stats['restarts'] == 1
@@ -0,0 +1,60 @@
+# tests/test_pdf_analysis.py
+import fitz
+
+from conversion.compressor import DocumentCompressor
+from conversion.pdf_analysis import page_fingerprint
+
+
+def _fingerprints(path):
+    doc = fitz.open(path)
+    try:
+        fonts = {}
+        return [page_fingerprint(doc, n, fonts) for n in range(len(doc))]
+    finally:
+        doc.close()
+
+
+def _annotate(path, pno, out):
+    doc = fitz.open(path)
+    doc[pno].add_text_annot((200, 300), "catatan")
+    doc.save(out)
+    doc.close()
+
+
+def test_annotation_changes_only_its_page(make_pdf, tmp_path):
+    path = make_pdf(pages=6)
+    edited = str(tmp_path / "edited.pdf")
+    _annotate(path, 4, edited)
+    before, after = _fingerprints(path), _fingerprints(edited)
+    assert [n for n in range(6) if before[n] != after[n]] == [4]
+
+
+def test_incremental_compress_rerenders_annotated_page(make_pdf, tmp_path, capsys):
+    path = make_pdf(pages=10)
+    compressor = DocumentCompressor()
+    compressor.compress_pdf(path, str(tmp_path / "a.pdf"), incremental=True)
+    edited = str(tmp_path / "edited.pdf")
+    _annotate(path, 5, edited)
+    capsys.readouterr()
+    compressor.compress_pdf(edited, str(tmp_path / "b.pdf"), incremental=True)
+    assert "[INCREMENTAL] 9/10 halaman dari cache, 1 dirender ulang" in capsys.readouterr().out
+
+
+def test_fingerprint_ignores_object_renumbering(tmp_path):
+    path, resaved = str(tmp_path / "font.pdf"), str(tmp_path / "resaved.pdf")
+    doc = fitz.open()
+    for i in range(3):
+        page = doc.new_page()
+        page.insert_font(fontname="F0", fontbuffer=fitz.Font("cour").buffer)  # font di-embed
+        page.insert_text((72, 72), f"Halaman {i + 1}", fontname="F0")
+    doc.save(path)
+    doc.close()
+    original = _fingerprints(path)
+
+    src = fitz.open(path)
+    src.save(resaved, garbage=4)
+    subset = fitz.open()
+    subset.insert_pdf(src, from_page=1, to_page=2)
+    assert [page_fingerprint(subset, n) for n in range(2)] == original[1:]
+    src.close()
+    assert _fingerprints(resaved) == original
@@ -0,0 +1,135 @@
+# tests/test_server.py
+import contextlib
+import shutil
+import threading
+import time
+
+import pytest
+
+from conversion.compressor import DocumentCompressor
+from conversion.engine import ConversionEngine
+from conversion.server import ConversionServer, JobManager, ServerClient
+
+
+class GatedCompressor:
+    """Compressor palsu yang menahan job sampai `gate` dibuka (untuk menguji antrian/drain)."""
+
+    def __init__(self, gate):
+        self.gate = gate
+
+    def compress(self, input_path, output_path, level="medium", **options):
+        self.gate.wait(10)
+        shutil.copyfile(input_path, output_path)
+        return output_path
+
+
+class IdleEngine:
+    def get_supported_conversions(self):
+        return {}
+
+
+@pytest.fixture
+def gate():
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+@pytest.fixture
+def run_server():
+    threads = []
+
+    @contextlib.contextmanager
+    def run(manager, drain_timeout=None):
+        server = ConversionServer(manager, port=0, drain_timeout=drain_timeout)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        threads.append((server, thread))
+        yield ServerClient(server.url, timeout=10), server, thread
+
+    yield run
+    for server, thread in threads:
+        server.stop()
+        thread.join(10)
+
+
+def _wait_status(client, job_id, status, timeout=5):
+    deadline = time.monotonic() + timeout
+    while client.status(job_id)['status'] != status:
+        assert time.monotonic() < deadline, f"job {job_id} tidak pernah {status}"
+        time.sleep(0.02)
+
+
+def _gated(gate, workers=1, max_queue=10):
+    return JobManager(IdleEngine, lambda: GatedCompressor(gate), workers=workers, max_queue=max_queue)
+
+
+def test_submit_poll_result(run_server, make_pdf, tmp_path):
+    manager = JobManager(lambda: ConversionEngine(False), DocumentCompressor, workers=1)
+    output = tmp_path / "out" / "kecil.pdf"
+    with run_server(manager) as (client, _, _):
+        job = client.compress(make_pdf(), str(output), level="high")
+        assert job['status'] in ("queued", "running")
+        done = client.wait(job['id'], timeout=30)
+    assert done['status'] == "done", done['error']
+    assert output.read_bytes().startswith(b"%PDF")
+    assert done['metrics']['counters']['pages'] == 3
+
+
+def test_queue_full_returns_429(run_server, gate, make_pdf, tmp_path):
+    with run_server(_gated(gate, max_queue=1)) as (client, _, _):
+        running = client.compress(make_pdf(), str(tmp_path / "a.pdf"))
+        _wait_status(client, running['id'], "running")
+        client.compress(make_pdf(), str(tmp_path / "b.pdf"))
+        with pytest.raises(RuntimeError, match="HTTP 429"):
+            client.compress(make_pdf(), str(tmp_path / "c.pdf"))
+
+
+@pytest.mark.parametrize("spec, message", [
+    ({'op': "hapus", 'input': "x", 'output': "y"}, "op harus"),
+    ({'op': "compress", 'input': "tidak-ada.pdf", 'output': "y.pdf"}, "tidak ada"),
+    ({'op': "compress", 'output': ""}, "wajib diisi"),
+    ({'op': "convert", 'type': "pdf_to_mp3"}, "type harus"),
+    ({'op': "compress", 'options': {'warna': "merah"}}, "Opsi tidak dikenal"),
+])
+def test_bad_request_returns_400(run_server, gate, make_pdf, tmp_path, spec, message):
+    spec = {'input': make_pdf(), 'output': str(tmp_path / "out.pdf"), **spec}
+    with run_server(_gated(gate)) as (client, _, _):
+        with pytest.raises(RuntimeError, match=f"HTTP 400: .*{message}"):
+            client._call("POST", "/jobs", spec)
+
+
+def test_delete_cancels_queued_job(run_server, gate, make_pdf, tmp_path):
+    with run_server(_gated(gate)) as (client, _, _):
+        running = client.compress(make_pdf(), str(tmp_path / "a.pdf"))
+        _wait_status(client, running['id'], "running")
+        queued = client.compress(make_pdf(), str(tmp_path / "b.pdf"))
+        assert client.cancel(queued['id'])['status'] == "cancelled"
+        with pytest.raises(RuntimeError, match="HTTP 409"):
+            client.cancel(running['id'])
+        with pytest.raises(RuntimeError, match="HTTP 404"):
+            client.cancel("tidak-ada")
+        gate.set()
+        assert client.wait(running['id'], timeout=5)['status'] == "done"
+        assert client.status(queued['id'])['status'] == "cancelled"
+    assert not (tmp_path / "b.pdf").exists()
+
+
+def test_drain_rejects_new_jobs_and_honours_timeout(run_server, gate, make_pdf, tmp_path):
+    manager = _gated(gate)
+    with run_server(manager, drain_timeout=0.5) as (client, _, thread):
+        running = client.compress(make_pdf(), str(tmp_path / "a.pdf"))
+        _wait_status(client, running['id'], "running")
+        queued = client.compress(make_pdf(), str(tmp_path / "b.pdf"))
+        assert client.shutdown()['status'] == "draining"
+        deadline = time.monotonic() + 5
+        while client.health()['status'] != "draining":
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+        with pytest.raises(RuntimeError, match="HTTP 503"):
+            client.compress(make_pdf(), str(tmp_path / "c.pdf"))
+        # Job yang macet tidak menahan server melewati --drain-timeout
+        thread.join(5)
+        assert not thread.is_alive()
+    assert manager.get(queued['id'])['status'] == "cancelled"
+    assert manager.get(running['id'])['status'] == "running"
@@ -3,7 +3,6 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from tkinterdnd2 import DND_FILES, TkinterDnD
 from pathlib import Path
-import threading
 import os
 import sys
 
@@ -13,6 +12,7 @@ sys.path.append(ROOT_DIR)
 
 from conversion.engine import ConversionEngine
 from conversion.compressor import DocumentCompressor
+from conversion.cache import CompressionCache
 from utils.file_handler import FileHandler
 
 
@@ -115,7 +115,12 @@ class GUIManager:
         """Setup conversion engine and compressor"""
         self.engine = ConversionEngine()
         self.has_ms_word = self.engine.check_ms_word_installation()
-        self.compressor = DocumentCompressor()
+        try:
+            cache = CompressionCache()
+        except OSError as e:
+            print(f"[WARN] Cache kompresi tidak bisa dipakai: {e}")
+            cache = None
+        self.compressor = DocumentCompressor(cache=cache)
 
     def _setup_ui(self):
         """Setup modern UI components"""
@@ -459,24 +464,27 @@ class GUIManager:
         
         self._status_message.set("🔄 Memulai proses konversi...")
         self.progress.start()
-        threading.Thread(target=self._run_convert, daemon=True).start()
-
-    def _run_convert(self):
+        kwargs = {'method': self.method.get()} if self.conversion_type.get() == 'pdf_to_docx' else {}
+        # Job dari GUI masuk lane "interactive" → tidak tertahan di belakang job batch yang besar
         try:
-            kwargs = {'method': self.method.get()} if self.conversion_type.get() == 'pdf_to_docx' else {}
-            self.engine.convert(
-                self.conversion_type.get(), 
-                self.input_path.get(), 
-                self.output_path.get(), 
-                **kwargs
-            )
-            self.root.after(0, lambda: messagebox.showinfo("Sukses", "✅ Konversi berhasil diselesaikan!"))
-            self.root.after(0, lambda: self._status_message.set("✅ Konversi selesai!"))
+            future = self.engine.submit(self.conversion_type.get(), self.input_path.get(), self.output_path.get(),
+                                        priority="interactive", **kwargs)
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"❌ Gagal: {str(e)}"))
-            self.root.after(0, lambda: self._status_message.set(f"❌ Error: {str(e)}"))
-        finally:
-            self.root.after(0, self.progress.stop)
+            self.progress.stop()
+            messagebox.showerror("Error", f"❌ Gagal: {str(e)}")
+            self._status_message.set(f"❌ Error: {str(e)}")
+            return
+        future.add_done_callback(lambda f: self.root.after(0, self._convert_done, f))
+
+    def _convert_done(self, future):
+        self.progress.stop()
+        error = future.exception()
+        if error is None:
+            messagebox.showinfo("Sukses", "✅ Konversi berhasil diselesaikan!")
+            self._status_message.set("✅ Konversi selesai!")
+        else:
+            messagebox.showerror("Error", f"❌ Gagal: {error}")
+            self._status_message.set(f"❌ Error: {error}")
 
     # Compression methods (unchanged functionality)
     def _start_compress(self):
@@ -489,34 +497,33 @@ class GUIManager:
             return
         
         self._status_message.set("📦 Memulai proses kompresi...")
-        threading.Thread(target=self._run_compress, daemon=True).start()
-
-    def _run_compress(self):
-        total = len(self.compress_files)
-        self.root.after(0, lambda: self.c_progress.config(maximum=total))
-        self.root.after(0, lambda: self.c_progress.config(value=0))
-        
         level = self.compress_level.get()
         out_dir = Path(self.compress_output.get())
-        success_count = 0
-
-        for i, f in enumerate(self.compress_files):
-            self.root.after(0, lambda v=i+1: self.c_progress.config(value=v))
-            self.root.after(0, lambda: self._status_message.set(
-                f"📦 Memproses file {i+1}/{total}"))
-            
-            try:
-                name = Path(f).name
-                out_path = out_dir / f"compressed_{name}"
-                self.compressor.compress(f, str(out_path), level)
-                success_count += 1
-            except Exception as e:
-                print(f"[ERROR] {f}: {e}")
-
-        self.root.after(0, lambda: messagebox.showinfo("Sukses", 
-            f"✅ {success_count}/{total} file berhasil dikompres!\nLokasi: {out_dir}"))
-        self.root.after(0, lambda: self._status_message.set(
-            f"✅ Kompresi selesai: {success_count}/{total} file berhasil"))
+        total = len(self.compress_files)
+        self.c_progress.config(maximum=total, value=0)
+        self._compress_state = {'done': 0, 'ok': 0, 'total': total, 'out_dir': out_dir}
+        # Semua file diantrikan sekaligus; scheduler mengerjakan file kecil lebih dulu
+        for f in self.compress_files:
+            out_path = out_dir / f"compressed_{Path(f).name}"
+            future = self.compressor.submit(f, str(out_path), level)
+            future.add_done_callback(lambda fut, f=f: self.root.after(0, self._compress_done, f, fut))
+
+    def _compress_done(self, path, future):
+        state = self._compress_state
+        state['done'] += 1
+        error = future.exception()
+        if error is None:
+            state['ok'] += 1
+        else:
+            print(f"[ERROR] {path}: {error}")
+        self.c_progress.config(value=state['done'])
+        self._status_message.set(f"📦 Memproses file {state['done']}/{state['total']}")
+        if state['done'] < state['total']:
+            return
+        messagebox.showinfo("Sukses", 
+            f"✅ {state['ok']}/{state['total']} file berhasil dikompres!\nLokasi: {state['out_dir']}")
+        self._status_message.set(
+            f"✅ Kompresi selesai: {state['ok']}/{state['total']} file berhasil")
 
     def run(self):
         """Start the GUI application"""
@@ -0,0 +1,98 @@
+# utils/capabilities.py
+import importlib.util
+import json
+import os
+import sys
+import time
+from utils.file_handler import FileHandler
+
+# Naikkan kalau format/isi probe berubah, supaya cache lama otomatis tidak dipakai
+PROBE_VERSION = 1
+PROBE_TTL = 7 * 24 * 3600
+
+
+def has_module(name: str) -> bool:
+    """Cek modul tersedia tanpa meng-import-nya."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _word_clsid() -> str:
+    # Kunci registry ini muncul/hilang bersama instalasi Office, jadi murah untuk invalidasi
+    try:
+        import winreg
+        return winreg.QueryValue(winreg.HKEY_CLASSES_ROOT, r"Word.Application\CLSID")
+    except (ImportError, OSError):
+        return ""
+
+
+def _module_stamp(name: str) -> str:
+    spec = importlib.util.find_spec(name) if has_module(name) else None
+    if spec is None or not spec.origin:
+        return ""
+    try:
+        return f"{spec.origin}:{os.path.getmtime(spec.origin)}"
+    except OSError:
+        return spec.origin
+
+
+def _fingerprint() -> dict:
+    return {
+        "probe_version": PROBE_VERSION,
+        "platform": sys.platform,
+        "python": sys.executable,
+        "comtypes": _module_stamp("comtypes"),
+        "word_clsid": _word_clsid(),
+    }
+
+
+def _cache_path():
+    return FileHandler.get_cache_dir() / "capabilities.json"
+
+
+def _detect_ms_word() -> bool:
+    try:
+        import comtypes.client
+        word = comtypes.client.CreateObject('Word.Application')
+        word.Visible = False
+        word.Quit()
+        print("Microsoft Word terdeteksi")
+        return True
+    except Exception as e:
+        print(f"Microsoft Word tidak terdeteksi: {e}")
+        return False
+
+
+def probe_ms_word(refresh: bool = False) -> bool:
+    """Deteksi MS Word, dengan hasil di-cache di disk.
+
+    Cache dipakai ulang selama fingerprint (platform, interpreter, comtypes, CLSID
+    Word di registry) sama dan umurnya belum lewat PROBE_TTL. Set env
+    DOCCONV_REFRESH_PROBE=1 atau refresh=True untuk memaksa deteksi ulang.
+    """
+    # Word lewat COM hanya ada di Windows; tidak perlu probe maupun cache
+    if sys.platform != "win32" or not has_module("comtypes"):
+        return False
+
+    refresh = refresh or os.environ.get("DOCCONV_REFRESH_PROBE") == "1"
+    fingerprint = _fingerprint()
+    path = _cache_path()
+    if not refresh:
+        try:
+            with open(path) as f:
+                cached = json.load(f)
+            if cached.get("fingerprint") == fingerprint and time.time() - cached["time"] < PROBE_TTL:
+                return cached["ms_word"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    ms_word = _detect_ms_word()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"fingerprint": fingerprint, "time": time.time(), "ms_word": ms_word}, f)
+    except OSError:
+        pass
+    return ms_word
@@ -1,5 +1,6 @@
 # utils/file_handler.py
 import os
+import sys
 from pathlib import Path
 from typing import List, Dict
 
@@ -46,6 +47,66 @@ class FileHandler:
             'parent_dir': str(path.parent)
         }
 
+    @staticmethod
+    def parse_size(text: str) -> int:
+        # Satuan desimal (1 MB = 1.000.000 byte) supaya hasil tetap muat di batas 1024-an
+        units = {'': 1, 'B': 1, 'K': 1000, 'KB': 1000, 'M': 1000 ** 2, 'MB': 1000 ** 2,
+                 'G': 1000 ** 3, 'GB': 1000 ** 3}
+        value = text.strip().upper()
+        number = value.rstrip('KMGB')
+        unit = value[len(number):]
+        try:
+            size = float(number) * units[unit]
+        except (ValueError, KeyError):
+            raise ValueError(f"Ukuran tidak valid: {text}. Contoh: 2MB, 500KB")
+        if size <= 0:
+            raise ValueError(f"Ukuran harus lebih dari 0: {text}")
+        return int(size)
+
+    @staticmethod
+    def parse_page_range(text: str) -> list:
+        """"1-5,8,10-" (nomor halaman mulai 1) → [(0, 5), (7, 8), (9, None)] (indeks 0, akhir eksklusif)."""
+        ranges = []
+        for part in text.replace(" ", "").split(","):
+            first, sep, last = part.partition("-")
+            try:
+                start = int(first)
+                end = (int(last) if last else None) if sep else start
+            except ValueError:
+                raise ValueError(f"Rentang halaman tidak valid: {text}. Contoh: 10-40, 1,3,5-7, 20-")
+            if start < 1 or (end is not None and end < start):
+                raise ValueError(f"Rentang halaman tidak valid: {part}")
+            ranges.append((start - 1, end))
+        return ranges
+
+    @staticmethod
+    def resolve_page_ranges(pages, total: int) -> list:
+        """Rentang halaman (teks atau hasil parse_page_range) → rentang terurut, digabung, dan
+        dipotong sesuai jumlah halaman dokumen."""
+        ranges = FileHandler.parse_page_range(pages) if isinstance(pages, str) else pages
+        clipped = sorted((start, min(end, total) if end is not None else total)
+                         for start, end in ranges if start < total)
+        merged = []
+        for start, end in clipped:
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            elif end > start:
+                merged.append((start, end))
+        if not merged:
+            raise ValueError(f"Halaman di luar dokumen (dokumen hanya {total} halaman)")
+        return merged
+
+    @staticmethod
+    def get_cache_dir(name: str = "") -> Path:
+        base = os.environ.get("DOCCONV_CACHE_DIR")
+        if not base:
+            if sys.platform == "win32":
+                root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+            else:
+                root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+            base = os.path.join(root, "document-converter")
+        return Path(base) / name if name else Path(base)
+
     @staticmethod
     def safe_delete(file_path: str) -> bool:
         try:
@@ -0,0 +1,98 @@
+# utils/memory.py
+import os
+import sys
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    RESOURCE_AVAILABLE = False
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def current_rss() -> int:
+    """RSS proses saat ini dalam byte, atau None kalau tidak bisa diukur."""
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            pass
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    return None
+
+
+def process_rss(pid: int) -> int:
+    """RSS proses lain (mis. child yang diawasi) dalam byte, atau None kalau tidak bisa diukur."""
+    if sys.platform.startswith("linux"):
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    if PSUTIL_AVAILABLE:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return None
+    return None
+
+
+def descendant_pids(pid: int) -> list:
+    """PID semua turunan proses (anak, cucu, ...), mis. worker pool milik job terisolasi."""
+    if sys.platform.startswith("linux"):
+        parents = {}
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    # Nama proses bisa berisi spasi/kurung; field setelah ')' terakhir: state ppid ...
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, ValueError, IndexError):
+                continue
+            parents.setdefault(ppid, []).append(int(entry))
+        found, todo = [], [pid]
+        while todo:
+            children = parents.get(todo.pop(), [])
+            found += children
+            todo += children
+        return found
+    if PSUTIL_AVAILABLE:
+        try:
+            return [p.pid for p in psutil.Process(pid).children(recursive=True)]
+        except psutil.Error:
+            return []
+    return []
+
+
+def process_tree_rss(pid: int) -> int:
+    """RSS proses beserta semua turunannya dalam byte, atau None kalau tidak bisa diukur."""
+    total = process_rss(pid)
+    if total is None:
+        return None
+    for child in descendant_pids(pid):
+        total += process_rss(child) or 0
+    return total
+
+
+def peak_rss() -> int:
+    """RSS puncak proses ini dalam byte, atau None kalau tidak bisa diukur."""
+    if RESOURCE_AVAILABLE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux melaporkan KB, macOS melaporkan byte
+        return peak if sys.platform == "darwin" else peak * 1024
+    if PSUTIL_AVAILABLE:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    return None
+
+
+def format_mb(num_bytes: int) -> str:
+    return "n/a" if num_bytes is None else f"{num_bytes / 1024 / 1024:.1f} MB"
@@ -0,0 +1,276 @@
+# utils/metrics.py
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+# Job yang sedang berjalan di konteks ini; instrumentasi di lapisan bawah mencatat ke sini
+_current = contextvars.ContextVar("docconv_job", default=None)
+
+
+class JobMetrics:
+    """Timer per tahap, counter, dan label untuk satu job (konversi/kompresi)."""
+
+    def __init__(self, kind: str, **labels):
+        self.kind = kind
+        self.labels = {k: v for k, v in labels.items() if v is not None}
+        self.timers = defaultdict(float)
+        self.counters = defaultdict(int)
+        self.status = "ok"
+        self.error = None
+        self.started = time.time()
+        self.duration = 0.0
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def add_time(self, stage: str, seconds: float):
+        with self._lock:
+            self.timers[stage] += seconds
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] += value
+
+    def merge(self, record: dict):
+        """Gabungkan timer/counter dari job lain (mis. hasil proses worker)."""
+        with self._lock:
+            for stage, seconds in record.get('timers', {}).items():
+                self.timers[stage] += seconds
+            for name, value in record.get('counters', {}).items():
+                self.counters[name] += value
+
+    def to_dict(self) -> dict:
+        return {
+            'kind': self.kind,
+            'status': self.status,
+            'error': self.error,
+            'started': round(self.started, 3),
+            'duration': round(self.duration, 6),
+            'labels': dict(self.labels),
+            'timers': {k: round(v, 6) for k, v in self.timers.items()},
+            'counters': dict(self.counters),
+        }
+
+
+class JsonLinesSink:
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def emit(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        # Satu write per baris dengan O_APPEND → aman dipakai beberapa proses sekaligus
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Lock eksklusif lintas proses (file .lock di sebelah `path`)."""
+    with open(path.with_name(path.name + ".lock"), "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK menyerah setelah ~10 detik; coba lagi
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class PrometheusSink:
+    """Total semua job sebagai textfile Prometheus, dijumlahkan lintas proses dan lintas run.
+
+    Tiap record ditambahkan ke total yang sudah ada di file (dibaca ulang di bawah lock file),
+    lalu file ditulis ulang secara atomik, jadi counter tidak pernah turun.
+    """
+
+    PREFIX = "docconv"
+    # Urutan metric di file; metric *_seconds_total ditulis sebagai float
+    METRICS = ("jobs_total", "job_seconds_total", "stage_seconds_total", "events_total", "method_total")
+    _LINE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+    _LABEL = re.compile(r'(\w+)="([^"]*)"')
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def emit(self, record: dict):
+        kind = record['kind']
+        deltas = defaultdict(float)
+        deltas[("jobs_total", (("kind", kind), ("status", record['status'])))] += 1
+        deltas[("job_seconds_total", (("kind", kind),))] += record['duration']
+        for stage, seconds in record['timers'].items():
+            deltas[("stage_seconds_total", (("kind", kind), ("stage", stage)))] += seconds
+        for name, value in record['counters'].items():
+            deltas[("events_total", (("kind", kind), ("name", name)))] += value
+        method = record['labels'].get('method')
+        if method:
+            deltas[("method_total", (("kind", kind), ("method", method)))] += 1
+        with _file_lock(self.path):
+            totals = self.read()
+            for key, value in deltas.items():
+                totals[key] = totals.get(key, 0) + value
+            self.write(totals)
+
+    def read(self) -> dict:
+        """Total yang sudah ada di file: {(metric, ((label, value), ...)): angka}."""
+        totals = {}
+        try:
+            text = self.path.read_text(encoding="utf-8")
+        except OSError:
+            return totals
+        prefix = self.PREFIX + "_"
+        for line in text.splitlines():
+            match = self._LINE.match(line)
+            if not match or not match.group(1).startswith(prefix):
+                continue
+            name, labels, value = match.groups()
+            try:
+                totals[(name[len(prefix):], tuple(self._LABEL.findall(labels)))] = float(value)
+            except ValueError:
+                pass
+        return totals
+
+    @staticmethod
+    def _labels(labels) -> str:
+        return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+    def write(self, totals: dict):
+        lines = []
+        for metric in self.METRICS:
+            name = f"{self.PREFIX}_{metric}"
+            lines.append(f"# TYPE {name} counter")
+            for (m, labels), value in sorted(totals.items()):
+                if m != metric:
+                    continue
+                text = f"{value:.6f}" if metric.endswith("seconds_total") else f"{round(value)}"
+                lines.append(f"{name}{self._labels(labels)} {text}")
+        # Tulis ke file sementara lalu rename → scraper tidak pernah membaca file setengah jadi
+        tmp = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+_sinks = []
+_sinks_pid = None
+_sinks_lock = threading.Lock()
+
+
+def configure(jsonl_path: str = None, prom_path: str = None):
+    """Aktifkan output metrics. Hanya proses yang memanggil ini yang menulis;
+    proses worker mengembalikan record-nya ke proses induk (lihat emit)."""
+    global _sinks_pid
+    with _sinks_lock:
+        _sinks.clear()
+        if jsonl_path:
+            _sinks.append(JsonLinesSink(jsonl_path))
+        if prom_path:
+            _sinks.append(PrometheusSink(prom_path))
+        _sinks_pid = os.getpid()
+
+
+def enabled() -> bool:
+    return bool(_sinks) and _sinks_pid == os.getpid()
+
+
+def emit(record: dict):
+    if not enabled():
+        return
+    with _sinks_lock:
+        for sink in _sinks:
+            try:
+                sink.emit(record)
+            except OSError as e:
+                print(f"[WARN] Gagal menulis metrics: {e}")
+
+
+def current() -> JobMetrics:
+    metrics = _current.get()
+    # Proses hasil fork mewarisi job milik induk; job itu tidak pernah di-emit dari sini
+    if metrics is not None and metrics.pid != os.getpid():
+        return None
+    return metrics
+
+
+@contextmanager
+def job(kind: str, emit_record: bool = True, **labels):
+    """Mulai job baru; kalau sudah ada job aktif, instrumentasi ikut job tersebut."""
+    parent = current()
+    if parent is not None:
+        parent.labels.update({k: v for k, v in labels.items() if v is not None})
+        yield parent
+        return
+    metrics = JobMetrics(kind, **labels)
+    token = _current.set(metrics)
+    start = time.perf_counter()
+    try:
+        yield metrics
+    except BaseException as e:
+        metrics.status = "error"
+        metrics.error = str(e)
+        raise
+    finally:
+        metrics.duration = time.perf_counter() - start
+        _current.reset(token)
+        if emit_record:
+            emit(metrics.to_dict())
+
+
+@contextmanager
+def stage(name: str):
+    metrics = current()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_time(name, time.perf_counter() - start)
+
+
+def count(name: str, value: int = 1):
+    metrics = current()
+    if metrics is not None:
+        metrics.count(name, value)
+
+
+def add_time(name: str, seconds: float):
+    metrics = current()
+    if metrics is not None:
+        metrics.add_time(name, seconds)
+
+
+def label(name: str, value):
+    metrics = current()
+    if metrics is not None:
+        metrics.labels[name] = value
+
+
+def merge(record: dict):
+    """Tambahkan record dari proses worker ke job aktif."""
+    metrics = current()
+    if metrics is not None and record:
+        metrics.merge(record)